@@ -0,0 +1,54 @@
+"""Cover recipe_ingredients ingredient lookup
+
+Revision ID: 02d980e559e3
+Revises: 859b495680ba
+Create Date: 2026-10-17 15:22:48.116093
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = "02d980e559e3"
+down_revision: Union[str, Sequence[str], None] = "859b495680ba"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    with op.get_context().autocommit_block():
+        op.create_index(
+            "ix_recipe_ingredients_ingredient_id_recipe_id",
+            "recipe_ingredients",
+            ["ingredient_id", "recipe_id"],
+            postgresql_concurrently=True,
+            if_not_exists=True,
+        )
+        op.drop_index(
+            op.f("ix_recipe_ingredients_ingredient_id"),
+            table_name="recipe_ingredients",
+            postgresql_concurrently=True,
+            if_exists=True,
+        )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.get_context().autocommit_block():
+        op.create_index(
+            op.f("ix_recipe_ingredients_ingredient_id"),
+            "recipe_ingredients",
+            ["ingredient_id"],
+            postgresql_concurrently=True,
+            if_not_exists=True,
+        )
+        op.drop_index(
+            "ix_recipe_ingredients_ingredient_id_recipe_id",
+            table_name="recipe_ingredients",
+            postgresql_concurrently=True,
+            if_exists=True,
+        )
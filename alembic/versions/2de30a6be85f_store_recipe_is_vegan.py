@@ -0,0 +1,59 @@
+"""Store recipe is_vegan
+
+Revision ID: 2de30a6be85f
+Revises: 93d44a8c6fcc
+Create Date: 2026-10-17 11:40:03.518207
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "2de30a6be85f"
+down_revision: Union[str, Sequence[str], None] = "93d44a8c6fcc"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column(
+        "recipes",
+        sa.Column("is_vegan", sa.Boolean(), server_default=sa.false(), nullable=False),
+    )
+    op.execute(
+        """
+        UPDATE recipes
+        SET is_vegan = NOT EXISTS (
+            SELECT 1
+            FROM recipe_ingredients
+            JOIN ingredients ON ingredients.id = recipe_ingredients.ingredient_id
+            WHERE recipe_ingredients.recipe_id = recipes.id
+              AND NOT ingredients.is_vegan
+        )
+        """
+    )
+    with op.get_context().autocommit_block():
+        op.create_index(
+            "ix_recipes_is_vegan_id",
+            "recipes",
+            ["is_vegan", "id"],
+            postgresql_concurrently=True,
+            if_not_exists=True,
+        )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.get_context().autocommit_block():
+        op.drop_index(
+            "ix_recipes_is_vegan_id",
+            table_name="recipes",
+            postgresql_concurrently=True,
+            if_exists=True,
+        )
+    op.drop_column("recipes", "is_vegan")
@@ -0,0 +1,63 @@
+"""Add recipe search vector
+
+Revision ID: 859b495680ba
+Revises: 2de30a6be85f
+Create Date: 2026-10-17 14:05:27.931450
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = "859b495680ba"
+down_revision: Union[str, Sequence[str], None] = "2de30a6be85f"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column(
+        "recipes",
+        sa.Column("search_vector", postgresql.TSVECTOR(), nullable=True),
+    )
+    op.execute(
+        """
+        UPDATE recipes
+        SET search_vector =
+            setweight(to_tsvector('english'::regconfig, name), 'A')
+            || setweight(to_tsvector('english'::regconfig, (
+                SELECT coalesce(string_agg(ingredients.name, ' '), '')
+                FROM recipe_ingredients
+                JOIN ingredients ON ingredients.id = recipe_ingredients.ingredient_id
+                WHERE recipe_ingredients.recipe_id = recipes.id
+            )), 'B')
+            || setweight(to_tsvector('english'::regconfig, instructions), 'C')
+        """
+    )
+    with op.get_context().autocommit_block():
+        op.create_index(
+            "ix_recipes_search_vector",
+            "recipes",
+            ["search_vector"],
+            postgresql_using="gin",
+            postgresql_concurrently=True,
+            if_not_exists=True,
+        )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.get_context().autocommit_block():
+        op.drop_index(
+            "ix_recipes_search_vector",
+            table_name="recipes",
+            postgresql_concurrently=True,
+            if_exists=True,
+        )
+    op.drop_column("recipes", "search_vector")
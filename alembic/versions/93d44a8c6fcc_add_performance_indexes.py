@@ -0,0 +1,68 @@
+"""Add performance indexes
+
+Revision ID: 93d44a8c6fcc
+Revises: 27b20e943a2b
+Create Date: 2026-10-17 09:12:41.204518
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = "93d44a8c6fcc"
+down_revision: Union[str, Sequence[str], None] = "27b20e943a2b"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # CREATE INDEX CONCURRENTLY cannot run inside a transaction block.
+    with op.get_context().autocommit_block():
+        op.create_index(
+            "ix_recipes_user_id_id",
+            "recipes",
+            ["user_id", "id"],
+            postgresql_concurrently=True,
+            if_not_exists=True,
+        )
+        op.create_index(
+            op.f("ix_recipe_ingredients_ingredient_id"),
+            "recipe_ingredients",
+            ["ingredient_id"],
+            postgresql_concurrently=True,
+            if_not_exists=True,
+        )
+        op.create_index(
+            op.f("ix_ingredient_category_category_id"),
+            "ingredient_category",
+            ["category_id"],
+            postgresql_concurrently=True,
+            if_not_exists=True,
+        )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.get_context().autocommit_block():
+        op.drop_index(
+            op.f("ix_ingredient_category_category_id"),
+            table_name="ingredient_category",
+            postgresql_concurrently=True,
+            if_exists=True,
+        )
+        op.drop_index(
+            op.f("ix_recipe_ingredients_ingredient_id"),
+            table_name="recipe_ingredients",
+            postgresql_concurrently=True,
+            if_exists=True,
+        )
+        op.drop_index(
+            "ix_recipes_user_id_id",
+            table_name="recipes",
+            postgresql_concurrently=True,
+            if_exists=True,
+        )
@@ -0,0 +1,148 @@
+"""
+List-page read paths against the configured database:
+
+    python -m benchmarks.list_reads [--rows 10000] [--ingredients 5]
+
+Seeds ``--rows`` recipes (plus ingredients and categories) inside a
+transaction that is rolled back at the end, then reads them all as one page
+through the ORM path (entities, selectin loads, model_validate from
+attributes) and through the row path the list endpoints use (selected
+columns, children aggregated with ``json_agg``). Reports CPU time and peak
+Python memory of each, best of ``--rounds``.
+"""
+
+import argparse
+import time
+import tracemalloc
+from typing import Callable
+from sqlalchemy import insert, select
+from sqlalchemy.orm import Session, selectinload
+from src.api.categories.services import CATEGORY_PROJECTION
+from src.api.common.conditional import VersionedJSON
+from src.api.common.fields import Projection
+from src.api.ingredients.services import INGREDIENT_PROJECTION
+from src.api.recipes.enums import DifficultyLevel
+from src.api.recipes.services import RECIPE_LOADER_OPTIONS, RECIPE_PROJECTION
+from src.db.models.categories import Category
+from src.db.models.ingredients import Ingredient, IngredientCategory
+from src.db.models.recipes import Recipe, RecipeIngredient
+from src.db.models.users import User
+from src.db.postgresql import SessionLocal
+
+
+def seed(db: Session, rows: int, per_recipe: int) -> None:
+    user_id = db.scalar(
+        insert(User)
+        .values(username="bench", email="bench@example.com", hashed_password="x")
+        .returning(User.id)
+    )
+    category_ids = db.scalars(
+        insert(Category).returning(Category.id),
+        [{"_name": f"bench category {i}"} for i in range(rows // 10 or 1)],
+    ).all()
+    ingredient_ids = db.scalars(
+        insert(Ingredient).returning(Ingredient.id),
+        [{"_name": f"bench ingredient {i}", "is_vegan": True} for i in range(rows)],
+    ).all()
+    db.execute(
+        insert(IngredientCategory),
+        [
+            {
+                "ingredient_id": ingredient_id,
+                "category_id": category_ids[i % len(category_ids)],
+            }
+            for i, ingredient_id in enumerate(ingredient_ids)
+        ],
+    )
+    recipe_ids = db.scalars(
+        insert(Recipe).returning(Recipe.id),
+        [
+            {
+                "_name": f"bench recipe {i}",
+                "cooking_time": 30,
+                "difficulty_level": DifficultyLevel.EASY,
+                "portions": 4,
+                "instructions": "Mix all ingredients. " * 20,
+                "is_vegan": True,
+                "user_id": user_id,
+            }
+            for i in range(rows)
+        ],
+    ).all()
+    db.execute(
+        insert(RecipeIngredient),
+        [
+            {
+                "recipe_id": recipe_id,
+                "ingredient_id": ingredient_ids[(i + j) % rows],
+                "quantity": "100 grams",
+            }
+            for i, recipe_id in enumerate(recipe_ids)
+            for j in range(min(per_recipe, rows))
+        ],
+    )
+
+
+def measure(db: Session, read: Callable[[], VersionedJSON]) -> tuple[float, int]:
+    db.expunge_all()
+    tracemalloc.start()
+    started = time.process_time()
+    read()
+    elapsed = time.process_time() - started
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    db.expunge_all()
+    return elapsed, peak
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--rows", type=int, default=10_000)
+    parser.add_argument("--ingredients", type=int, default=5)
+    parser.add_argument("--rounds", type=int, default=3)
+    args = parser.parse_args()
+
+    cases: list[tuple[str, type, tuple, Projection]] = [
+        ("recipes", Recipe, RECIPE_LOADER_OPTIONS, RECIPE_PROJECTION),
+        (
+            "ingredients",
+            Ingredient,
+            (selectinload(Ingredient.categories),),
+            INGREDIENT_PROJECTION,
+        ),
+        (
+            "categories",
+            Category,
+            (selectinload(Category.ingredients),),
+            CATEGORY_PROJECTION,
+        ),
+    ]
+    with SessionLocal() as db:
+        try:
+            seed(db, args.rows, args.ingredients)
+            for name, model, options, projection in cases:
+                schema = projection.schema
+
+                def read_entities() -> VersionedJSON:
+                    query = select(model).options(*options).order_by(model.id)
+                    entities = db.scalars(query).all()
+                    return VersionedJSON.of_page("bench", entities, schema, None)
+
+                def read_rows() -> VersionedJSON:
+                    query = select(*projection.select()).order_by(model.id)
+                    return VersionedJSON.of_page(
+                        "bench", db.execute(query).all(), schema, None
+                    )
+
+                for path, read in [("orm", read_entities), ("rows", read_rows)]:
+                    cpu, peak = min(measure(db, read) for _ in range(args.rounds))
+                    print(
+                        f"{name:<12} {path:<5} cpu {cpu * 1000:8.1f} ms"
+                        f"  peak {peak / 2**20:7.1f} MiB"
+                    )
+        finally:
+            db.rollback()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,46 @@
+"""
+JSON versus MessagePack response bodies, no database needed.
+
+    python -m benchmarks.msgpack_payloads [--items 50] [--rounds 200]
+
+Encodes a page of ``GetRecipeSchema`` items (as ``ModelResponse`` does for
+each format) and decodes it again the way a Python client would, reporting
+time per item and payload size, raw and gzipped.
+"""
+
+import argparse
+import gzip
+import json
+import msgpack
+import orjson
+from benchmarks.serialization import make_page, measure
+from src.api.common.responses import dump_json, dump_msgpack
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--items", type=int, default=50)
+    parser.add_argument("--rounds", type=int, default=200)
+    args = parser.parse_args()
+
+    page = make_page(args.items)
+    json_body = dump_json(page)
+    msgpack_body = dump_msgpack(page)
+    assert msgpack.unpackb(msgpack_body) == json.loads(json_body)
+
+    for name, encode, decode, body in [
+        ("JSON (json.loads)", lambda: dump_json(page), json.loads, json_body),
+        ("JSON (orjson.loads)", lambda: dump_json(page), orjson.loads, json_body),
+        ("MessagePack", lambda: dump_msgpack(page), msgpack.unpackb, msgpack_body),
+    ]:
+        encode_seconds = measure(encode, args.rounds)
+        decode_seconds = measure(lambda: decode(body), args.rounds)
+        print(
+            f"{name:<20} encode {encode_seconds * 1e6 / args.items:6.1f} µs/item"
+            f"  decode {decode_seconds * 1e6 / args.items:6.1f} µs/item"
+            f"  {len(body):7} B  gzip {len(gzip.compress(body)):6} B"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,103 @@
+"""
+Response serialization micro-benchmark, no database needed.
+
+    python -m benchmarks.serialization [--items 50] [--rounds 200]
+
+Compares, per page of ``GetRecipeSchema`` items, FastAPI's default path
+(re-validate against ``response_model``, dump to dicts, then ``json.dumps``),
+the same path rendered by ``ORJSONResponse``, and the single
+``TypeAdapter.dump_json`` pass that ``ModelResponse`` and ``VersionedJSON`` use.
+"""
+
+import argparse
+import time
+from datetime import datetime, timezone
+from typing import Callable
+from fastapi.responses import JSONResponse, ORJSONResponse
+from fastapi.utils import create_model_field
+from src.api.common.responses import ModelResponse, dump_json
+from src.api.common.schemas import PageSchema
+from src.api.recipes.schemas import GetRecipeSchema, RecipeIngredientPayload
+
+
+def make_page(items: int) -> PageSchema[GetRecipeSchema]:
+    created_at = datetime(2025, 1, 1, tzinfo=timezone.utc)
+    return PageSchema[GetRecipeSchema](
+        items=[
+            GetRecipeSchema(
+                id=i,
+                name=f"recipe {i}",
+                cooking_time=30,
+                difficulty_level="EASY",
+                portions=4,
+                instructions="Mix all ingredients. " * 20,
+                is_vegan=i % 2 == 0,
+                created_at=created_at,
+                recipe_ingredients_payload=[
+                    RecipeIngredientPayload(ingredient_id=j, quantity="100 grams")
+                    for j in range(8)
+                ],
+                user_id=1,
+            )
+            for i in range(items)
+        ],
+        next_cursor="eyJpZCI6IDUwfQ",
+    )
+
+
+def measure(fn: Callable[[], bytes], rounds: int) -> float:
+    fn()
+    started = time.perf_counter()
+    for _ in range(rounds):
+        fn()
+    return (time.perf_counter() - started) / rounds
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--items", type=int, default=50)
+    parser.add_argument("--rounds", type=int, default=200)
+    args = parser.parse_args()
+
+    page = make_page(args.items)
+    field = create_model_field(
+        "Response_search", PageSchema[GetRecipeSchema], mode="serialization"
+    )
+
+    def validate_and_dump() -> dict:
+        # What fastapi.routing.serialize_response does with a response_model.
+        value, errors = field.validate(page, {}, loc=("response",))
+        assert not errors
+        return field.serialize(value, by_alias=True)
+
+    def fastapi_default() -> bytes:
+        return JSONResponse(validate_and_dump()).body
+
+    def orjson_default() -> bytes:
+        return ORJSONResponse(validate_and_dump()).body
+
+    def model_response() -> bytes:
+        return ModelResponse(page).body
+
+    assert (
+        fastapi_default()
+        == JSONResponse(page.model_dump(mode="json", by_alias=True)).body
+    )
+    assert ModelResponse(page).body == dump_json(page)
+
+    baseline = None
+    for name, fn in [
+        ("FastAPI default (JSONResponse)", fastapi_default),
+        ("FastAPI default (ORJSONResponse)", orjson_default),
+        ("ModelResponse (TypeAdapter.dump_json)", model_response),
+    ]:
+        seconds = measure(fn, args.rounds)
+        baseline = baseline or seconds
+        print(
+            f"{name:<40} {seconds * 1e6 / args.items:8.1f} µs/item"
+            f"  {baseline / seconds:5.1f}x"
+        )
+
+
+if __name__ == "__main__":
+    main()
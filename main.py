@@ -1,17 +1,46 @@
-from fastapi import FastAPI, Request
-from fastapi.responses import JSONResponse
+from contextlib import asynccontextmanager
+from fastapi import FastAPI, Request, Response, status
+from fastapi.encoders import jsonable_encoder
+from fastapi.exceptions import RequestValidationError
+from fastapi.responses import PlainTextResponse
+from fastapi.utils import is_body_allowed_for_status_code
+from starlette.exceptions import HTTPException as StarletteHTTPException
 from src.api.users.routes import router as users_router
 from src.api.ingredients.routes import router as ingredients_router
 from src.api.categories.routes import router as categories_router
 from src.api.recipes.routes import router as recipes_router
 from src.api.auth.routes import router as auth_router
+from src.api.common.responses import DataResponse
+from src.core.cache import entity_cache
 from src.core.schemas import ErrorSchema
 from src.core.exceptions import ErrorException
+from src.core.compression import CompressionMiddleware
+from src.core.config import config
 from src.core.logging import setup_logging
+from src.core.loop_monitor import RouteContextMiddleware, loop_monitor
+from src.core.metrics import CONTENT_TYPE, MetricsMiddleware, registry
+from src.core.profiling import ProfilingMiddleware
+from src.core.security import password_hasher
 
 setup_logging()
 
-app = FastAPI()
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    if config.LOOP_MONITOR_ENABLED:
+        await loop_monitor.start()
+    await entity_cache.start()
+    yield
+    await entity_cache.stop()
+    await loop_monitor.stop()
+    password_hasher.close()
+
+
+app = FastAPI(lifespan=lifespan, default_response_class=DataResponse)
+app.add_middleware(RouteContextMiddleware)
+app.add_middleware(CompressionMiddleware)
+app.add_middleware(ProfilingMiddleware)
+app.add_middleware(MetricsMiddleware)
 
 
 @app.exception_handler(ErrorException)
@@ -22,9 +51,32 @@ async def exception_handler(request: Request, exc: ErrorException):
         kind=exc.kind,
         source=exc.source,
     )
-    return JSONResponse(
+    return DataResponse(
         status_code=exc.code,
         content=error_response.as_exception_response(),
+        headers=exc.headers,
+    )
+
+
+# FastAPI's own handlers for these answer in JSON whatever the client
+# accepts; same ``{"detail": ...}`` bodies, negotiated like the rest.
+@app.exception_handler(StarletteHTTPException)
+async def http_exception_handler(request: Request, exc: StarletteHTTPException):
+    headers = getattr(exc, "headers", None)
+    if not is_body_allowed_for_status_code(exc.status_code):
+        return Response(status_code=exc.status_code, headers=headers)
+    return DataResponse(
+        content={"detail": exc.detail},
+        status_code=exc.status_code,
+        headers=headers,
+    )
+
+
+@app.exception_handler(RequestValidationError)
+async def validation_exception_handler(request: Request, exc: RequestValidationError):
+    return DataResponse(
+        content={"detail": jsonable_encoder(exc.errors())},
+        status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
     )
 
 
@@ -38,3 +90,18 @@ app.include_router(auth_router, tags=["auth"])
 @app.get("/health")
 async def healthcheck():
     return {"status": "ok"}
+
+
+@app.get("/health/cache")
+async def cache_stats():
+    return await entity_cache.snapshot()
+
+
+@app.get("/health/loop")
+async def loop_stats():
+    return loop_monitor.snapshot()
+
+
+@app.get("/metrics", response_class=PlainTextResponse)
+async def metrics():
+    return PlainTextResponse(registry.render(), media_type=CONTENT_TYPE)
@@ -1,22 +1,24 @@
 from typing import Annotated
 from fastapi import APIRouter, Depends
 from fastapi.security import OAuth2PasswordRequestForm
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 from src.api.auth.services import authenticate_user, create_access_token, get_user
 from src.api.auth.schemas import Token
+from src.core.compression import skip_compression
 from src.core.dependencies import get_db
 
 router = APIRouter()
 
 
-@router.post("/token", response_model=Token)
+@router.post("/token", response_model=Token, dependencies=[Depends(skip_compression)])
 async def login(
     form_data: Annotated[OAuth2PasswordRequestForm, Depends()],
-    db: Annotated[Session, Depends(get_db)],
+    db: Annotated[Session | AsyncSession, Depends(get_db)],
 ) -> Token:
-    user = get_user(form_data.username, db)
-    user = authenticate_user(
-        username=form_data.username, password=form_data.password, user=user
+    user = await get_user(form_data.username, db)
+    user = await authenticate_user(
+        username=form_data.username, password=form_data.password, user=user, db=db
     )
     access_token = create_access_token(username=user.username)
     return Token(access_token=access_token, token_type="bearer")
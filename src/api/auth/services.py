@@ -5,12 +5,16 @@ from typing import Annotated
 from fastapi import Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
 import jwt
-from src.core.security import verify_password
+from src.api.users.schemas import GetUserSchema
+from src.core.cache import PRINCIPAL_NAMESPACE, USER_NAMESPACE, entity_cache
+from src.core.security import password_hasher
 from src.db.models.users import User
 from src.core.config import config
 from src.core.dependencies import get_db
 from src.api.auth.enums import JWTType
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
+from src.db.postgresql import run_sync
 
 logger = logging.getLogger(__name__)
 
@@ -79,28 +83,65 @@ def get_subject_for_token_type(
     return username
 
 
-def get_user(username: str, db: Session) -> User | None:
-    logger.debug("Fetching user from the database", extra={"username": username})
+def query_user(db: Session, username: str) -> User | None:
     return db.query(User).filter(User.username == username).first()
 
 
-def authenticate_user(username: str, password: str, user: User) -> User:
+async def get_user(username: str, db: Session | AsyncSession) -> User | None:
+    logger.debug("Fetching user from the database", extra={"username": username})
+    return await run_sync(db, query_user, username)
+
+
+def store_password_hash(db: Session, user_id: int, hashed_password: str) -> None:
+    db.query(User).filter(User.id == user_id).update(
+        {User.hashed_password: hashed_password}
+    )
+    db.commit()
+
+
+async def authenticate_user(
+    username: str, password: str, user: User, db: Session | AsyncSession
+) -> User:
     logger.debug("Authenticating user", extra={"username": username})
     if not user:
         raise create_credentials_exception("Invalid username or password")
-    if not verify_password(
+    valid, new_hash = await password_hasher.verify_and_update(
         plain_password=password, hashed_password=user.hashed_password
-    ):
+    )
+    if not valid:
         raise create_credentials_exception("Invalid password")
+    if new_hash is not None:
+        logger.info("Rehashing password with current cost parameters")
+        await run_sync(db, store_password_hash, user.id, new_hash)
+        # The UPDATE moved updated_at, and with it the user's ETag.
+        await entity_cache.invalidate(USER_NAMESPACE, [user.id])
+        await entity_cache.invalidate(PRINCIPAL_NAMESPACE, [user.username])
     return user
 
 
-def get_current_user(
+async def get_current_user(
     token: Annotated[str, Depends(oauth2_scheme)],
-    db: Annotated[Session, Depends(get_db)],
+    db: Annotated[Session | AsyncSession, Depends(get_db)],
 ) -> User:
+    """
+    Resolve the token's user, cached for ``PRINCIPAL_TTL_SECONDS`` so steady
+    authenticated traffic runs no query here. A cache hit returns a transient
+    ``User`` without ``hashed_password``; only its columns are meant to be read.
+    """
     username = get_subject_for_token_type(token, "access")
-    user = get_user(username=username, db=db)
+    key = entity_cache.key(PRINCIPAL_NAMESPACE, username)
+    cached = await entity_cache.get(key)
+    if cached is not None:
+        return User(**GetUserSchema.model_validate_json(cached).model_dump())
+
+    generation = await entity_cache.generation()
+    user = await get_user(username=username, db=db)
     if user is None:
         raise create_credentials_exception("Could not find user for this token")
+    await entity_cache.set(
+        key,
+        GetUserSchema.model_validate(user).model_dump_json().encode(),
+        generation,
+        ttl=config.PRINCIPAL_TTL_SECONDS,
+    )
     return user
@@ -1,7 +1,12 @@
 from fastapi import Depends
 from src.core.dependencies import get_db
+from src.api.common.dependencies import fields_query
+from src.api.categories.schemas import GetCategorySchema
 from src.api.categories.services import CategoryRepository
 
 
 def get_category_repository(db=Depends(get_db)) -> CategoryRepository:
     return CategoryRepository(db)
+
+
+get_category_fields = fields_query(GetCategorySchema)
@@ -1,11 +1,20 @@
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, Depends, Request
 from src.api.categories.schemas import (
     CreateCategorySchema,
     GetCategorySchema,
     UpdateCategorySchema,
 )
 from src.api.categories.services import CategoryRepository
-from src.api.categories.dependencies import get_category_repository
+from src.api.categories.dependencies import get_category_fields, get_category_repository
+from src.api.common.conditional import (
+    conditional_entity_response,
+    conditional_response,
+)
+from src.api.common.dependencies import get_pagination
+from src.api.common.fields import FieldSet
+from src.api.common.pagination import Pagination
+from src.api.common.schemas import PageSchema
+from src.core.cache import CATEGORY_NAMESPACE
 from src.core.schemas import ErrorResponse
 
 router = APIRouter()
@@ -13,31 +22,53 @@ router = APIRouter()
 
 @router.get(
     "/",
-    response_model=list[GetCategorySchema],
+    response_model=PageSchema[GetCategorySchema],
     responses={
+        304: {"description": "Not modified"},
+        422: {
+            "model": ErrorResponse,
+            "description": "Invalid pagination cursor or fields",
+        },
         500: {"model": ErrorResponse, "description": "Internal server error"},
     },
 )
 async def get_categories(
+    request: Request,
     category_repository: CategoryRepository = Depends(get_category_repository),
-) -> list[GetCategorySchema]:
-    return category_repository.get_all_categories()
+    pagination: Pagination = Depends(get_pagination),
+    fields: FieldSet = Depends(get_category_fields),
+):
+    return await conditional_response(
+        request,
+        lambda: category_repository.get_all_categories(pagination, fields),
+        lambda: category_repository.get_all_categories_version(pagination, fields),
+    )
 
 
 @router.get(
     "/{category_id}",
     response_model=GetCategorySchema,
     responses={
+        304: {"description": "Not modified"},
         404: {"model": ErrorResponse, "description": "Category not found"},
+        422: {"model": ErrorResponse, "description": "Invalid fields"},
         500: {"model": ErrorResponse, "description": "Internal server error"},
     },
 )
 async def get_category(
+    request: Request,
     category_id: int,
     category_repository: CategoryRepository = Depends(get_category_repository),
+    fields: FieldSet = Depends(get_category_fields),
 ):
-    category = category_repository.get_category_by_id(category_id)
-    return category
+    return await conditional_entity_response(
+        request,
+        CATEGORY_NAMESPACE,
+        category_id,
+        lambda: category_repository.get_category_by_id(category_id, fields),
+        lambda: category_repository.get_category_version(category_id, fields),
+        cached=fields is None,
+    )
 
 
 @router.post(
@@ -57,7 +88,7 @@ async def create_category(
     category: CreateCategorySchema,
     category_repository: CategoryRepository = Depends(get_category_repository),
 ) -> GetCategorySchema:
-    return category_repository.create_category(category)
+    return await category_repository.create_category(category)
 
 
 @router.put(
@@ -77,4 +108,4 @@ async def update_category(
     category: UpdateCategorySchema,
     category_repository: CategoryRepository = Depends(get_category_repository),
 ) -> GetCategorySchema:
-    return category_repository.update_category(category_id, category)
+    return await category_repository.update_category(category_id, category)
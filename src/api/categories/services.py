@@ -1,30 +1,65 @@
 from fastapi import status
+from sqlalchemy import select
 from sqlalchemy.exc import IntegrityError
-from sqlalchemy.orm import Session
 from src.api.categories.schemas import (
     CreateCategorySchema,
     GetCategorySchema,
     UpdateCategorySchema,
 )
+from src.api.common.conditional import Version, VersionedJSON
+from src.api.common.fields import FieldSet, Projection
 from src.api.common.schemas import IngredientRelationshipSchema
 from src.db.models.ingredients import Ingredient
-from src.db.models.categories import Category
+from src.db.models.categories import Category, category_ingredients_expression
+from src.api.common.pagination import Pagination, paginate
+from src.api.services import BaseRepository, run_in_session
+from src.core.cache import CATEGORY_NAMESPACE, INGREDIENT_NAMESPACE
 from src.core.exceptions import ErrorException
 from src.core.enums import ErrorKind
 from src.core.logging import logger
 
+# GetCategorySchema as plain rows, see RECIPE_PROJECTION.
+CATEGORY_PROJECTION = Projection(
+    GetCategorySchema,
+    Category.version_at,
+    name=Category._name,
+    id=Category.id,
+    created_at=Category.created_at,
+    updated_at=Category.updated_at,
+    ingredients=category_ingredients_expression(),
+)
 
-class CategoryRepository:
-    def __init__(self, db: Session):
-        self.db = db
 
+class CategoryRepository(BaseRepository):
     @property
     def repo_name(self) -> str:
         return "CategoryRepository"
 
-    def get_all_categories(self) -> list[GetCategorySchema]:
-        categories = self.db.query(Category).all()
-        return [GetCategorySchema.model_validate(category) for category in categories]
+    @run_in_session
+    def get_all_categories(
+        self, pagination: Pagination = Pagination(), fields: FieldSet = None
+    ) -> VersionedJSON:
+        rows, next_cursor = paginate(
+            self.db.query(*CATEGORY_PROJECTION.select(fields)), Category.id, pagination
+        )
+        return VersionedJSON.of_page(
+            CATEGORY_NAMESPACE,
+            rows,
+            CATEGORY_PROJECTION.schema_for(fields),
+            next_cursor,
+            CATEGORY_PROJECTION.variant(fields),
+        )
+
+    @run_in_session
+    def get_all_categories_version(
+        self, pagination: Pagination = Pagination(), fields: FieldSet = None
+    ) -> Version:
+        rows, next_cursor = paginate(
+            self.db.query(Category.id, Category.version_at), Category.id, pagination
+        )
+        return Version.of_page(
+            CATEGORY_NAMESPACE, rows, next_cursor, CATEGORY_PROJECTION.variant(fields)
+        )
 
     def get_ingredients(
         self, ingredients: list[IngredientRelationshipSchema]
@@ -36,10 +71,22 @@ class CategoryRepository:
             self.db.query(Ingredient).filter(Ingredient.id.in_(ingredients_ids)).all()
         )
 
-    def get_category_by_id(self, category_id: int) -> GetCategorySchema | None:
-        category = self.db.query(Category).filter(Category.id == category_id).first()
-        if category:
-            return GetCategorySchema.model_validate(category)
+    @run_in_session
+    def get_category_by_id(
+        self, category_id: int, fields: FieldSet = None
+    ) -> VersionedJSON:
+        row = (
+            self.db.query(*CATEGORY_PROJECTION.select(fields))
+            .filter(Category.id == category_id)
+            .first()
+        )
+        if row:
+            return VersionedJSON.of_entity(
+                CATEGORY_NAMESPACE,
+                row,
+                CATEGORY_PROJECTION.schema_for(fields),
+                CATEGORY_PROJECTION.variant(fields),
+            )
         else:
             raise ErrorException(
                 code=status.HTTP_404_NOT_FOUND,
@@ -48,12 +95,34 @@ class CategoryRepository:
                 source=f"{self.repo_name}.get_category_by_id",
             )
 
+    @run_in_session
+    def get_category_version(
+        self, category_id: int, fields: FieldSet = None
+    ) -> Version:
+        version_at = self.db.scalar(
+            select(Category.version_at).where(Category.id == category_id)
+        )
+        if version_at is None:
+            raise ErrorException(
+                code=status.HTTP_404_NOT_FOUND,
+                message="Category not found",
+                kind=ErrorKind.NOT_FOUND,
+                source=f"{self.repo_name}.get_category_version",
+            )
+        return Version.of_entity(
+            CATEGORY_NAMESPACE,
+            category_id,
+            version_at,
+            CATEGORY_PROJECTION.variant(fields),
+        )
+
     def add_category(self, category: Category) -> GetCategorySchema:
         self.db.add(category)
         self.db.commit()
         self.db.refresh(category)
         return GetCategorySchema.model_validate(category)
 
+    @run_in_session
     def create_category(self, category_data: CreateCategorySchema) -> GetCategorySchema:
         try:
             new_category = Category(
@@ -76,6 +145,7 @@ class CategoryRepository:
                 source=f"{self.repo_name}.create_category",
             )
 
+    @run_in_session
     def update_category(
         self, category_id: int, category_data: UpdateCategorySchema
     ) -> GetCategorySchema:
@@ -92,7 +162,13 @@ class CategoryRepository:
                 category.name = category_data.name
             self.db.commit()
             self.db.refresh(category)
-            return GetCategorySchema.model_validate(category)
+            response = GetCategorySchema.model_validate(category)
+            # Ingredients embed their categories' names.
+            self.invalidate(CATEGORY_NAMESPACE, [category_id])
+            self.invalidate(
+                INGREDIENT_NAMESPACE, [ing.id for ing in response.ingredients]
+            )
+            return response
         except IntegrityError:
             raise ErrorException(
                 code=status.HTTP_409_CONFLICT,
@@ -0,0 +1,248 @@
+import hashlib
+import json
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from email.utils import format_datetime, parsedate_to_datetime
+from typing import Any, Awaitable, Callable, Iterable
+from fastapi import Request, Response, status
+from pydantic import BaseModel
+from src.api.common.negotiation import msgpack_etag, prefers_msgpack
+from src.api.common.responses import NegotiatedResponse, dump_json, dump_msgpack
+from src.api.common.schemas import PageSchema
+from src.core.cache import entity_cache
+from src.core.profiling import serialization
+
+
+def make_etag(*parts: Any) -> str:
+    digest = hashlib.blake2b(
+        "|".join(map(str, parts)).encode(), digest_size=16
+    ).hexdigest()
+    return f'"{digest}"'
+
+
+def utc_isoformat(moment: datetime) -> str:
+    return moment.astimezone(timezone.utc).isoformat()
+
+
+@dataclass(frozen=True)
+class Version:
+    """Validators for one representation: a strong ETag and Last-Modified."""
+
+    etag: str
+    last_modified: datetime | None = None
+
+    @classmethod
+    def of_entity(
+        cls,
+        namespace: str,
+        entity_id: int,
+        version_at: datetime,
+        variant: str | None = None,
+    ):
+        return cls(
+            etag=make_etag(
+                namespace,
+                entity_id,
+                utc_isoformat(version_at),
+                *([variant] if variant else []),
+            ),
+            last_modified=version_at,
+        )
+
+    @classmethod
+    def of_page(
+        cls,
+        namespace: str,
+        rows: Iterable[tuple[int, datetime]],
+        next_cursor: str | None,
+        variant: str | None = None,
+    ):
+        # No Last-Modified: a row leaving the page does not move any timestamp.
+        return cls(
+            etag=make_etag(
+                namespace,
+                next_cursor,
+                *([variant] if variant else []),
+                *(
+                    f"{row_id}@{utc_isoformat(version_at)}"
+                    for row_id, version_at in rows
+                ),
+            )
+        )
+
+    def headers(self) -> dict[str, str]:
+        headers = {"ETag": self.etag}
+        if self.last_modified is not None:
+            headers["Last-Modified"] = format_datetime(
+                self.last_modified.astimezone(timezone.utc), usegmt=True
+            )
+        return headers
+
+
+@dataclass(frozen=True)
+class VersionedJSON:
+    """
+    A serialized response body together with its validators, and the
+    validated content it was dumped from while that is still at hand.
+    """
+
+    version: Version
+    body: bytes
+    content: Any = field(default=None, compare=False, repr=False)
+
+    @classmethod
+    def of_entity(
+        cls,
+        namespace: str,
+        entity: Any,
+        schema: type[BaseModel],
+        variant: str | None = None,
+    ):
+        with serialization():
+            content = schema.model_validate(entity)
+            body = dump_json(content)
+        return cls(
+            version=Version.of_entity(namespace, entity.id, entity.version_at, variant),
+            body=body,
+            content=content,
+        )
+
+    @classmethod
+    def of_page(
+        cls,
+        namespace: str,
+        entities: list[Any],
+        schema: type[BaseModel],
+        next_cursor: str | None,
+        variant: str | None = None,
+    ):
+        """One page of ``entities``, each validated through ``schema``."""
+        with serialization():
+            page = PageSchema[schema](
+                items=[schema.model_validate(entity) for entity in entities],
+                next_cursor=next_cursor,
+            )
+            body = dump_json(page)
+        return cls(
+            version=Version.of_page(
+                namespace,
+                [(entity.id, entity.version_at) for entity in entities],
+                next_cursor,
+                variant,
+            ),
+            body=body,
+            content=page,
+        )
+
+    def pack(self) -> bytes:
+        last_modified = self.version.last_modified
+        header = [self.version.etag, last_modified and last_modified.isoformat()]
+        return json.dumps(header).encode() + b"\n" + self.body
+
+    @classmethod
+    def unpack(cls, data: bytes):
+        header, body = data.split(b"\n", 1)
+        etag, last_modified = json.loads(header)
+        return cls(
+            version=Version(
+                etag=etag,
+                last_modified=last_modified and datetime.fromisoformat(last_modified),
+            ),
+            body=body,
+        )
+
+
+def is_conditional(request: Request) -> bool:
+    return "if-none-match" in request.headers or "if-modified-since" in request.headers
+
+
+def is_not_modified(request: Request, version: Version) -> bool:
+    """RFC 9110 evaluation: If-None-Match wins over If-Modified-Since."""
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match is not None:
+        etag = version.etag
+        if prefers_msgpack(request.headers.get("accept")):
+            etag = msgpack_etag(etag)
+        tags = [tag.strip().removeprefix("W/") for tag in if_none_match.split(",")]
+        return "*" in tags or etag in tags
+    if_modified_since = request.headers.get("if-modified-since")
+    if if_modified_since is None or version.last_modified is None:
+        return False
+    try:
+        since = parsedate_to_datetime(if_modified_since)
+    except (TypeError, ValueError):
+        return False
+    if since.tzinfo is None:
+        return False
+    return version.last_modified.replace(microsecond=0) <= since
+
+
+class VersionedResponse(NegotiatedResponse):
+    """``data.body``, or MessagePack encoded from ``data.content`` if held."""
+
+    def __init__(self, data: VersionedJSON):
+        self.data = data
+        super().__init__(data.body, headers=data.version.headers())
+
+    def render_msgpack(self) -> bytes:
+        if self.data.content is None:
+            return super().render_msgpack()
+        return dump_msgpack(self.data.content)
+
+
+def json_response(data: VersionedJSON) -> Response:
+    return VersionedResponse(data)
+
+
+def not_modified_response(version: Version) -> Response:
+    return NegotiatedResponse(
+        status_code=status.HTTP_304_NOT_MODIFIED, headers=version.headers()
+    )
+
+
+async def conditional_response(
+    request: Request,
+    load: Callable[[], Awaitable[VersionedJSON]],
+    load_version: Callable[[], Awaitable[Version]],
+) -> Response:
+    """
+    Answer a conditional request from ``load_version`` (a query over ids and
+    timestamps only) before loading relationships or serializing anything.
+    """
+    if is_conditional(request):
+        version = await load_version()
+        if is_not_modified(request, version):
+            return not_modified_response(version)
+    return json_response(await load())
+
+
+async def conditional_entity_response(
+    request: Request,
+    namespace: str,
+    entity_id: int,
+    load: Callable[[], Awaitable[VersionedJSON]],
+    load_version: Callable[[], Awaitable[Version]],
+    cached: bool = True,
+) -> Response:
+    """
+    ``conditional_response`` read through the entity cache, which only holds
+    full representations: pass ``cached=False`` for sparse ones.
+    """
+    if not cached:
+        return await conditional_response(request, load, load_version)
+    key = entity_cache.key(namespace, entity_id)
+    cached = await entity_cache.get(key)
+    if cached is not None:
+        data = VersionedJSON.unpack(cached)
+        if is_not_modified(request, data.version):
+            return not_modified_response(data.version)
+        return json_response(data)
+
+    if is_conditional(request):
+        version = await load_version()
+        if is_not_modified(request, version):
+            return not_modified_response(version)
+    generation = await entity_cache.generation()
+    data = await load()
+    await entity_cache.set(key, data.pack(), generation)
+    return json_response(data)
@@ -0,0 +1,37 @@
+from typing import Callable
+from fastapi import Query
+from pydantic import BaseModel
+from src.api.common.fields import FieldSet, output_fields, parse_fields
+from src.api.common.pagination import (
+    DEFAULT_PAGE_SIZE,
+    MAX_PAGE_SIZE,
+    Pagination,
+    decode_cursor,
+)
+
+
+def get_pagination(
+    cursor: str | None = Query(
+        default=None, description="Cursor returned as next_cursor by the previous page"
+    ),
+    limit: int = Query(default=DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+) -> Pagination:
+    after = decode_cursor(cursor) if cursor is not None else None
+    return Pagination(limit=limit, after=after)
+
+
+def fields_query(*schemas: type[BaseModel]) -> Callable[..., FieldSet]:
+    """A ``?fields=`` dependency validated against the output fields of ``schemas``."""
+    names = dict.fromkeys(name for schema in schemas for name in output_fields(schema))
+
+    def get_fields(
+        fields: str | None = Query(
+            default=None,
+            description="Comma-separated fields to return (id is always "
+            f"included): {', '.join(names)}",
+            examples=["id,name"],
+        ),
+    ) -> FieldSet:
+        return parse_fields(fields, *schemas)
+
+    return get_fields
@@ -0,0 +1,113 @@
+from functools import cache
+from typing import Any
+from fastapi import status
+from pydantic import BaseModel, Field, create_model
+from sqlalchemy import ColumnElement
+from src.core.exceptions import ErrorException
+from src.core.enums import ErrorKind
+
+# Requested output fields, ``None`` for the full representation.
+FieldSet = frozenset[str] | None
+
+# Needed to page and to version rows, so it is always returned.
+KEY_FIELD = "id"
+
+
+def output_fields(schema: type[BaseModel]) -> dict[str, str]:
+    """Output name -> attribute name of every field ``schema`` serializes."""
+    return {
+        info.serialization_alias or name: name
+        for name, info in schema.model_fields.items()
+        if not info.exclude
+    }
+
+
+def unknown_fields_exception(unknown: set[str], source: str) -> ErrorException:
+    return ErrorException(
+        code=status.HTTP_422_UNPROCESSABLE_CONTENT,
+        message=f"Unknown fields: {', '.join(sorted(unknown))}",
+        kind=ErrorKind.VALIDATION,
+        source=source,
+    )
+
+
+def parse_fields(raw: str | None, *schemas: type[BaseModel]) -> FieldSet:
+    """Validate ``raw`` against the output names of any of ``schemas``."""
+    if raw is None:
+        return None
+    requested = {name.strip() for name in raw.split(",")} - {""}
+    known = set().union(*(output_fields(schema) for schema in schemas))
+    if requested - known:
+        raise unknown_fields_exception(requested - known, "fields.parse_fields")
+    return frozenset(requested | {KEY_FIELD})
+
+
+@cache
+def sparse_schema(schema: type[BaseModel], fields: FieldSet) -> type[BaseModel]:
+    """
+    ``schema`` with every field outside ``fields`` made optional and left out
+    of the output, so it validates rows that never selected those columns.
+    """
+    if fields is None:
+        return schema
+    dropped: dict[str, Any] = {
+        name: (info.annotation | None, Field(default=None, exclude=True))
+        for output, name in output_fields(schema).items()
+        if output not in fields
+        for info in [schema.model_fields[name]]
+    }
+    return create_model(f"Sparse{schema.__name__}", __base__=schema, **dropped)
+
+
+class Projection:
+    """
+    The SQL expression behind each output field of ``schema``, so a sparse
+    fieldset shrinks the SELECT as well as the payload. Rows carry the
+    schema's validation names plus ``version_at`` for their ETag.
+
+    ``view`` names an alternative representation of the same resource.
+    """
+
+    def __init__(
+        self,
+        schema: type[BaseModel],
+        version_at: ColumnElement,
+        view: str | None = None,
+        **columns: ColumnElement,
+    ):
+        fields = output_fields(schema)
+        if columns.keys() != fields.keys():
+            raise ValueError(
+                f"{schema.__name__} projection must cover exactly {sorted(fields)}"
+            )
+        self.schema = schema
+        self.view = view
+        self.version_at = version_at.label("version_at")
+        self.columns = {
+            output: column.label(
+                schema.model_fields[fields[output]].alias or fields[output]
+            )
+            for output, column in columns.items()
+        }
+
+    def select(self, fields: FieldSet = None) -> list[ColumnElement]:
+        if fields is not None and not fields <= self.columns.keys():
+            # Valid for another view of the resource, not for this one.
+            raise unknown_fields_exception(
+                fields - self.columns.keys(), f"{self.schema.__name__} projection"
+            )
+        return [
+            column
+            for output, column in self.columns.items()
+            if fields is None or output in fields
+        ] + [self.version_at]
+
+    def schema_for(self, fields: FieldSet = None) -> type[BaseModel]:
+        return sparse_schema(self.schema, fields)
+
+    def variant(self, fields: FieldSet = None) -> str | None:
+        """ETag part telling this representation from the full default one."""
+        parts = [] if self.view is None else [self.view]
+        if fields is not None:
+            parts.append(",".join(sorted(fields)))
+        return ":".join(parts) or None
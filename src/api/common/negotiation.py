@@ -0,0 +1,130 @@
+from typing import Any, AsyncIterable, AsyncIterator, Callable, Coroutine
+import msgpack
+from fastapi import Request, Response, status
+from fastapi.routing import APIRoute
+from src.core.exceptions import ErrorException
+from src.core.enums import ErrorKind
+
+JSON_MEDIA_TYPE = "application/json"
+MSGPACK_MEDIA_TYPE = "application/msgpack"
+# Names clients used before application/msgpack was registered.
+MSGPACK_MEDIA_TYPES = (
+    MSGPACK_MEDIA_TYPE,
+    "application/x-msgpack",
+    "application/vnd.msgpack",
+)
+
+
+def media_ranges(accept: str) -> dict[str, float]:
+    """Media range -> quality of an ``Accept`` header, parameters dropped."""
+    ranges: dict[str, float] = {}
+    for entry in accept.split(","):
+        media_range, *params = entry.split(";")
+        quality = 1.0
+        for param in params:
+            name, _, value = param.partition("=")
+            if name.strip().lower() == "q":
+                try:
+                    quality = float(value)
+                except ValueError:
+                    quality = 0.0
+        if media_range.strip():
+            ranges[media_range.strip().lower()] = quality
+    return ranges
+
+
+def prefers_msgpack(accept: str | None) -> bool:
+    """
+    True when ``accept`` names MessagePack explicitly with at least the
+    quality JSON gets. Wildcards alone keep JSON, the default representation.
+    """
+    if not accept or "msgpack" not in accept:
+        return False
+    ranges = media_ranges(accept)
+    msgpack_quality = max(
+        ranges.get(media_type, 0.0) for media_type in MSGPACK_MEDIA_TYPES
+    )
+    json_quality = next(
+        (
+            ranges[media_range]
+            for media_range in (JSON_MEDIA_TYPE, "application/*", "*/*")
+            if media_range in ranges
+        ),
+        0.0,
+    )
+    return msgpack_quality > 0 and msgpack_quality >= json_quality
+
+
+def is_msgpack(content_type: str | None) -> bool:
+    media_type = (content_type or "").partition(";")[0].strip().lower()
+    return media_type in MSGPACK_MEDIA_TYPES
+
+
+def msgpack_etag(etag: str) -> str:
+    """Strong validator of the MessagePack twin of a JSON representation."""
+    return f'{etag[:-1]}.msgpack"'
+
+
+def malformed_msgpack_exception(source: str) -> ErrorException:
+    return ErrorException(
+        code=status.HTTP_400_BAD_REQUEST,
+        message="Malformed MessagePack body",
+        kind=ErrorKind.VALIDATION,
+        source=source,
+    )
+
+
+class MsgPackRoute(APIRoute):
+    """
+    Route that also takes MessagePack bodies: they are decoded up front and
+    handed to FastAPI as if they had been JSON, so validation, errors and
+    the documented schema stay the same.
+    """
+
+    def get_route_handler(self) -> Callable[[Request], Coroutine[Any, Any, Response]]:
+        handler = super().get_route_handler()
+
+        async def route_handler(request: Request) -> Response:
+            if is_msgpack(request.headers.get("content-type")):
+                body = await request.body()
+                try:
+                    data = msgpack.unpackb(body)
+                except ValueError:
+                    raise malformed_msgpack_exception("negotiation.MsgPackRoute")
+                scope = dict(request.scope)
+                scope["headers"] = [
+                    (
+                        name,
+                        JSON_MEDIA_TYPE.encode() if name == b"content-type" else value,
+                    )
+                    for name, value in request.scope["headers"]
+                ]
+                request = Request(scope, request.receive)
+                request._body = body
+                request._json = data
+            return await handler(request)
+
+        return route_handler
+
+
+async def iter_msgpack_objects(
+    chunks: AsyncIterable[bytes],
+) -> AsyncIterator[tuple[int, Any]]:
+    """
+    Decode a stream of concatenated MessagePack objects into ``(position,
+    object)`` pairs as it arrives, the counterpart of ``iter_ndjson_lines``.
+    """
+    unpacker = msgpack.Unpacker()
+    position = received = 0
+    async for chunk in chunks:
+        unpacker.feed(chunk)
+        received += len(chunk)
+        try:
+            for obj in unpacker:
+                position += 1
+                yield position, obj
+        except ValueError:
+            raise malformed_msgpack_exception("negotiation.iter_msgpack_objects")
+    # Bytes left over once the stream ended are a truncated object.
+    if unpacker.tell() != received:
+        raise malformed_msgpack_exception("negotiation.iter_msgpack_objects")
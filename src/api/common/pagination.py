@@ -0,0 +1,66 @@
+import base64
+import binascii
+import json
+from dataclasses import dataclass
+from typing import Any
+from fastapi import status
+from sqlalchemy.orm import InstrumentedAttribute, Query
+from src.core.exceptions import ErrorException
+from src.core.enums import ErrorKind
+
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 200
+
+
+@dataclass(frozen=True)
+class Pagination:
+    """
+    Keyset pagination: ``after`` holds the sort key of the last row of the
+    previous page (always including its ``id``), so a page is one index
+    range scan instead of an OFFSET over everything before it.
+    """
+
+    limit: int = DEFAULT_PAGE_SIZE
+    after: dict[str, Any] | None = None
+
+    @property
+    def after_id(self) -> int | None:
+        return None if self.after is None else self.after["id"]
+
+
+def invalid_cursor_exception() -> ErrorException:
+    return ErrorException(
+        code=status.HTTP_422_UNPROCESSABLE_CONTENT,
+        message="Invalid pagination cursor",
+        kind=ErrorKind.VALIDATION,
+        source="pagination.decode_cursor",
+    )
+
+
+def encode_cursor(**key: Any) -> str:
+    raw = json.dumps(key).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> dict[str, Any]:
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        key = json.loads(base64.urlsafe_b64decode(padded))
+        if not isinstance(key, dict) or not isinstance(key.get("id"), int):
+            raise TypeError("cursor must carry an integer id")
+    except (binascii.Error, ValueError, TypeError) as e:
+        raise invalid_cursor_exception() from e
+    return key
+
+
+def paginate(
+    query: Query, key: InstrumentedAttribute, pagination: Pagination
+) -> tuple[list[Any], str | None]:
+    """Fetch one page plus a look-ahead row to decide whether there is a next one."""
+    if pagination.after_id is not None:
+        query = query.filter(key > pagination.after_id)
+    rows = query.order_by(key).limit(pagination.limit + 1).all()
+    if len(rows) > pagination.limit:
+        rows = rows[: pagination.limit]
+        return rows, encode_cursor(id=getattr(rows[-1], key.key))
+    return rows, None
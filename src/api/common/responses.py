@@ -0,0 +1,118 @@
+from functools import cache
+from typing import Any, Mapping
+import msgpack
+import orjson
+from fastapi import Response
+from pydantic import TypeAdapter
+from starlette.background import BackgroundTask
+from starlette.datastructures import Headers
+from starlette.types import Receive, Scope, Send
+from src.api.common.negotiation import (
+    JSON_MEDIA_TYPE,
+    MSGPACK_MEDIA_TYPE,
+    msgpack_etag,
+    prefers_msgpack,
+)
+
+
+@cache
+def type_adapter(type_: Any) -> TypeAdapter:
+    return TypeAdapter(type_)
+
+
+def dump_json(content: Any, type_: Any | None = None) -> bytes:
+    """
+    Serialize already-validated ``content`` once, straight to JSON bytes,
+    through a ``TypeAdapter`` built once per type.
+    """
+    return type_adapter(type(content) if type_ is None else type_).dump_json(
+        content, by_alias=True
+    )
+
+
+def dump_msgpack(content: Any, type_: Any | None = None) -> bytes:
+    """``dump_json``'s MessagePack counterpart, from the same schema."""
+    return msgpack.packb(
+        type_adapter(type(content) if type_ is None else type_).dump_python(
+            content, mode="json", by_alias=True
+        )
+    )
+
+
+class NegotiatedResponse(Response):
+    """
+    JSON, or MessagePack when the request's ``Accept`` prefers it. Routes
+    never look at that header: the body is re-encoded here, as the response
+    is sent, and its ETag gets a suffix so each format validates on its own.
+
+    This base transcodes the rendered JSON body (e.g. one read from the
+    entity cache); subclasses that still hold their content encode from it.
+    """
+
+    media_type = JSON_MEDIA_TYPE
+
+    def render_msgpack(self) -> bytes:
+        return msgpack.packb(orjson.loads(self.body))
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        self.headers.add_vary_header("Accept")
+        if prefers_msgpack(Headers(scope=scope).get("accept")):
+            etag = self.headers.get("etag")
+            if etag is not None:
+                self.headers["etag"] = msgpack_etag(etag)
+            if self.body:
+                self.body = self.render_msgpack()
+                self.headers["content-type"] = MSGPACK_MEDIA_TYPE
+                self.headers["content-length"] = str(len(self.body))
+        await super().__call__(scope, receive, send)
+
+
+class DataResponse(NegotiatedResponse):
+    """
+    Response for plain JSON-compatible data: FastAPI's default response
+    class, after it has dumped the ``response_model``, and error bodies.
+    """
+
+    def __init__(
+        self,
+        content: Any,
+        status_code: int = 200,
+        headers: Mapping[str, str] | None = None,
+        media_type: str | None = None,
+        background: BackgroundTask | None = None,
+    ):
+        self.content = content
+        super().__init__(content, status_code, headers, media_type, background)
+
+    def render(self, content: Any) -> bytes:
+        return orjson.dumps(content, option=orjson.OPT_NON_STR_KEYS)
+
+    def render_msgpack(self) -> bytes:
+        return msgpack.packb(self.content)
+
+
+class ModelResponse(NegotiatedResponse):
+    """
+    Response for data a repository has already validated. Returning it
+    skips FastAPI's re-validation against ``response_model`` (which is then
+    only documentation) and its intermediate dump to dicts.
+    Pass ``type_`` for containers such as ``list[Schema]``.
+    """
+
+    def __init__(
+        self,
+        content: Any,
+        status_code: int = 200,
+        headers: Mapping[str, str] | None = None,
+        type_: Any | None = None,
+        background: BackgroundTask | None = None,
+    ):
+        self.content = content
+        self.type_ = type_
+        super().__init__(content, status_code, headers, background=background)
+
+    def render(self, content: Any) -> bytes:
+        return dump_json(content, self.type_)
+
+    def render_msgpack(self) -> bytes:
+        return dump_msgpack(self.content, self.type_)
@@ -1,6 +1,9 @@
+from typing import Generic, TypeVar
 from pydantic import Field
 from src.api.schemas import BaseSchema
 
+T = TypeVar("T")
+
 
 class IngredientRelationshipSchema(BaseSchema):
     id: int = Field(..., examples=[1])
@@ -10,3 +13,12 @@ class IngredientRelationshipSchema(BaseSchema):
 class CategoryRelationshipSchema(BaseSchema):
     id: int = Field(..., examples=[1])
     name: str = Field(max_length=50, examples=["Veggies"])
+
+
+class PageSchema(BaseSchema, Generic[T]):
+    items: list[T] = Field(default_factory=list)
+    next_cursor: str | None = Field(
+        default=None,
+        description="Opaque cursor for the next page, null on the last page",
+        examples=["eyJpZCI6IDUwfQ"],
+    )
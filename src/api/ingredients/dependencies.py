@@ -1,7 +1,12 @@
 from fastapi import Depends
 from src.core.dependencies import get_db
+from src.api.common.dependencies import fields_query
+from src.api.ingredients.schemas import GetIngredientSchema
 from src.api.ingredients.services import IngredientRepository
 
 
 def get_ingredient_repository(db=Depends(get_db)) -> IngredientRepository:
     return IngredientRepository(db)
+
+
+get_ingredient_fields = fields_query(GetIngredientSchema)
@@ -0,0 +1,13 @@
+from enum import StrEnum
+
+
+class ConflictAction(StrEnum):
+    UPDATE = "update"
+    SKIP = "skip"
+
+
+class BulkItemStatus(StrEnum):
+    CREATED = "created"
+    UPDATED = "updated"
+    SKIPPED = "skipped"
+    FAILED = "failed"
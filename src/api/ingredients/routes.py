@@ -1,43 +1,83 @@
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, Body, Depends, Query, Request
 from src.api.ingredients.schemas import (
+    BulkIngredientsResponseSchema,
     CreateIngredientSchema,
     GetIngredientSchema,
     UpdateIngredientSchema,
 )
+from src.api.ingredients.enums import ConflictAction
 from src.api.ingredients.services import IngredientRepository
-from src.api.ingredients.dependencies import get_ingredient_repository
+from src.api.ingredients.dependencies import (
+    get_ingredient_fields,
+    get_ingredient_repository,
+)
+from src.api.common.conditional import (
+    conditional_entity_response,
+    conditional_response,
+)
+from src.api.common.dependencies import get_pagination
+from src.api.common.fields import FieldSet
+from src.api.common.negotiation import MsgPackRoute
+from src.api.common.pagination import Pagination
+from src.api.common.responses import ModelResponse
+from src.api.common.schemas import PageSchema
+from src.core.cache import INGREDIENT_NAMESPACE
 from src.core.schemas import ErrorResponse
 
-router = APIRouter()
+router = APIRouter(route_class=MsgPackRoute)
+
+MAX_BULK_ITEMS = 50_000
 
 
 @router.get(
     "/",
-    response_model=list[GetIngredientSchema],
+    response_model=PageSchema[GetIngredientSchema],
     responses={
+        304: {"description": "Not modified"},
+        422: {
+            "model": ErrorResponse,
+            "description": "Invalid pagination cursor or fields",
+        },
         500: {"model": ErrorResponse, "description": "Internal server error"},
     },
 )
 async def get_ingredients(
+    request: Request,
     ingredient_repository: IngredientRepository = Depends(get_ingredient_repository),
-) -> list[GetIngredientSchema]:
-    return ingredient_repository.get_all_ingredients()
+    pagination: Pagination = Depends(get_pagination),
+    fields: FieldSet = Depends(get_ingredient_fields),
+):
+    return await conditional_response(
+        request,
+        lambda: ingredient_repository.get_all_ingredients(pagination, fields),
+        lambda: ingredient_repository.get_all_ingredients_version(pagination, fields),
+    )
 
 
 @router.get(
     "/{ingredient_id}",
     response_model=GetIngredientSchema,
     responses={
+        304: {"description": "Not modified"},
         404: {"model": ErrorResponse, "description": "Ingredient not found"},
+        422: {"model": ErrorResponse, "description": "Invalid fields"},
         500: {"model": ErrorResponse, "description": "Internal server error"},
     },
 )
 async def get_ingredient(
+    request: Request,
     ingredient_id: int,
     ingredient_repository: IngredientRepository = Depends(get_ingredient_repository),
+    fields: FieldSet = Depends(get_ingredient_fields),
 ):
-    ingredient = ingredient_repository.get_ingredient_by_id(ingredient_id)
-    return ingredient
+    return await conditional_entity_response(
+        request,
+        INGREDIENT_NAMESPACE,
+        ingredient_id,
+        lambda: ingredient_repository.get_ingredient_by_id(ingredient_id, fields),
+        lambda: ingredient_repository.get_ingredient_version(ingredient_id, fields),
+        cached=fields is None,
+    )
 
 
 @router.post(
@@ -54,7 +94,32 @@ async def create_ingredient(
     ingredient: CreateIngredientSchema,
     ingredient_repository: IngredientRepository = Depends(get_ingredient_repository),
 ) -> GetIngredientSchema:
-    return ingredient_repository.create_ingredient(ingredient)
+    return await ingredient_repository.create_ingredient(ingredient)
+
+
+@router.post(
+    "/bulk",
+    response_model=BulkIngredientsResponseSchema,
+    responses={
+        409: {
+            "model": ErrorResponse,
+            "description": "Bulk load conflicted with concurrent changes",
+        },
+        422: {"model": ErrorResponse, "description": "Invalid Ingredient input format"},
+        500: {"model": ErrorResponse, "description": "Internal server error"},
+    },
+)
+async def bulk_upsert_ingredients(
+    ingredients: list[CreateIngredientSchema] = Body(..., max_length=MAX_BULK_ITEMS),
+    on_conflict: ConflictAction = Query(
+        default=ConflictAction.UPDATE,
+        description="What to do when an ingredient name already exists",
+    ),
+    ingredient_repository: IngredientRepository = Depends(get_ingredient_repository),
+):
+    return ModelResponse(
+        await ingredient_repository.bulk_upsert_ingredients(ingredients, on_conflict)
+    )
 
 
 @router.put(
@@ -71,4 +136,4 @@ async def update_ingredient(
     ingredient: UpdateIngredientSchema,
     ingredient_repository: IngredientRepository = Depends(get_ingredient_repository),
 ) -> GetIngredientSchema:
-    return ingredient_repository.update_ingredient(ingredient_id, ingredient)
+    return await ingredient_repository.update_ingredient(ingredient_id, ingredient)
@@ -2,6 +2,7 @@ from datetime import datetime
 from pydantic import Field, field_validator, field_serializer
 from src.api.schemas import BaseSchema
 from src.api.common.schemas import CategoryRelationshipSchema
+from src.api.ingredients.enums import BulkItemStatus
 
 
 class IngredientSchema(BaseSchema):
@@ -39,3 +40,19 @@ class UpdateIngredientSchema(IngredientSchema):
         default_factory=list,
         examples=[[{"id": 1, "name": "Veggies"}]],
     )
+
+
+class BulkIngredientResultSchema(BaseSchema):
+    index: int = Field(..., description="Position of the item in the request body")
+    name: str = Field(..., examples=["broccoli"])
+    status: BulkItemStatus = Field(..., examples=["created"])
+    id: int | None = Field(default=None, examples=[1])
+    error: str | None = Field(default=None, examples=["Unknown category ids: [9]"])
+
+
+class BulkIngredientsResponseSchema(BaseSchema):
+    created: int = Field(default=0, examples=[2])
+    updated: int = Field(default=0, examples=[1])
+    skipped: int = Field(default=0, examples=[0])
+    failed: int = Field(default=0, examples=[0])
+    results: list[BulkIngredientResultSchema] = Field(default_factory=list)
@@ -1,36 +1,104 @@
+from typing import Iterable
 from fastapi import HTTPException, status
+from sqlalchemy import delete, func, select, update
+from sqlalchemy.dialects.postgresql import insert as pg_insert
 from sqlalchemy.exc import IntegrityError
-from sqlalchemy.orm import Session
-from src.db.models.ingredients import Ingredient
+from src.db.models.ingredients import (
+    Ingredient,
+    IngredientCategory,
+    ingredient_categories_expression,
+)
 from src.db.models.categories import Category
+from src.db.models.recipes import RecipeIngredient, refresh_recipes_is_vegan
+from src.api.ingredients.enums import BulkItemStatus, ConflictAction
 from src.api.ingredients.schemas import (
+    BulkIngredientResultSchema,
+    BulkIngredientsResponseSchema,
     GetIngredientSchema,
     CreateIngredientSchema,
     UpdateIngredientSchema,
 )
+from src.api.common.conditional import Version, VersionedJSON
+from src.api.common.fields import FieldSet, Projection
 from src.api.common.schemas import CategoryRelationshipSchema
+from src.api.common.pagination import Pagination, paginate
+from src.api.services import BaseRepository, run_in_session
+from src.core.cache import (
+    CATEGORY_NAMESPACE,
+    INGREDIENT_NAMESPACE,
+    RECIPE_NAMESPACE,
+)
 from src.core.exceptions import ErrorException
 from src.core.enums import ErrorKind
 
+# GetIngredientSchema as plain rows, see RECIPE_PROJECTION.
+INGREDIENT_PROJECTION = Projection(
+    GetIngredientSchema,
+    Ingredient.version_at,
+    name=Ingredient._name,
+    is_vegan=Ingredient.is_vegan,
+    categories=ingredient_categories_expression(),
+    id=Ingredient.id,
+    created_at=Ingredient.created_at,
+    updated_at=Ingredient.updated_at,
+)
+BULK_BATCH_SIZE = 1000
 
-class IngredientRepository:
-    def __init__(self, db: Session):
-        self.db = db
 
+class IngredientRepository(BaseRepository):
     @property
     def repo_name(self) -> str:
         return "IngredientRepository"
 
-    def get_all_ingredients(self) -> list[GetIngredientSchema]:
-        ingredients = self.db.query(Ingredient).all()
-        return [GetIngredientSchema.model_validate(ing) for ing in ingredients]
+    @run_in_session
+    def get_all_ingredients(
+        self, pagination: Pagination = Pagination(), fields: FieldSet = None
+    ) -> VersionedJSON:
+        rows, next_cursor = paginate(
+            self.db.query(*INGREDIENT_PROJECTION.select(fields)),
+            Ingredient.id,
+            pagination,
+        )
+        return VersionedJSON.of_page(
+            INGREDIENT_NAMESPACE,
+            rows,
+            INGREDIENT_PROJECTION.schema_for(fields),
+            next_cursor,
+            INGREDIENT_PROJECTION.variant(fields),
+        )
 
-    def get_ingredient_by_id(self, ingredient_id: int) -> GetIngredientSchema | None:
-        ingredient = (
-            self.db.query(Ingredient).filter(Ingredient.id == ingredient_id).first()
+    @run_in_session
+    def get_all_ingredients_version(
+        self, pagination: Pagination = Pagination(), fields: FieldSet = None
+    ) -> Version:
+        rows, next_cursor = paginate(
+            self.db.query(Ingredient.id, Ingredient.version_at),
+            Ingredient.id,
+            pagination,
+        )
+        return Version.of_page(
+            INGREDIENT_NAMESPACE,
+            rows,
+            next_cursor,
+            INGREDIENT_PROJECTION.variant(fields),
+        )
+
+    @run_in_session
+    def get_ingredient_by_id(
+        self, ingredient_id: int, fields: FieldSet = None
+    ) -> VersionedJSON:
+        row = (
+            self.db.query(*INGREDIENT_PROJECTION.select(fields))
+            .filter(Ingredient.id == ingredient_id)
+            .first()
         )
-        if ingredient:
-            return GetIngredientSchema.model_validate(ingredient)
+        if row:
+            return VersionedJSON.of_entity(
+                INGREDIENT_NAMESPACE,
+                row,
+                INGREDIENT_PROJECTION.schema_for(fields),
+                INGREDIENT_PROJECTION.variant(fields),
+            )
         else:
             raise ErrorException(
                 code=status.HTTP_404_NOT_FOUND,
@@ -39,6 +107,27 @@ class IngredientRepository:
                 source=f"{self.repo_name}.get_ingredient_by_id",
             )
 
+    @run_in_session
+    def get_ingredient_version(
+        self, ingredient_id: int, fields: FieldSet = None
+    ) -> Version:
+        version_at = self.db.scalar(
+            select(Ingredient.version_at).where(Ingredient.id == ingredient_id)
+        )
+        if version_at is None:
+            raise ErrorException(
+                code=status.HTTP_404_NOT_FOUND,
+                message="Ingredient not found",
+                kind=ErrorKind.NOT_FOUND,
+                source=f"{self.repo_name}.get_ingredient_version",
+            )
+        return Version.of_entity(
+            INGREDIENT_NAMESPACE,
+            ingredient_id,
+            version_at,
+            INGREDIENT_PROJECTION.variant(fields),
+        )
+
     def add_ingredient(self, ingredient: Ingredient) -> GetIngredientSchema:
         self.db.add(ingredient)
         self.db.commit()
@@ -65,6 +154,7 @@ class IngredientRepository:
         #         source=f"{self.repo_name}.get_categories",
         #     )
 
+    @run_in_session
     def create_ingredient(
         self, ingredient_data: CreateIngredientSchema
     ) -> GetIngredientSchema:
@@ -74,7 +164,10 @@ class IngredientRepository:
                 is_vegan=ingredient_data.is_vegan,
                 categories=self.get_categories(ingredient_data.categories),
             )
-            return self.add_ingredient(new_ingredient)
+            response = self.add_ingredient(new_ingredient)
+            # Categories embed the names of their ingredients.
+            self.invalidate(CATEGORY_NAMESPACE, [cat.id for cat in response.categories])
+            return response
         except IntegrityError:
             raise ErrorException(
                 code=status.HTTP_409_CONFLICT,
@@ -83,6 +176,7 @@ class IngredientRepository:
                 source=f"{self.repo_name}.create_ingredient",
             )
 
+    @run_in_session
     def update_ingredient(
         self, ingredient_id: int, ingredient_data: UpdateIngredientSchema
     ) -> GetIngredientSchema:
@@ -91,6 +185,8 @@ class IngredientRepository:
         )
         if not ingredient:
             raise HTTPException(status_code=404, detail="Ingredient not found")
+        stale_category_ids = {cat.id for cat in ingredient.categories}
+        was_vegan = ingredient.is_vegan
         try:
             if ingredient_data.name is not None:
                 ingredient.name = ingredient_data.name
@@ -98,9 +194,27 @@ class IngredientRepository:
                 ingredient.is_vegan = ingredient_data.is_vegan
             if ingredient_data.categories is not None:
                 ingredient.categories = self.get_categories(ingredient_data.categories)
+            # Link changes alone would not move any timestamp the ETags use.
+            ingredient.updated_at = func.statement_timestamp()
+            self.touch_categories(
+                stale_category_ids - {cat.id for cat in ingredient.categories}
+            )
             self.db.commit()
             self.db.refresh(ingredient)
-            return GetIngredientSchema.model_validate(ingredient)
+            response = GetIngredientSchema.model_validate(ingredient)
+            stale_category_ids.update(cat.id for cat in response.categories)
+            self.invalidate(INGREDIENT_NAMESPACE, [ingredient_id])
+            self.invalidate(CATEGORY_NAMESPACE, stale_category_ids)
+            if response.is_vegan != was_vegan:
+                self.invalidate(
+                    RECIPE_NAMESPACE,
+                    self.db.scalars(
+                        select(RecipeIngredient.recipe_id).where(
+                            RecipeIngredient.ingredient_id == ingredient_id
+                        )
+                    ).all(),
+                )
+            return response
         except IntegrityError:
             raise ErrorException(
                 code=status.HTTP_409_CONFLICT,
@@ -108,3 +222,167 @@ class IngredientRepository:
                 kind=ErrorKind.CONFLICT,
                 source=f"{self.repo_name}.update_ingredient",
             )
+
+    def touch_categories(self, category_ids: Iterable[int]) -> None:
+        """Bump categories that lost an ingredient, which their ETag would miss."""
+        category_ids = list(category_ids)
+        if category_ids:
+            self.db.execute(
+                update(Category)
+                .where(Category.id.in_(category_ids))
+                .values(updated_at=func.statement_timestamp())
+                .execution_options(synchronize_session="fetch")
+            )
+
+    @run_in_session
+    def bulk_upsert_ingredients(
+        self,
+        items: list[CreateIngredientSchema],
+        on_conflict: ConflictAction = ConflictAction.UPDATE,
+    ) -> BulkIngredientsResponseSchema:
+        results: list[BulkIngredientResultSchema | None] = [None] * len(items)
+        category_ids = {cat.id for item in items for cat in item.categories}
+        known_category_ids = set(
+            self.db.scalars(select(Category.id).where(Category.id.in_(category_ids)))
+        )
+
+        accepted: list[tuple[int, CreateIngredientSchema]] = []
+        seen_names: set[str] = set()
+        for index, item in enumerate(items):
+            unknown_ids = sorted(
+                {cat.id for cat in item.categories} - known_category_ids
+            )
+            if item.name in seen_names:
+                error = "Duplicate ingredient name in request"
+            elif unknown_ids:
+                error = f"Unknown category ids: {unknown_ids}"
+            else:
+                seen_names.add(item.name)
+                accepted.append((index, item))
+                continue
+            results[index] = BulkIngredientResultSchema(
+                index=index, name=item.name, status=BulkItemStatus.FAILED, error=error
+            )
+
+        stale_recipe_ids: set[int] = set()
+        try:
+            for start in range(0, len(accepted), BULK_BATCH_SIZE):
+                batch = accepted[start : start + BULK_BATCH_SIZE]
+                for result in self.upsert_ingredient_batch(
+                    batch, on_conflict, stale_recipe_ids
+                ):
+                    results[result.index] = result
+            self.db.commit()
+        except IntegrityError:
+            self.db.rollback()
+            raise ErrorException(
+                code=status.HTTP_409_CONFLICT,
+                message="Bulk load conflicted with concurrent changes",
+                kind=ErrorKind.CONFLICT,
+                source=f"{self.repo_name}.bulk_upsert_ingredients",
+            )
+        # Rows were written with Core statements; drop stale ORM state.
+        self.db.expire_all()
+        updated_ids = [
+            result.id for result in results if result.status == BulkItemStatus.UPDATED
+        ]
+        self.invalidate(INGREDIENT_NAMESPACE, updated_ids)
+        self.invalidate(RECIPE_NAMESPACE, stale_recipe_ids)
+        if any(
+            result.status in (BulkItemStatus.CREATED, BulkItemStatus.UPDATED)
+            for result in results
+        ):
+            self.invalidate_namespace(CATEGORY_NAMESPACE)
+
+        response = BulkIngredientsResponseSchema(results=results)
+        for result in results:
+            setattr(response, result.status, getattr(response, result.status) + 1)
+        return response
+
+    def upsert_ingredient_batch(
+        self,
+        batch: list[tuple[int, CreateIngredientSchema]],
+        on_conflict: ConflictAction,
+        stale_recipe_ids: set[int],
+    ) -> list[BulkIngredientResultSchema]:
+        table = Ingredient.__table__
+        names = [item.name for _, item in batch]
+        existing = {
+            row.name: row
+            for row in self.db.execute(
+                select(table.c.id, table.c.name, table.c.is_vegan).where(
+                    table.c.name.in_(names)
+                )
+            )
+        }
+
+        stmt = pg_insert(table).values(
+            [{"name": item.name, "is_vegan": item.is_vegan} for _, item in batch]
+        )
+        if on_conflict == ConflictAction.UPDATE:
+            stmt = stmt.on_conflict_do_update(
+                index_elements=[table.c.name],
+                set_={
+                    "is_vegan": stmt.excluded.is_vegan,
+                    "updated_at": func.statement_timestamp(),
+                },
+            )
+        else:
+            stmt = stmt.on_conflict_do_nothing(index_elements=[table.c.name])
+        written = {
+            row.name: row.id
+            for row in self.db.execute(stmt.returning(table.c.id, table.c.name))
+        }
+
+        updated_ids = [written[name] for name in written if name in existing]
+        if updated_ids:
+            unlinked = self.db.scalars(
+                delete(IngredientCategory.__table__)
+                .where(IngredientCategory.__table__.c.ingredient_id.in_(updated_ids))
+                .returning(IngredientCategory.__table__.c.category_id)
+            ).all()
+            self.touch_categories(set(unlinked))
+        links = [
+            {"ingredient_id": written[item.name], "category_id": category_id}
+            for _, item in batch
+            if item.name in written
+            for category_id in {cat.id for cat in item.categories}
+        ]
+        if links:
+            self.db.execute(
+                pg_insert(IngredientCategory.__table__)
+                .values(links)
+                .on_conflict_do_nothing()
+            )
+
+        flipped = [
+            existing[item.name].id
+            for _, item in batch
+            if item.name in written
+            and item.name in existing
+            and existing[item.name].is_vegan != item.is_vegan
+        ]
+        if flipped:
+            stale_recipe_ids.update(
+                refresh_recipes_is_vegan(self.db.connection(), flipped)
+            )
+
+        results = []
+        for index, item in batch:
+            if item.name in written:
+                result_status = (
+                    BulkItemStatus.UPDATED
+                    if item.name in existing
+                    else BulkItemStatus.CREATED
+                )
+                ingredient_id = written[item.name]
+            else:
+                result_status = BulkItemStatus.SKIPPED
+                row = existing.get(item.name)
+                ingredient_id = row.id if row else None
+            results.append(
+                BulkIngredientResultSchema(
+                    index=index, name=item.name, status=result_status, id=ingredient_id
+                )
+            )
+        return results
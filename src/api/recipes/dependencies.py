@@ -1,7 +1,24 @@
-from fastapi import Depends
+from fastapi import Depends, Query
 from src.core.dependencies import get_db
+from src.api.common.dependencies import fields_query
+from src.api.recipes.enums import RecipeView
+from src.api.recipes.schemas import GetRecipeSchema, RecipeSummarySchema
 from src.api.recipes.services import RecipeRepository
 
 
 def get_recipe_repository(db=Depends(get_db)) -> RecipeRepository:
     return RecipeRepository(db)
+
+
+get_recipe_fields = fields_query(GetRecipeSchema)
+get_recipe_list_fields = fields_query(GetRecipeSchema, RecipeSummarySchema)
+
+
+def get_recipe_view(
+    view: RecipeView = Query(
+        default=RecipeView.FULL,
+        description="summary replaces instructions with instructions_preview, "
+        "their first characters",
+    ),
+) -> RecipeView:
+    return view
@@ -5,3 +5,8 @@ class DifficultyLevel(StrEnum):
     EASY = "EASY"
     MEDIUM = "MEDIUM"
     HARD = "HARD"
+
+
+class RecipeView(StrEnum):
+    FULL = "full"
+    SUMMARY = "summary"
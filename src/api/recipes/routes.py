@@ -1,13 +1,43 @@
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, Depends, Query, Request
+from fastapi.responses import StreamingResponse
 from src.api.auth.services import get_current_user
 from src.api.recipes.schemas import (
     CreateRecipeSchema,
     GetRecipeSchema,
     DeleteRecipeSchema,
+    MatchRecipesSchema,
+    RecipeImportReportSchema,
+    RecipeMatchSchema,
+    RecipeSummarySchema,
     UpdateRecipeSchema,
 )
 from src.api.recipes.services import RecipeRepository
-from src.api.recipes.dependencies import get_recipe_repository
+from src.api.recipes.dependencies import (
+    get_recipe_fields,
+    get_recipe_list_fields,
+    get_recipe_repository,
+    get_recipe_view,
+)
+from src.api.recipes.enums import RecipeView
+from src.api.common.conditional import (
+    conditional_entity_response,
+    conditional_response,
+)
+from src.api.common.dependencies import get_pagination
+from src.api.common.fields import FieldSet
+from src.api.common.ndjson import (
+    NDJSON_MEDIA_TYPE,
+    iter_ndjson_lines,
+)
+from src.api.common.negotiation import (
+    MSGPACK_MEDIA_TYPE,
+    is_msgpack,
+    iter_msgpack_objects,
+)
+from src.api.common.pagination import Pagination
+from src.api.common.responses import ModelResponse
+from src.api.common.schemas import PageSchema
+from src.core.cache import RECIPE_NAMESPACE
 from src.core.schemas import ErrorResponse
 
 router = APIRouter()
@@ -15,46 +45,151 @@ router = APIRouter()
 
 @router.get(
     "/",
-    response_model=list[GetRecipeSchema],
+    response_model=PageSchema[GetRecipeSchema | RecipeSummarySchema],
     responses={
+        304: {"description": "Not modified"},
+        422: {
+            "model": ErrorResponse,
+            "description": "Invalid pagination cursor or fields",
+        },
         500: {"model": ErrorResponse, "description": "Internal server error"},
     },
 )
 async def get_recipes(
+    request: Request,
+    recipe_repository: RecipeRepository = Depends(get_recipe_repository),
+    pagination: Pagination = Depends(get_pagination),
+    is_vegan: bool | None = Query(
+        default=None, description="Only return vegan (or non-vegan) recipes"
+    ),
+    fields: FieldSet = Depends(get_recipe_list_fields),
+    view: RecipeView = Depends(get_recipe_view),
+):
+    return await conditional_response(
+        request,
+        lambda: recipe_repository.get_all_recipes(pagination, is_vegan, fields, view),
+        lambda: recipe_repository.get_all_recipes_version(
+            pagination, is_vegan, fields, view
+        ),
+    )
+
+
+@router.get(
+    "/export",
+    response_class=StreamingResponse,
+    responses={
+        200: {
+            "description": "One GetRecipeSchema JSON object per line, "
+            "compressed as it streams when the client sends Accept-Encoding",
+            "content": {NDJSON_MEDIA_TYPE: {"schema": {"type": "string"}}},
+        },
+        500: {"model": ErrorResponse, "description": "Internal server error"},
+    },
+)
+async def export_recipes(
     recipe_repository: RecipeRepository = Depends(get_recipe_repository),
-) -> list[GetRecipeSchema]:
-    return recipe_repository.get_all_recipes()
+) -> StreamingResponse:
+    return StreamingResponse(
+        recipe_repository.export_recipes(), media_type=NDJSON_MEDIA_TYPE
+    )
+
+
+@router.get(
+    "/search",
+    response_model=PageSchema[GetRecipeSchema],
+    responses={
+        422: {"model": ErrorResponse, "description": "Invalid search query or cursor"},
+        500: {"model": ErrorResponse, "description": "Internal server error"},
+    },
+)
+async def search_recipes(
+    q: str = Query(
+        ...,
+        min_length=1,
+        max_length=200,
+        description='Words, "quoted phrases" and -exclusions matched against '
+        "recipe names, ingredient names and instructions",
+    ),
+    recipe_repository: RecipeRepository = Depends(get_recipe_repository),
+    pagination: Pagination = Depends(get_pagination),
+):
+    return ModelResponse(await recipe_repository.search_recipes(q, pagination))
+
+
+@router.post(
+    "/match",
+    response_model=list[RecipeMatchSchema],
+    responses={
+        422: {"model": ErrorResponse, "description": "Invalid match criteria"},
+        500: {"model": ErrorResponse, "description": "Internal server error"},
+    },
+)
+async def match_recipes(
+    criteria: MatchRecipesSchema,
+    recipe_repository: RecipeRepository = Depends(get_recipe_repository),
+):
+    return ModelResponse(
+        await recipe_repository.match_recipes(criteria),
+        type_=list[RecipeMatchSchema],
+    )
 
 
 @router.get(
     "/{recipe_id}",
     response_model=GetRecipeSchema,
     responses={
+        304: {"description": "Not modified"},
         404: {"model": ErrorResponse, "description": "Recipe not found"},
+        422: {"model": ErrorResponse, "description": "Invalid fields"},
         500: {"model": ErrorResponse, "description": "Internal server error"},
     },
 )
 async def get_recipe(
+    request: Request,
     recipe_id: int,
     recipe_repository: RecipeRepository = Depends(get_recipe_repository),
+    fields: FieldSet = Depends(get_recipe_fields),
 ):
-    recipe = recipe_repository.get_recipe_by_id(recipe_id)
-    return recipe
+    return await conditional_entity_response(
+        request,
+        RECIPE_NAMESPACE,
+        recipe_id,
+        lambda: recipe_repository.get_recipe_by_id(recipe_id, fields),
+        lambda: recipe_repository.get_recipe_version(recipe_id, fields),
+        cached=fields is None,
+    )
 
 
 @router.get(
     "/user/{user_id}",
-    response_model=list[GetRecipeSchema],
+    response_model=PageSchema[GetRecipeSchema | RecipeSummarySchema],
     responses={
+        304: {"description": "Not modified"},
         404: {"model": ErrorResponse, "description": "Recipe not found"},
+        422: {
+            "model": ErrorResponse,
+            "description": "Invalid pagination cursor or fields",
+        },
         500: {"model": ErrorResponse, "description": "Internal server error"},
     },
 )
 async def get_recipes_user(
+    request: Request,
     user_id: int,
     recipe_repository: RecipeRepository = Depends(get_recipe_repository),
-) -> list[GetRecipeSchema]:
-    return recipe_repository.get_recipes_by_user(user_id)
+    pagination: Pagination = Depends(get_pagination),
+    fields: FieldSet = Depends(get_recipe_list_fields),
+    view: RecipeView = Depends(get_recipe_view),
+):
+    return await conditional_response(
+        request,
+        lambda: recipe_repository.get_recipes_by_user(
+            user_id, pagination, fields, view
+        ),
+        lambda: recipe_repository.get_recipes_by_user_version(
+            user_id, pagination, fields, view
+        ),
+    )
 
 
 @router.post(
@@ -72,8 +207,44 @@ async def create_recipe(
     recipe: CreateRecipeSchema,
     recipe_repository: RecipeRepository = Depends(get_recipe_repository),
     current_user_id=Depends(get_current_user),
-) -> GetRecipeSchema:
-    return recipe_repository.create_recipe(recipe, current_user_id)
+):
+    return ModelResponse(
+        await recipe_repository.create_recipe(recipe, current_user_id),
+        status_code=201,
+    )
+
+
+@router.post(
+    "/import",
+    response_model=RecipeImportReportSchema,
+    responses={
+        401: {"model": ErrorResponse, "description": "User lacks valid authentication"},
+        500: {"model": ErrorResponse, "description": "Internal server error"},
+    },
+    openapi_extra={
+        "requestBody": {
+            "required": True,
+            "description": "One CreateRecipeSchema JSON object per line, or"
+            " concatenated MessagePack objects",
+            "content": {
+                NDJSON_MEDIA_TYPE: {"schema": {"type": "string"}},
+                MSGPACK_MEDIA_TYPE: {"schema": {"type": "string"}},
+            },
+        }
+    },
+)
+async def import_recipes(
+    request: Request,
+    recipe_repository: RecipeRepository = Depends(get_recipe_repository),
+    current_user_id=Depends(get_current_user),
+):
+    if is_msgpack(request.headers.get("content-type")):
+        records = iter_msgpack_objects(request.stream())
+    else:
+        records = iter_ndjson_lines(request.stream())
+    return ModelResponse(
+        await recipe_repository.import_recipes(records, current_user_id.id)
+    )
 
 
 @router.put(
@@ -96,7 +267,9 @@ async def update_recipe(
     recipe_repository: RecipeRepository = Depends(get_recipe_repository),
     current_user_id=Depends(get_current_user),
 ) -> GetRecipeSchema:
-    return recipe_repository.update_recipe_by_id(recipe_id, recipe, current_user_id)
+    return await recipe_repository.update_recipe_by_id(
+        recipe_id, recipe, current_user_id
+    )
 
 
 @router.delete(
@@ -117,4 +290,4 @@ async def delete_recipe(
     recipe_repository: RecipeRepository = Depends(get_recipe_repository),
     current_user_id=Depends(get_current_user),
 ) -> DeleteRecipeSchema:
-    return recipe_repository.delete_recipe_by_id(recipe_id, current_user_id)
+    return await recipe_repository.delete_recipe_by_id(recipe_id, current_user_id)
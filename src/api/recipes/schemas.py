@@ -1,5 +1,6 @@
 from datetime import datetime
 from pydantic import Field, field_serializer, field_validator
+from src.api.common.pagination import DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE
 from src.api.recipes.enums import DifficultyLevel
 from src.api.schemas import BaseSchema
 
@@ -9,12 +10,11 @@ class RecipeIngredientPayload(BaseSchema):
     quantity: str = Field(..., examples=["100 grams"])
 
 
-class RecipeBaseSchema(BaseSchema):
+class RecipeCoreSchema(BaseSchema):
     name: str = Field(max_length=183, examples=["Tzatziki"])
     cooking_time: int = Field(..., examples=[30], ge=1)
     difficulty_level: DifficultyLevel = Field(..., examples=["EASY", "MEDIUM", "HARD"])
     portions: int = Field(..., examples=[4], ge=1)
-    instructions: str = Field(..., examples=["Mix all ingredients."])
 
     @field_validator("name")
     @classmethod
@@ -26,6 +26,10 @@ class RecipeBaseSchema(BaseSchema):
         return value.capitalize()
 
 
+class RecipeBaseSchema(RecipeCoreSchema):
+    instructions: str = Field(..., examples=["Mix all ingredients."])
+
+
 class CreateRecipeSchema(RecipeBaseSchema):
     ingredients: list[RecipeIngredientPayload] = Field(
         default_factory=list,
@@ -45,6 +49,23 @@ class GetRecipeSchema(RecipeBaseSchema):
     user_id: int = Field(..., examples=[1])
 
 
+class RecipeSummarySchema(RecipeCoreSchema):
+    """``GetRecipeSchema`` for list views: instructions cut short in SQL."""
+
+    instructions_preview: str = Field(
+        ..., examples=["Mix all ingredients. Chill for an hour and serve…"]
+    )
+    is_vegan: bool = Field(..., examples=[False])
+    id: int = Field(..., examples=[1])
+    created_at: datetime = Field(..., examples=["2023-10-01T12:00:00Z"])
+    ingredients: list[RecipeIngredientPayload] = Field(
+        default_factory=list,
+        alias="recipe_ingredients_payload",
+        serialization_alias="ingredients",
+    )
+    user_id: int = Field(..., examples=[1])
+
+
 class UpdateRecipeSchema(RecipeBaseSchema):
     ingredients: list[RecipeIngredientPayload] = Field(
         default_factory=list, examples=[[{"ingredient_id": 1, "quantity": "100 grams"}]]
@@ -53,3 +74,42 @@ class UpdateRecipeSchema(RecipeBaseSchema):
 
 class DeleteRecipeSchema(GetRecipeSchema):
     pass
+
+
+class MatchRecipesSchema(BaseSchema):
+    ingredient_ids: set[int] = Field(
+        ..., min_length=1, max_length=500, examples=[[1, 2, 3]]
+    )
+    min_coverage: float = Field(
+        default=0.5,
+        gt=0,
+        le=1,
+        description="Minimum share of a recipe's ingredients that must be available",
+        examples=[0.75],
+    )
+    is_vegan: bool | None = Field(default=None, examples=[True])
+    difficulty_level: DifficultyLevel | None = Field(default=None, examples=["EASY"])
+    max_cooking_time: int | None = Field(default=None, ge=1, examples=[30])
+    limit: int = Field(default=DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE)
+
+
+class RecipeMatchSchema(BaseSchema):
+    recipe: GetRecipeSchema
+    matched_ingredients: int = Field(..., examples=[3])
+    total_ingredients: int = Field(..., examples=[4])
+    coverage: float = Field(..., examples=[0.75])
+    missing_ingredient_ids: list[int] = Field(default_factory=list, examples=[[7]])
+
+
+class RecipeImportErrorSchema(BaseSchema):
+    line: int = Field(..., examples=[3])
+    error: str = Field(..., examples=["Ingredients not found: [42]"])
+
+
+class RecipeImportReportSchema(BaseSchema):
+    imported: int = Field(default=0, examples=[998])
+    failed: int = Field(default=0, examples=[2])
+    errors: list[RecipeImportErrorSchema] = Field(
+        default_factory=list,
+        description="Per-line errors, truncated once `failed` exceeds the report cap",
+    )
@@ -1,36 +1,296 @@
+from typing import Any, AsyncIterable, AsyncIterator
 from fastapi import HTTPException, status
+from pydantic import ValidationError
+from sqlalchemy import (
+    Boolean,
+    Column,
+    Float,
+    Integer,
+    MetaData,
+    Table,
+    Text,
+    cast,
+    func,
+    insert,
+    literal,
+    select,
+    tuple_,
+    update,
+)
+from sqlalchemy.dialects.postgresql import insert as pg_insert
 from sqlalchemy.exc import IntegrityError
-from sqlalchemy.orm import Session
-from src.db.models.recipes import Recipe, RecipeIngredient
+from sqlalchemy.engine import ScalarResult
+from sqlalchemy.orm import aliased, selectinload
+from src.db.models.recipes import (
+    Recipe,
+    RecipeIngredient,
+    instructions_preview_expression,
+    recipe_ingredients_payload_expression,
+    search_query,
+    search_vector_expression,
+)
 from src.db.models.ingredients import Ingredient
 from src.db.models.users import User
+from src.api.recipes.enums import RecipeView
 from src.api.recipes.schemas import (
     GetRecipeSchema,
     CreateRecipeSchema,
     DeleteRecipeSchema,
+    MatchRecipesSchema,
+    RecipeImportErrorSchema,
+    RecipeImportReportSchema,
+    RecipeMatchSchema,
     RecipeIngredientPayload,
+    RecipeSummarySchema,
     UpdateRecipeSchema,
 )
+from src.api.common.pagination import (
+    Pagination,
+    encode_cursor,
+    invalid_cursor_exception,
+    paginate,
+)
+from src.api.common.conditional import Version, VersionedJSON
+from src.api.common.fields import FieldSet, Projection
+from src.api.common.schemas import PageSchema
+from src.api.services import BaseRepository, run_in_session
+from src.db.postgresql import copy_rows
+from src.core.cache import RECIPE_NAMESPACE
 from src.core.exceptions import ErrorException
 from src.core.enums import ErrorKind
 
+# Everything GetRecipeSchema touches beyond the recipes row itself.
+RECIPE_LOADER_OPTIONS = (selectinload(Recipe.recipe_ingredients),)
+# GetRecipeSchema read straight into rows, children aggregated in SQL, so
+# reads build no ORM entities and select only the requested fields.
+RECIPE_PROJECTION = Projection(
+    GetRecipeSchema,
+    Recipe.version_at,
+    id=Recipe.id,
+    name=Recipe._name,
+    cooking_time=Recipe.cooking_time,
+    difficulty_level=Recipe.difficulty_level,
+    portions=Recipe.portions,
+    instructions=Recipe.instructions,
+    is_vegan=Recipe.is_vegan,
+    created_at=Recipe.created_at,
+    ingredients=recipe_ingredients_payload_expression(),
+    user_id=Recipe.user_id,
+)
+# List views can swap the unbounded instructions for a preview cut in SQL.
+INSTRUCTIONS_PREVIEW_LENGTH = 160
+RECIPE_PROJECTIONS = {
+    RecipeView.FULL: RECIPE_PROJECTION,
+    RecipeView.SUMMARY: Projection(
+        RecipeSummarySchema,
+        Recipe.version_at,
+        view=RecipeView.SUMMARY,
+        id=Recipe.id,
+        name=Recipe._name,
+        cooking_time=Recipe.cooking_time,
+        difficulty_level=Recipe.difficulty_level,
+        portions=Recipe.portions,
+        instructions_preview=instructions_preview_expression(
+            INSTRUCTIONS_PREVIEW_LENGTH
+        ),
+        is_vegan=Recipe.is_vegan,
+        created_at=Recipe.created_at,
+        ingredients=recipe_ingredients_payload_expression(),
+        user_id=Recipe.user_id,
+    ),
+}
+
+IMPORT_BATCH_SIZE = 1000
+EXPORT_BATCH_SIZE = 1000
+MAX_IMPORT_ERRORS = 1000
+
+# Per-batch temporary tables that imported lines are COPYed into before being
+# moved into recipes / recipe_ingredients with set-based INSERT ... SELECT.
+staging_metadata = MetaData()
+recipe_import_staging = Table(
+    "recipe_import_staging",
+    staging_metadata,
+    Column("line", Integer),
+    Column("name", Text),
+    Column("cooking_time", Integer),
+    Column("difficulty_level", Text),
+    Column("portions", Integer),
+    Column("instructions", Text),
+    Column("is_vegan", Boolean),
+    prefixes=["TEMPORARY"],
+)
+recipe_ingredient_import_staging = Table(
+    "recipe_ingredient_import_staging",
+    staging_metadata,
+    Column("line", Integer),
+    Column("ingredient_id", Integer),
+    Column("quantity", Text),
+    prefixes=["TEMPORARY"],
+)
+
 
-class RecipeRepository:
-    def __init__(self, db: Session):
-        self.db = db
+def add_import_error(report: RecipeImportReportSchema, line: int, error: str) -> None:
+    report.failed += 1
+    if len(report.errors) < MAX_IMPORT_ERRORS:
+        report.errors.append(RecipeImportErrorSchema(line=line, error=error))
 
+
+def format_validation_error(exc: ValidationError) -> str:
+    return "; ".join(
+        f"{'.'.join(map(str, error['loc'])) or 'line'}: {error['msg']}"
+        for error in exc.errors()
+    )
+
+
+class RecipeRepository(BaseRepository):
     @property
     def repo_name(self) -> str:
         return "RecipeRepository"
 
-    def get_all_recipes(self) -> list[GetRecipeSchema]:
-        recipes = self.db.query(Recipe).all()
-        return [GetRecipeSchema.model_validate(recipe) for recipe in recipes]
+    @run_in_session
+    def get_all_recipes(
+        self,
+        pagination: Pagination = Pagination(),
+        is_vegan: bool | None = None,
+        fields: FieldSet = None,
+        view: RecipeView = RecipeView.FULL,
+    ) -> VersionedJSON:
+        projection = RECIPE_PROJECTIONS[view]
+        query = self.db.query(*projection.select(fields))
+        if is_vegan is not None:
+            query = query.filter(Recipe.is_vegan == is_vegan)
+        rows, next_cursor = paginate(query, Recipe.id, pagination)
+        return VersionedJSON.of_page(
+            RECIPE_NAMESPACE,
+            rows,
+            projection.schema_for(fields),
+            next_cursor,
+            projection.variant(fields),
+        )
 
-    def get_recipe_by_id(self, recipe_id: int) -> GetRecipeSchema | None:
-        recipe = self.db.query(Recipe).filter(Recipe.id == recipe_id).first()
-        if recipe:
-            return GetRecipeSchema.model_validate(recipe)
+    @run_in_session
+    def get_all_recipes_version(
+        self,
+        pagination: Pagination = Pagination(),
+        is_vegan: bool | None = None,
+        fields: FieldSet = None,
+        view: RecipeView = RecipeView.FULL,
+    ) -> Version:
+        query = self.db.query(Recipe.id, Recipe.version_at)
+        if is_vegan is not None:
+            query = query.filter(Recipe.is_vegan == is_vegan)
+        rows, next_cursor = paginate(query, Recipe.id, pagination)
+        return Version.of_page(
+            RECIPE_NAMESPACE,
+            rows,
+            next_cursor,
+            RECIPE_PROJECTIONS[view].variant(fields),
+        )
+
+    @run_in_session
+    def search_recipes(
+        self, q: str, pagination: Pagination = Pagination()
+    ) -> PageSchema[GetRecipeSchema]:
+        tsquery = search_query(q)
+        rank = cast(func.ts_rank(Recipe.search_vector, tsquery), Float)
+        query = (
+            self.db.query(Recipe, rank)
+            .options(*RECIPE_LOADER_OPTIONS)
+            .filter(Recipe.search_vector.op("@@")(tsquery))
+        )
+        if pagination.after is not None:
+            after_rank = pagination.after.get("rank")
+            if not isinstance(after_rank, (int, float)):
+                raise invalid_cursor_exception()
+            query = query.filter(
+                tuple_(rank, Recipe.id) < tuple_(after_rank, pagination.after_id)
+            )
+        rows = (
+            query.order_by(rank.desc(), Recipe.id.desc())
+            .limit(pagination.limit + 1)
+            .all()
+        )
+        next_cursor = None
+        if len(rows) > pagination.limit:
+            rows = rows[: pagination.limit]
+            last_recipe, last_rank = rows[-1]
+            next_cursor = encode_cursor(rank=last_rank, id=last_recipe.id)
+        return PageSchema[GetRecipeSchema](
+            items=[GetRecipeSchema.model_validate(recipe) for recipe, _ in rows],
+            next_cursor=next_cursor,
+        )
+
+    @run_in_session
+    def match_recipes(self, criteria: MatchRecipesSchema) -> list[RecipeMatchSchema]:
+        requested = criteria.ingredient_ids
+        # Walk the ingredient -> recipe postings once to find candidate recipes,
+        # then count available vs. total ingredients per candidate in one pass.
+        postings = aliased(RecipeIngredient)
+        candidates = select(postings.recipe_id).where(
+            postings.ingredient_id.in_(requested)
+        )
+        matched = func.count().filter(RecipeIngredient.ingredient_id.in_(requested))
+        total = func.count()
+        coverage = cast(matched, Float) / total
+        counts = (
+            select(
+                RecipeIngredient.recipe_id,
+                matched.label("matched"),
+                total.label("total"),
+                coverage.label("coverage"),
+            )
+            .where(RecipeIngredient.recipe_id.in_(candidates))
+            .group_by(RecipeIngredient.recipe_id)
+            .having(coverage >= criteria.min_coverage)
+            .subquery()
+        )
+        query = (
+            self.db.query(Recipe, counts.c.matched, counts.c.total, counts.c.coverage)
+            .join(counts, counts.c.recipe_id == Recipe.id)
+            .options(*RECIPE_LOADER_OPTIONS)
+        )
+        if criteria.is_vegan is not None:
+            query = query.filter(Recipe.is_vegan == criteria.is_vegan)
+        if criteria.difficulty_level is not None:
+            query = query.filter(Recipe.difficulty_level == criteria.difficulty_level)
+        if criteria.max_cooking_time is not None:
+            query = query.filter(Recipe.cooking_time <= criteria.max_cooking_time)
+        rows = (
+            query.order_by(counts.c.coverage.desc(), counts.c.matched.desc(), Recipe.id)
+            .limit(criteria.limit)
+            .all()
+        )
+        return [
+            RecipeMatchSchema(
+                recipe=GetRecipeSchema.model_validate(recipe),
+                matched_ingredients=matched_count,
+                total_ingredients=total_count,
+                coverage=recipe_coverage,
+                missing_ingredient_ids=[
+                    assoc.ingredient_id
+                    for assoc in recipe.recipe_ingredients
+                    if assoc.ingredient_id not in requested
+                ],
+            )
+            for recipe, matched_count, total_count, recipe_coverage in rows
+        ]
+
+    @run_in_session
+    def get_recipe_by_id(
+        self, recipe_id: int, fields: FieldSet = None
+    ) -> VersionedJSON:
+        row = (
+            self.db.query(*RECIPE_PROJECTION.select(fields))
+            .filter(Recipe.id == recipe_id)
+            .first()
+        )
+        if row:
+            return VersionedJSON.of_entity(
+                RECIPE_NAMESPACE,
+                row,
+                RECIPE_PROJECTION.schema_for(fields),
+                RECIPE_PROJECTION.variant(fields),
+            )
         else:
             raise ErrorException(
                 code=status.HTTP_404_NOT_FOUND,
@@ -39,10 +299,46 @@ class RecipeRepository:
                 source=f"{self.repo_name}.get_recipe_by_id",
             )
 
-    def get_recipes_by_user(self, recipe_user_id: int) -> list[GetRecipeSchema]:
-        recipes = self.db.query(Recipe).filter(Recipe.user_id == recipe_user_id).all()
-        if recipes:
-            return [GetRecipeSchema.model_validate(recipe) for recipe in recipes]
+    @run_in_session
+    def get_recipe_version(self, recipe_id: int, fields: FieldSet = None) -> Version:
+        version_at = self.db.scalar(
+            select(Recipe.version_at).where(Recipe.id == recipe_id)
+        )
+        if version_at is None:
+            raise ErrorException(
+                code=status.HTTP_404_NOT_FOUND,
+                message="Recipe not found",
+                kind=ErrorKind.NOT_FOUND,
+                source=f"{self.repo_name}.get_recipe_version",
+            )
+        return Version.of_entity(
+            RECIPE_NAMESPACE, recipe_id, version_at, RECIPE_PROJECTION.variant(fields)
+        )
+
+    @run_in_session
+    def get_recipes_by_user(
+        self,
+        recipe_user_id: int,
+        pagination: Pagination = Pagination(),
+        fields: FieldSet = None,
+        view: RecipeView = RecipeView.FULL,
+    ) -> VersionedJSON:
+        projection = RECIPE_PROJECTIONS[view]
+        rows, next_cursor = paginate(
+            self.db.query(*projection.select(fields)).filter(
+                Recipe.user_id == recipe_user_id
+            ),
+            Recipe.id,
+            pagination,
+        )
+        if rows or pagination.after_id is not None:
+            return VersionedJSON.of_page(
+                RECIPE_NAMESPACE,
+                rows,
+                projection.schema_for(fields),
+                next_cursor,
+                projection.variant(fields),
+            )
         raise ErrorException(
             code=status.HTTP_404_NOT_FOUND,
             message="Recipe not found for the user",
@@ -50,6 +346,35 @@ class RecipeRepository:
             source=f"{self.repo_name}.get_recipes_by_user",
         )
 
+    @run_in_session
+    def get_recipes_by_user_version(
+        self,
+        recipe_user_id: int,
+        pagination: Pagination = Pagination(),
+        fields: FieldSet = None,
+        view: RecipeView = RecipeView.FULL,
+    ) -> Version:
+        rows, next_cursor = paginate(
+            self.db.query(Recipe.id, Recipe.version_at).filter(
+                Recipe.user_id == recipe_user_id
+            ),
+            Recipe.id,
+            pagination,
+        )
+        if rows or pagination.after_id is not None:
+            return Version.of_page(
+                RECIPE_NAMESPACE,
+                rows,
+                next_cursor,
+                RECIPE_PROJECTIONS[view].variant(fields),
+            )
+        raise ErrorException(
+            code=status.HTTP_404_NOT_FOUND,
+            message="Recipe not found for the user",
+            kind=ErrorKind.NOT_FOUND,
+            source=f"{self.repo_name}.get_recipes_by_user_version",
+        )
+
     def add_recipe(self, recipe: Recipe) -> GetRecipeSchema:
         self.db.add(recipe)
         self.db.commit()
@@ -88,6 +413,7 @@ class RecipeRepository:
             for item in items
         ]
 
+    @run_in_session
     def create_recipe(
         self, recipe_data: CreateRecipeSchema, current_user_id: int
     ) -> GetRecipeSchema:
@@ -120,6 +446,7 @@ class RecipeRepository:
                 source=f"{self.repo_name}.create_recipe",
             )
 
+    @run_in_session
     def delete_recipe_by_id(
         self, recipe_id: int, current_user_id: int
     ) -> DeleteRecipeSchema:
@@ -144,8 +471,10 @@ class RecipeRepository:
         response = DeleteRecipeSchema.model_validate(recipe)
         self.db.delete(recipe)
         self.db.commit()
+        self.invalidate(RECIPE_NAMESPACE, [recipe_id])
         return response
 
+    @run_in_session
     def update_recipe_by_id(
         self, recipe_id: int, recipe_data: UpdateRecipeSchema, current_user_id: int
     ) -> GetRecipeSchema:
@@ -176,7 +505,10 @@ class RecipeRepository:
             recipe.recipe_ingredients = self.make_recipe_ingredients(
                 recipe_data.ingredients
             )
+            # Ingredient rows alone would not move the recipe's ETag.
+            recipe.updated_at = func.statement_timestamp()
             self.db.commit()
+            self.invalidate(RECIPE_NAMESPACE, [recipe_id])
             self.db.refresh(recipe)
             return GetRecipeSchema.model_validate(recipe)
         except IntegrityError:
@@ -186,3 +518,225 @@ class RecipeRepository:
                 kind=ErrorKind.CONFLICT,
                 source=f"{self.repo_name},update_recipe",
             )
+
+    async def import_recipes(
+        self, lines: AsyncIterable[tuple[int, Any]], current_user_id: int
+    ) -> RecipeImportReportSchema:
+        """
+        Validate and load NDJSON recipe lines (or already decoded MessagePack
+        objects) as they arrive, one COPY batch at a time. Each batch commits
+        on its own; bad lines are reported by line number instead of failing
+        the import.
+        """
+        if await self.run(self.db.get, User, current_user_id) is None:
+            raise ErrorException(
+                code=status.HTTP_404_NOT_FOUND,
+                message="User not found",
+                kind=ErrorKind.NOT_FOUND,
+                source=f"{self.repo_name}.import_recipes",
+            )
+        report = RecipeImportReportSchema()
+        # ingredient id -> is_vegan, or None when it does not exist.
+        ingredient_cache: dict[int, bool | None] = {}
+        batch: list[tuple[int, CreateRecipeSchema]] = []
+        async for line, raw in lines:
+            try:
+                recipe = (
+                    CreateRecipeSchema.model_validate_json(raw)
+                    if isinstance(raw, bytes)
+                    else CreateRecipeSchema.model_validate(raw)
+                )
+                batch.append((line, recipe))
+            except ValidationError as exc:
+                add_import_error(report, line, format_validation_error(exc))
+                continue
+            if len(batch) == IMPORT_BATCH_SIZE:
+                await self.run(
+                    self.import_recipe_batch,
+                    batch,
+                    current_user_id,
+                    ingredient_cache,
+                    report,
+                )
+                batch = []
+        if batch:
+            await self.run(
+                self.import_recipe_batch,
+                batch,
+                current_user_id,
+                ingredient_cache,
+                report,
+            )
+        return report
+
+    def import_recipe_batch(
+        self,
+        batch: list[tuple[int, CreateRecipeSchema]],
+        current_user_id: int,
+        ingredient_cache: dict[int, bool | None],
+        report: RecipeImportReportSchema,
+    ) -> None:
+        unseen_ids = {
+            item.ingredient_id for _, recipe in batch for item in recipe.ingredients
+        } - ingredient_cache.keys()
+        if unseen_ids:
+            ingredient_cache.update(dict.fromkeys(unseen_ids))
+            ingredient_cache.update(
+                self.db.execute(
+                    select(Ingredient.id, Ingredient.is_vegan).where(
+                        Ingredient.id.in_(unseen_ids)
+                    )
+                ).all()
+            )
+
+        recipe_rows = []
+        ingredient_rows = []
+        names: dict[str, int] = {}
+        for line, recipe in batch:
+            ingredient_ids = [item.ingredient_id for item in recipe.ingredients]
+            missing_ids = sorted(
+                {
+                    ing_id
+                    for ing_id in ingredient_ids
+                    if ingredient_cache[ing_id] is None
+                }
+            )
+            if missing_ids:
+                add_import_error(report, line, f"Ingredients not found: {missing_ids}")
+            elif len(set(ingredient_ids)) != len(ingredient_ids):
+                add_import_error(report, line, "Duplicate ingredient in recipe")
+            elif recipe.name in names:
+                add_import_error(report, line, "Recipe name already exists")
+            else:
+                names[recipe.name] = line
+                recipe_rows.append(
+                    (
+                        line,
+                        recipe.name,
+                        recipe.cooking_time,
+                        recipe.difficulty_level.name,
+                        recipe.portions,
+                        recipe.instructions,
+                        all(ingredient_cache[ing_id] for ing_id in ingredient_ids),
+                    )
+                )
+                ingredient_rows.extend(
+                    (line, item.ingredient_id, item.quantity)
+                    for item in recipe.ingredients
+                )
+        if not recipe_rows:
+            return
+
+        connection = self.db.connection()
+        staged_recipe = recipe_import_staging.c
+        staged_ingredient = recipe_ingredient_import_staging.c
+        try:
+            staging_metadata.create_all(connection)
+            copy_rows(connection, recipe_import_staging, recipe_rows)
+            copy_rows(connection, recipe_ingredient_import_staging, ingredient_rows)
+
+            recipes = Recipe.__table__
+            inserted = connection.execute(
+                pg_insert(recipes)
+                .from_select(
+                    [
+                        "name",
+                        "cooking_time",
+                        "difficulty_level",
+                        "portions",
+                        "instructions",
+                        "is_vegan",
+                        "user_id",
+                    ],
+                    select(
+                        staged_recipe.name,
+                        staged_recipe.cooking_time,
+                        cast(
+                            staged_recipe.difficulty_level,
+                            recipes.c.difficulty_level.type,
+                        ),
+                        staged_recipe.portions,
+                        staged_recipe.instructions,
+                        staged_recipe.is_vegan,
+                        literal(current_user_id),
+                    ).order_by(staged_recipe.line),
+                )
+                .on_conflict_do_nothing(index_elements=["name"])
+                .returning(recipes.c.name, recipes.c.id)
+            )
+            recipe_ids = dict(inserted.all())
+            if recipe_ids:
+                # Join on the recipes just inserted only: a skipped line shares
+                # its name with a recipe that already existed.
+                connection.execute(
+                    insert(RecipeIngredient.__table__).from_select(
+                        ["recipe_id", "ingredient_id", "quantity"],
+                        select(
+                            recipes.c.id,
+                            staged_ingredient.ingredient_id,
+                            staged_ingredient.quantity,
+                        )
+                        .join(
+                            recipe_import_staging,
+                            staged_recipe.line == staged_ingredient.line,
+                        )
+                        .join(recipes, recipes.c.name == staged_recipe.name)
+                        .where(recipes.c.id.in_(recipe_ids.values())),
+                    )
+                )
+                connection.execute(
+                    update(recipes)
+                    .where(recipes.c.id.in_(recipe_ids.values()))
+                    .values(
+                        search_vector=search_vector_expression(),
+                        updated_at=recipes.c.updated_at,
+                    )
+                )
+            staging_metadata.drop_all(connection)
+            self.db.commit()
+        except IntegrityError:
+            self.db.rollback()
+            for line, *_ in recipe_rows:
+                add_import_error(
+                    report, line, "Batch conflicted with concurrent changes"
+                )
+            return
+
+        report.imported += len(recipe_ids)
+        for name, line in names.items():
+            if name not in recipe_ids:
+                add_import_error(report, line, "Recipe name already exists")
+
+    async def export_recipes(self) -> AsyncIterator[bytes]:
+        """
+        Yield every recipe as NDJSON, reading through a server-side cursor one
+        batch at a time so memory stays flat however large the catalogue is.
+        """
+        result = await self.run(self.open_recipe_export)
+        try:
+            while chunk := await self.run(self.read_recipe_export, result):
+                yield chunk
+        finally:
+            await self.run(result.close)
+
+    def open_recipe_export(self) -> ScalarResult[Recipe]:
+        return self.db.scalars(
+            select(Recipe)
+            .options(*RECIPE_LOADER_OPTIONS)
+            .order_by(Recipe.id)
+            .execution_options(yield_per=EXPORT_BATCH_SIZE)
+        )
+
+    def read_recipe_export(self, result: ScalarResult[Recipe]) -> bytes:
+        recipes = result.fetchmany(EXPORT_BATCH_SIZE)
+        chunk = b"".join(
+            GetRecipeSchema.model_validate(recipe)
+            .model_dump_json(by_alias=True)
+            .encode()
+            + b"\n"
+            for recipe in recipes
+        )
+        # Exported rows are never touched again; keep the identity map empty.
+        for recipe in recipes:
+            self.db.expunge(recipe)
+        return chunk
@@ -0,0 +1,59 @@
+import functools
+from typing import Any, Awaitable, Callable, Iterable, ParamSpec, TypeVar
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+from src.core.cache import entity_cache
+from src.db.postgresql import run_sync
+
+P = ParamSpec("P")
+T = TypeVar("T")
+
+
+class BaseRepository:
+    """
+    Base repository: ORM logic is written once against a synchronous
+    ``Session`` and executed off the event loop, either on the async driver
+    (``AsyncSession``) or in the threadpool (plain ``Session``).
+    """
+
+    def __init__(self, db: Session | AsyncSession):
+        self.session = db
+        self.db: Session = db.sync_session if isinstance(db, AsyncSession) else db
+        # (namespace, ids) to evict, or (namespace, None) for all of it.
+        self.stale_entities: list[tuple[str, list[int | str] | None]] = []
+
+    async def run(self, fn: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+        return await run_sync(self.session, lambda _: fn(*args, **kwargs))
+
+    def invalidate(self, namespace: str, entity_ids: Iterable[int | str]) -> None:
+        """Queue a cache eviction, applied once the running method returns."""
+        self.stale_entities.append((namespace, list(entity_ids)))
+
+    def invalidate_namespace(self, namespace: str) -> None:
+        self.stale_entities.append((namespace, None))
+
+    async def flush_invalidations(self) -> None:
+        stale, self.stale_entities = self.stale_entities, []
+        for namespace, entity_ids in stale:
+            if entity_ids is None:
+                await entity_cache.invalidate_namespace(namespace)
+            else:
+                await entity_cache.invalidate(namespace, entity_ids)
+
+
+def run_in_session(
+    method: Callable[P, T],
+) -> Callable[P, Awaitable[T]]:
+    """
+    Expose a synchronous repository method as a non-blocking coroutine.
+    Cache invalidations it queued are applied afterwards, on the event loop.
+    """
+
+    @functools.wraps(method)
+    async def wrapper(self: BaseRepository, *args: Any, **kwargs: Any) -> T:
+        try:
+            return await self.run(method, self, *args, **kwargs)
+        finally:
+            await self.flush_invalidations()
+
+    return wrapper
@@ -1,7 +1,12 @@
 from fastapi import Depends
 from src.core.dependencies import get_db
+from src.api.common.dependencies import fields_query
+from src.api.users.schemas import GetUserSchema
 from src.api.users.services import UserRepository
 
 
 def get_user_repository(db=Depends(get_db)) -> UserRepository:
     return UserRepository(db)
+
+
+get_user_fields = fields_query(GetUserSchema)
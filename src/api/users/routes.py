@@ -1,5 +1,5 @@
 from typing import Annotated
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, Depends, Request
 from src.api.auth import services
 from src.api.users.schemas import (
     CreateUserSchema,
@@ -7,7 +7,16 @@ from src.api.users.schemas import (
     UpdateUserSchema,
 )
 from src.api.users.services import UserRepository
-from src.api.users.dependencies import get_user_repository
+from src.api.users.dependencies import get_user_fields, get_user_repository
+from src.api.common.conditional import (
+    conditional_entity_response,
+    conditional_response,
+)
+from src.api.common.dependencies import get_pagination
+from src.api.common.fields import FieldSet
+from src.api.common.pagination import Pagination
+from src.api.common.schemas import PageSchema
+from src.core.cache import USER_NAMESPACE
 from src.core.schemas import ErrorResponse
 from src.db.models.users import User
 
@@ -16,30 +25,53 @@ router = APIRouter()
 
 @router.get(
     "/",
-    response_model=list[GetUserSchema],
+    response_model=PageSchema[GetUserSchema],
     responses={
+        304: {"description": "Not modified"},
+        422: {
+            "model": ErrorResponse,
+            "description": "Invalid pagination cursor or fields",
+        },
         500: {"model": ErrorResponse, "description": "Internal server error"},
     },
 )
 async def get_users(
+    request: Request,
     user_repository: UserRepository = Depends(get_user_repository),
-) -> list[GetUserSchema]:
-    return user_repository.get_all_users()
+    pagination: Pagination = Depends(get_pagination),
+    fields: FieldSet = Depends(get_user_fields),
+):
+    return await conditional_response(
+        request,
+        lambda: user_repository.get_all_users(pagination, fields),
+        lambda: user_repository.get_all_users_version(pagination, fields),
+    )
 
 
 @router.get(
     "/{user_id}",
     response_model=GetUserSchema,
     responses={
+        304: {"description": "Not modified"},
         404: {"model": ErrorResponse, "description": "User not found"},
+        422: {"model": ErrorResponse, "description": "Invalid fields"},
         500: {"model": ErrorResponse, "description": "Internal server error"},
     },
 )
 async def get_user(
-    user_id: int, user_repository: UserRepository = Depends(get_user_repository)
+    request: Request,
+    user_id: int,
+    user_repository: UserRepository = Depends(get_user_repository),
+    fields: FieldSet = Depends(get_user_fields),
 ):
-    user = user_repository.get_user_by_id(user_id)
-    return user
+    return await conditional_entity_response(
+        request,
+        USER_NAMESPACE,
+        user_id,
+        lambda: user_repository.get_user_by_id(user_id, fields),
+        lambda: user_repository.get_user_version(user_id, fields),
+        cached=fields is None,
+    )
 
 
 @router.post(
@@ -59,7 +91,7 @@ async def create_user(
     user: CreateUserSchema,
     user_repository: UserRepository = Depends(get_user_repository),
 ) -> GetUserSchema:
-    return user_repository.create_user(user)
+    return await user_repository.create_user(user)
 
 
 @router.put(
@@ -79,7 +111,7 @@ async def update_user(
     user: UpdateUserSchema,
     user_repository: UserRepository = Depends(get_user_repository),
 ) -> GetUserSchema:
-    return user_repository.update_user(user_id, user)
+    return await user_repository.update_user(user_id, user)
 
 
 @router.get(
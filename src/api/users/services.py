@@ -1,6 +1,11 @@
 from fastapi import HTTPException, status
+from sqlalchemy import select
 from sqlalchemy.exc import IntegrityError
-from sqlalchemy.orm import Session
+from src.api.common.conditional import Version, VersionedJSON
+from src.api.common.fields import FieldSet, Projection
+from src.api.common.pagination import Pagination, paginate
+from src.api.services import BaseRepository, run_in_session
+from src.core.cache import PRINCIPAL_NAMESPACE, USER_NAMESPACE
 from src.core.exceptions import ErrorException
 from src.core.enums import ErrorKind
 from src.api.users.schemas import (
@@ -9,25 +14,66 @@ from src.api.users.schemas import (
     UpdateUserSchema,
 )
 from src.db.models.users import User
-from src.core.security import hash_password
+from src.core.security import password_hasher
 
+USER_PROJECTION = Projection(
+    GetUserSchema,
+    User.version_at,
+    username=User.username,
+    email=User.email,
+    full_name=User.full_name,
+    is_active=User.is_active,
+    id=User.id,
+    created_at=User.created_at,
+    updated_at=User.updated_at,
+)
 
-class UserRepository:
-    def __init__(self, db: Session):
-        self.db = db
 
+class UserRepository(BaseRepository):
     @property
     def repo_name(self) -> str:
         return "UserRepository"
 
-    def get_all_users(self) -> list[GetUserSchema]:
-        users = self.db.query(User).all()
-        return [GetUserSchema.model_validate(user) for user in users]
+    @run_in_session
+    def get_all_users(
+        self, pagination: Pagination = Pagination(), fields: FieldSet = None
+    ) -> VersionedJSON:
+        rows, next_cursor = paginate(
+            self.db.query(*USER_PROJECTION.select(fields)), User.id, pagination
+        )
+        return VersionedJSON.of_page(
+            USER_NAMESPACE,
+            rows,
+            USER_PROJECTION.schema_for(fields),
+            next_cursor,
+            USER_PROJECTION.variant(fields),
+        )
 
-    def get_user_by_id(self, user_id: int) -> GetUserSchema | None:
-        user = self.db.query(User).filter(User.id == user_id).first()
-        if user:
-            return GetUserSchema.model_validate(user)
+    @run_in_session
+    def get_all_users_version(
+        self, pagination: Pagination = Pagination(), fields: FieldSet = None
+    ) -> Version:
+        rows, next_cursor = paginate(
+            self.db.query(User.id, User.version_at), User.id, pagination
+        )
+        return Version.of_page(
+            USER_NAMESPACE, rows, next_cursor, USER_PROJECTION.variant(fields)
+        )
+
+    @run_in_session
+    def get_user_by_id(self, user_id: int, fields: FieldSet = None) -> VersionedJSON:
+        row = (
+            self.db.query(*USER_PROJECTION.select(fields))
+            .filter(User.id == user_id)
+            .first()
+        )
+        if row:
+            return VersionedJSON.of_entity(
+                USER_NAMESPACE,
+                row,
+                USER_PROJECTION.schema_for(fields),
+                USER_PROJECTION.variant(fields),
+            )
         else:
             raise ErrorException(
                 code=status.HTTP_404_NOT_FOUND,
@@ -36,6 +82,21 @@ class UserRepository:
                 source=f"{self.repo_name}.get_user_by_id",
             )
 
+    @run_in_session
+    def get_user_version(self, user_id: int, fields: FieldSet = None) -> Version:
+        version_at = self.db.scalar(select(User.version_at).where(User.id == user_id))
+        if version_at is None:
+            raise ErrorException(
+                code=status.HTTP_404_NOT_FOUND,
+                message="User not found",
+                kind=ErrorKind.NOT_FOUND,
+                source=f"{self.repo_name}.get_user_version",
+            )
+        return Version.of_entity(
+            USER_NAMESPACE, user_id, version_at, USER_PROJECTION.variant(fields)
+        )
+
+    @run_in_session
     def get_user_by_username(self, username: str) -> GetUserSchema | None:
         user = self.db.query(User).filter(User.username == username).first()
         if user:
@@ -54,9 +115,15 @@ class UserRepository:
         self.db.refresh(user)
         return GetUserSchema.model_validate(user)
 
-    def create_user(self, user_data: CreateUserSchema) -> GetUserSchema:
+    async def create_user(self, user_data: CreateUserSchema) -> GetUserSchema:
+        hashed_password = await password_hasher.hash(user_data.password)
+        return await self.insert_user(user_data, hashed_password)
+
+    @run_in_session
+    def insert_user(
+        self, user_data: CreateUserSchema, hashed_password: str
+    ) -> GetUserSchema:
         try:
-            hashed_password = hash_password(user_data.password)
             new_user = User(
                 username=user_data.username,
                 email=user_data.email,
@@ -80,10 +147,12 @@ class UserRepository:
                 source=f"{self.repo_name}.create_user",
             )
 
+    @run_in_session
     def update_user(self, user_id: int, user_data: UpdateUserSchema) -> GetUserSchema:
         user = self.db.query(User).filter(User.id == user_id).first()
         if not user:
             raise HTTPException(status_code=404, detail="User not found")
+        old_username = user.username
         try:
             if user_data.username is not None:
                 user.username = user_data.username
@@ -94,6 +163,9 @@ class UserRepository:
             if user_data.is_active is not None:
                 user.is_active = user_data.is_active
             self.db.commit()
+            self.invalidate(USER_NAMESPACE, [user_id])
+            # Tokens carry the username, so a rename must drop the old entry too.
+            self.invalidate(PRINCIPAL_NAMESPACE, {old_username, user.username})
             self.db.refresh(user)
             return GetUserSchema.model_validate(user)
         except IntegrityError:
@@ -0,0 +1,63 @@
+"""
+Operational commands, run as ``python -m src.cli <command>``.
+
+    python -m src.cli import-recipes recipes.ndjson --user-id 1
+"""
+
+import argparse
+import asyncio
+import sys
+from contextlib import asynccontextmanager
+from typing import AsyncIterator
+import anyio
+from src.api.common.ndjson import iter_ndjson_lines
+from src.api.recipes.services import RecipeRepository
+from src.core.dependencies import get_db
+from src.core.exceptions import ErrorException
+from src.core.logging import setup_logging
+
+READ_CHUNK_SIZE = 64 * 1024
+
+
+async def read_chunks(path: str) -> AsyncIterator[bytes]:
+    if path == "-":
+        source = anyio.wrap_file(sys.stdin.buffer)
+    else:
+        source = await anyio.open_file(path, "rb")
+    async with source:
+        while chunk := await source.read(READ_CHUNK_SIZE):
+            yield chunk
+
+
+async def import_recipes(path: str, user_id: int) -> int:
+    async with asynccontextmanager(get_db)() as db:
+        try:
+            report = await RecipeRepository(db).import_recipes(
+                iter_ndjson_lines(read_chunks(path)), user_id
+            )
+        except ErrorException as exc:
+            print(exc.message, file=sys.stderr)
+            return 1
+    print(report.model_dump_json(indent=2))
+    return 1 if report.failed else 0
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m src.cli")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    import_parser = commands.add_parser(
+        "import-recipes", help="Stream an NDJSON file of recipes into the database"
+    )
+    import_parser.add_argument("path", help="NDJSON file, or - for stdin")
+    import_parser.add_argument(
+        "--user-id", type=int, required=True, help="Owner of the imported recipes"
+    )
+
+    args = parser.parse_args(argv)
+    setup_logging()
+    return asyncio.run(import_recipes(args.path, args.user_id))
+
+
+if __name__ == "__main__":
+    sys.exit(main())
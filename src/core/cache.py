@@ -0,0 +1,529 @@
+import asyncio
+import json
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from dataclasses import asdict, dataclass, field
+from typing import Awaitable, Callable, Iterable, Sequence
+from uuid import uuid4
+from redis.asyncio import Redis
+from redis.asyncio.client import Pipeline
+from redis.exceptions import RedisError, WatchError
+from src.core.config import config
+from src.core.logging import logger
+from src.core.metrics import CallbackMetric, Sample, registry
+
+RECIPE_NAMESPACE = "recipe"
+INGREDIENT_NAMESPACE = "ingredient"
+CATEGORY_NAMESPACE = "category"
+USER_NAMESPACE = "user"
+PRINCIPAL_NAMESPACE = "principal"
+
+BUS_RECONNECT_SECONDS = 1.0
+BUS_MAX_RECONNECT_SECONDS = 30.0
+REDIS_SCAN_COUNT = 500
+
+
+class CacheDriver(ABC):
+    """
+    Storage behind ``EntityCache``: raw bytes under string keys, plus the
+    generation every invalidation moves, kept where the entries are so a
+    store can be refused when its generation is no longer current.
+    """
+
+    name: str
+
+    @abstractmethod
+    async def get(self, key: str) -> bytes | None: ...
+
+    @abstractmethod
+    async def set(self, key: str, value: bytes, ttl: float) -> None: ...
+
+    @abstractmethod
+    async def generation(self) -> int: ...
+
+    @abstractmethod
+    async def bump_generation(self) -> None: ...
+
+    @abstractmethod
+    async def set_if_current(
+        self, key: str, value: bytes, ttl: float, generation: int
+    ) -> bool:
+        """Store ``value`` unless the generation moved past ``generation``."""
+
+    @abstractmethod
+    async def delete(self, keys: Sequence[str]) -> int: ...
+
+    @abstractmethod
+    async def delete_prefix(self, prefix: str) -> int: ...
+
+    async def clear(self) -> None:
+        await self.delete_prefix("")
+
+    async def stats(self) -> dict[str, int]:
+        return {}
+
+    async def close(self) -> None:
+        pass
+
+
+class MemoryCacheDriver(CacheDriver):
+    """Bounded per-process LRU with per-entry expiry."""
+
+    name = "memory"
+
+    def __init__(self, max_entries: int, clock: Callable[[], float] = time.monotonic):
+        self.max_entries = max_entries
+        self.clock = clock
+        self.evictions = 0
+        self.expirations = 0
+        self._generation = 0
+        self._entries: OrderedDict[str, tuple[float, bytes]] = OrderedDict()
+
+    async def get(self, key: str) -> bytes | None:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        expires_at, value = entry
+        if expires_at <= self.clock():
+            del self._entries[key]
+            self.expirations += 1
+            return None
+        self._entries.move_to_end(key)
+        return value
+
+    async def set(self, key: str, value: bytes, ttl: float) -> None:
+        self._entries[key] = (self.clock() + ttl, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    async def generation(self) -> int:
+        return self._generation
+
+    async def bump_generation(self) -> None:
+        self._generation += 1
+
+    async def set_if_current(
+        self, key: str, value: bytes, ttl: float, generation: int
+    ) -> bool:
+        if generation != self._generation:
+            return False
+        await self.set(key, value, ttl)
+        return True
+
+    async def delete(self, keys: Sequence[str]) -> int:
+        return sum(self._entries.pop(key, None) is not None for key in keys)
+
+    async def delete_prefix(self, prefix: str) -> int:
+        keys = [key for key in self._entries if key.startswith(prefix)]
+        return await self.delete(keys)
+
+    async def clear(self) -> None:
+        self._entries.clear()
+
+    async def stats(self) -> dict[str, int]:
+        return {
+            "size": len(self._entries),
+            "max_entries": self.max_entries,
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+        }
+
+
+class RedisCacheDriver(CacheDriver):
+    """
+    Cache shared by every worker and replica. Entries expire in Redis and
+    eviction follows the server's maxmemory policy. The generation is a
+    Redis counter too, and stores compare-and-set against it under WATCH,
+    so a slow reader on one worker cannot put back a row another worker
+    invalidated while it was loading.
+
+    Each namespace's keys are also listed in a Redis set, so invalidating a
+    namespace deletes just those rather than SCANning a keyspace that may be
+    shared; only ``clear`` and ``stats`` walk it.
+    """
+
+    name = "redis"
+
+    def __init__(self, client: Redis, key_prefix: str):
+        self.client = client
+        self.key_prefix = key_prefix
+        self.generation_key = f"{key_prefix}generation"
+        self.index_prefix = f"{key_prefix}namespace:"
+
+    def index_key(self, key: str) -> str:
+        return self.index_prefix + key.partition(":")[0]
+
+    def queue_set(self, pipe: Pipeline, key: str, value: bytes, ttl: float) -> None:
+        px = int(ttl * 1000)
+        pipe.set(self.key_prefix + key, value, px=px)
+        # The index outlives every entry it lists: GT extends its expiry, NX
+        # sets one on a new index. UNLINK skips members that already expired.
+        pipe.sadd(self.index_key(key), self.key_prefix + key)
+        pipe.pexpire(self.index_key(key), px, gt=True)
+        pipe.pexpire(self.index_key(key), px, nx=True)
+
+    async def get(self, key: str) -> bytes | None:
+        return await self.client.get(self.key_prefix + key)
+
+    async def set(self, key: str, value: bytes, ttl: float) -> None:
+        async with self.client.pipeline() as pipe:
+            self.queue_set(pipe, key, value, ttl)
+            await pipe.execute()
+
+    async def generation(self) -> int:
+        return int(await self.client.get(self.generation_key) or 0)
+
+    async def bump_generation(self) -> None:
+        await self.client.incr(self.generation_key)
+
+    async def set_if_current(
+        self, key: str, value: bytes, ttl: float, generation: int
+    ) -> bool:
+        async with self.client.pipeline() as pipe:
+            try:
+                await pipe.watch(self.generation_key)
+                if int(await pipe.get(self.generation_key) or 0) != generation:
+                    return False
+                pipe.multi()
+                self.queue_set(pipe, key, value, ttl)
+                await pipe.execute()
+                return True
+            except WatchError:
+                # Invalidated between the comparison and the write.
+                return False
+
+    async def delete(self, keys: Sequence[str]) -> int:
+        if not keys:
+            return 0
+        return await self.client.unlink(*(self.key_prefix + key for key in keys))
+
+    async def delete_prefix(self, prefix: str) -> int:
+        """
+        Delete a namespace (``prefix`` is ``"<namespace>:"``) from its index;
+        any other prefix falls back to SCAN.
+        """
+        namespace, separator, rest = prefix.partition(":")
+        if not namespace or not separator or rest:
+            return await self.scan_delete(prefix)
+        # Read and drop the index at once: a store landing in between would
+        # otherwise be listed nowhere, and survive the next invalidation.
+        async with self.client.pipeline() as pipe:
+            pipe.smembers(self.index_key(prefix))
+            pipe.unlink(self.index_key(prefix))
+            keys, _ = await pipe.execute()
+        deleted = 0
+        keys = list(keys)
+        for start in range(0, len(keys), REDIS_SCAN_COUNT):
+            deleted += await self.client.unlink(*keys[start : start + REDIS_SCAN_COUNT])
+        return deleted
+
+    async def scan_delete(self, prefix: str) -> int:
+        deleted = 0
+        batch = []
+        async for key in self.client.scan_iter(
+            match=f"{self.key_prefix}{prefix}*", count=REDIS_SCAN_COUNT
+        ):
+            # Deleting the counter would reset it, and an old token could
+            # then match again.
+            if key == self.generation_key.encode():
+                continue
+            batch.append(key)
+            if len(batch) == REDIS_SCAN_COUNT:
+                deleted += await self.client.unlink(*batch)
+                batch = []
+        if batch:
+            deleted += await self.client.unlink(*batch)
+        return deleted
+
+    async def clear(self) -> None:
+        await self.scan_delete("")
+
+    async def stats(self) -> dict[str, int]:
+        """Entries under this prefix, counted with SCAN: for health checks."""
+        size = 0
+        async for key in self.client.scan_iter(
+            match=f"{self.key_prefix}*", count=REDIS_SCAN_COUNT
+        ):
+            size += key != self.generation_key.encode() and not key.startswith(
+                self.index_prefix.encode()
+            )
+        return {"size": size}
+
+    async def close(self) -> None:
+        await self.client.aclose()
+
+
+class RedisInvalidationBus:
+    """
+    Pub/sub fan-out of invalidations between workers that each keep a
+    ``MemoryCacheDriver``, so a write on one worker evicts everywhere.
+    """
+
+    def __init__(self, client: Redis, channel: str):
+        self.client = client
+        self.channel = channel
+        self.origin = uuid4().hex
+
+    async def publish(self, keys: Sequence[str] = (), prefix: str | None = None):
+        message = {"origin": self.origin, "keys": list(keys), "prefix": prefix}
+        try:
+            await self.client.publish(self.channel, json.dumps(message))
+        except RedisError as exc:
+            logger.warning(f"Cache invalidation was not broadcast: {exc}")
+
+    async def listen(
+        self,
+        apply: Callable[[Sequence[str], str | None], Awaitable[None]],
+        on_reconnect: Callable[[], Awaitable[None]],
+    ) -> None:
+        """
+        Apply other workers' invalidations until cancelled. A message that
+        cannot be applied counts as missed; connection errors reconnect
+        with exponential backoff. Nothing else ends the loop, since a worker
+        that stopped listening would serve stale entries until their TTL.
+        """
+        delay = BUS_RECONNECT_SECONDS
+        while True:
+            try:
+                async with self.client.pubsub() as pubsub:
+                    await pubsub.subscribe(self.channel)
+                    # Messages may have been missed while disconnected.
+                    await on_reconnect()
+                    delay = BUS_RECONNECT_SECONDS
+                    async for message in pubsub.listen():
+                        if message["type"] == "message":
+                            await self.receive(message["data"], apply, on_reconnect)
+            except (RedisError, OSError) as exc:
+                logger.warning(f"Cache invalidation bus disconnected: {exc}")
+            except Exception as exc:
+                logger.exception(f"Cache invalidation listener failed: {exc}")
+            await asyncio.sleep(delay)
+            delay = min(delay * 2, BUS_MAX_RECONNECT_SECONDS)
+
+    async def receive(
+        self,
+        data: bytes,
+        apply: Callable[[Sequence[str], str | None], Awaitable[None]],
+        on_missed: Callable[[], Awaitable[None]],
+    ) -> None:
+        try:
+            payload = json.loads(data)
+            if payload["origin"] != self.origin:
+                await apply(payload["keys"], payload["prefix"])
+        except Exception as exc:
+            logger.warning(f"Cache invalidation message not applied: {exc}")
+            await on_missed()
+
+    async def close(self) -> None:
+        await self.client.aclose()
+
+
+@dataclass
+class CacheStats:
+    """Kept by ``EntityCache`` itself, so they read the same for any driver."""
+
+    hits: int = 0
+    misses: int = 0
+    # namespace -> {"hits": n, "misses": n}: principal lookups ride on every
+    # authenticated request and would swamp the entity figures otherwise.
+    namespaces: dict[str, dict[str, int]] = field(default_factory=dict)
+    stores: int = 0
+    # Loads not stored because an invalidation overtook them.
+    stale_stores: int = 0
+    invalidations: int = 0
+    remote_invalidations: int = 0
+
+
+class EntityCache:
+    """
+    Read-through cache of serialized single-entity responses.
+
+    Keys are ``"<namespace>:<id>"``. Writers invalidate after their commit; a
+    load that started before an invalidation the driver has seen (this
+    process's, for memory; any worker's, for Redis) is not stored, so a
+    reader racing a writer cannot put the old row back.
+    """
+
+    def __init__(
+        self,
+        driver: CacheDriver,
+        ttl: float,
+        bus: RedisInvalidationBus | None = None,
+    ):
+        self.driver = driver
+        self.ttl = ttl
+        self.bus = bus
+        self.stats = CacheStats()
+        self._listener: asyncio.Task | None = None
+
+    @staticmethod
+    def key(namespace: str, entity_id: int | str) -> str:
+        return f"{namespace}:{entity_id}"
+
+    async def generation(self) -> int:
+        """Token to take before loading a value and hand back to ``set``."""
+        return await self.driver.generation()
+
+    async def get(self, key: str) -> bytes | None:
+        value = await self.driver.get(key)
+        counts = self.stats.namespaces.setdefault(
+            key.partition(":")[0], {"hits": 0, "misses": 0}
+        )
+        if value is None:
+            self.stats.misses += 1
+            counts["misses"] += 1
+        else:
+            self.stats.hits += 1
+            counts["hits"] += 1
+        return value
+
+    async def set(
+        self, key: str, value: bytes, generation: int, ttl: float | None = None
+    ) -> None:
+        if await self.driver.set_if_current(
+            key, value, self.ttl if ttl is None else ttl, generation
+        ):
+            self.stats.stores += 1
+        else:
+            self.stats.stale_stores += 1
+
+    async def get_or_load(
+        self, key: str, load: Callable[[], Awaitable[bytes]]
+    ) -> bytes:
+        value = await self.get(key)
+        if value is None:
+            generation = await self.generation()
+            value = await load()
+            await self.set(key, value, generation)
+        return value
+
+    async def invalidate(self, namespace: str, entity_ids: Sequence[int | str]) -> None:
+        if not entity_ids:
+            return
+        keys = [self.key(namespace, entity_id) for entity_id in entity_ids]
+        await self.driver.bump_generation()
+        self.stats.invalidations += await self.driver.delete(keys)
+        if self.bus:
+            await self.bus.publish(keys=keys)
+
+    async def invalidate_namespace(self, namespace: str) -> None:
+        prefix = f"{namespace}:"
+        await self.driver.bump_generation()
+        self.stats.invalidations += await self.driver.delete_prefix(prefix)
+        if self.bus:
+            await self.bus.publish(prefix=prefix)
+
+    async def apply_remote(self, keys: Sequence[str], prefix: str | None) -> None:
+        await self.driver.bump_generation()
+        deleted = await self.driver.delete(keys)
+        if prefix is not None:
+            deleted += await self.driver.delete_prefix(prefix)
+        self.stats.remote_invalidations += deleted
+
+    async def clear(self) -> None:
+        await self.driver.bump_generation()
+        await self.driver.clear()
+
+    async def start(self) -> None:
+        if self.bus and self._listener is None:
+            self._listener = asyncio.create_task(
+                self.bus.listen(self.apply_remote, on_reconnect=self.clear)
+            )
+
+    async def stop(self) -> None:
+        if self._listener is not None:
+            self._listener.cancel()
+            self._listener = None
+        if self.bus:
+            await self.bus.close()
+        await self.driver.close()
+
+    async def snapshot(self) -> dict[str, int | str]:
+        return {
+            "driver": self.driver.name,
+            **asdict(self.stats),
+            **await self.driver.stats(),
+        }
+
+
+def build_entity_cache() -> EntityCache:
+    if config.CACHE_BACKEND == "redis":
+        if not config.CACHE_REDIS_URL:
+            raise ValueError("CACHE_BACKEND=redis requires CACHE_REDIS_URL")
+        return EntityCache(
+            RedisCacheDriver(
+                Redis.from_url(config.CACHE_REDIS_URL), config.CACHE_KEY_PREFIX
+            ),
+            ttl=config.CACHE_TTL_SECONDS,
+        )
+    bus = None
+    if config.CACHE_REDIS_URL:
+        bus = RedisInvalidationBus(
+            Redis.from_url(config.CACHE_REDIS_URL),
+            f"{config.CACHE_KEY_PREFIX}invalidate",
+        )
+    return EntityCache(
+        MemoryCacheDriver(config.CACHE_MAX_ENTRIES),
+        ttl=config.CACHE_TTL_SECONDS,
+        bus=bus,
+    )
+
+
+entity_cache = build_entity_cache()
+
+
+def collect_lookups() -> Iterable[Sample]:
+    for namespace, counts in sorted(entity_cache.stats.namespaces.items()):
+        yield (namespace, "hit"), counts["hits"]
+        yield (namespace, "miss"), counts["misses"]
+
+
+def collect_hit_ratios() -> Iterable[Sample]:
+    for namespace, counts in sorted(entity_cache.stats.namespaces.items()):
+        yield (namespace,), counts["hits"] / (counts["hits"] + counts["misses"] or 1)
+
+
+registry.register(
+    CallbackMetric(
+        "entity_cache_requests_total",
+        "Entity cache lookups by namespace and result.",
+        collect_lookups,
+        ("namespace", "result"),
+        type="counter",
+    )
+)
+registry.register(
+    CallbackMetric(
+        "entity_cache_hit_ratio",
+        "Share of entity cache lookups served from the cache, by namespace.",
+        collect_hit_ratios,
+        ("namespace",),
+    )
+)
+registry.register(
+    CallbackMetric(
+        "entity_cache_stores_total",
+        "Loaded entries by whether they were stored or overtaken by a write.",
+        lambda: [
+            (("stored",), entity_cache.stats.stores),
+            (("stale",), entity_cache.stats.stale_stores),
+        ],
+        ("result",),
+        type="counter",
+    )
+)
+registry.register(
+    CallbackMetric(
+        "entity_cache_invalidations_total",
+        "Entries evicted by writes, by origin.",
+        lambda: [
+            (("local",), entity_cache.stats.invalidations),
+            (("remote",), entity_cache.stats.remote_invalidations),
+        ],
+        ("origin",),
+        type="counter",
+    )
+)
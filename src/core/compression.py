@@ -0,0 +1,273 @@
+import time
+import zlib
+from typing import Callable, Protocol, Sequence
+import brotli
+import zstandard
+from fastapi import Request
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+from src.core.config import config
+from src.core.metrics import Counter, HistogramMetric, registry
+
+# Scope key a route sets (see ``skip_compression``) to keep its body as is.
+SKIP_COMPRESSION = "skip_compression"
+
+COMPRESSIBLE_TYPES = (
+    "application/json",
+    "application/msgpack",
+    "application/x-ndjson",
+    "application/xml",
+    "application/javascript",
+    "image/svg+xml",
+    "text/",
+)
+# Proxies and browsers buffer event streams that arrive compressed.
+INCOMPRESSIBLE_TYPES = ("text/event-stream",)
+RATIO_BUCKETS = (0.05, 0.1, 0.2, 0.3, 0.4, 0.5, 0.6, 0.8, 1.0)
+
+compressed_bytes = registry.register(
+    Counter(
+        "http_response_compression_bytes_total",
+        "Response bytes before (in) and after (out) compression, by encoding.",
+        ("encoding", "direction"),
+    )
+)
+compression_cpu = registry.register(
+    Counter(
+        "http_response_compression_cpu_seconds_total",
+        "Thread CPU time spent compressing responses, by encoding.",
+        ("encoding",),
+    )
+)
+compression_ratio = registry.register(
+    HistogramMetric(
+        "http_response_compression_ratio",
+        "Compressed over original size of each compressed response.",
+        ("encoding",),
+        RATIO_BUCKETS,
+    )
+)
+
+
+class Compressor(Protocol):
+    def compress(self, data: bytes) -> bytes: ...
+
+    def flush(self) -> bytes:
+        """Emit everything so far, keeping the stream open."""
+        ...
+
+    def finish(self) -> bytes: ...
+
+
+class GzipCompressor:
+    def __init__(self):
+        self.compressor = zlib.compressobj(
+            config.COMPRESSION_GZIP_LEVEL, zlib.DEFLATED, zlib.MAX_WBITS | 16
+        )
+
+    def compress(self, data: bytes) -> bytes:
+        return self.compressor.compress(data)
+
+    def flush(self) -> bytes:
+        return self.compressor.flush(zlib.Z_SYNC_FLUSH)
+
+    def finish(self) -> bytes:
+        return self.compressor.flush()
+
+
+class BrotliCompressor:
+    def __init__(self):
+        self.compressor = brotli.Compressor(quality=config.COMPRESSION_BROTLI_QUALITY)
+
+    def compress(self, data: bytes) -> bytes:
+        return self.compressor.process(data)
+
+    def flush(self) -> bytes:
+        return self.compressor.flush()
+
+    def finish(self) -> bytes:
+        return self.compressor.finish()
+
+
+class ZstdCompressor:
+    def __init__(self):
+        self.compressor = zstandard.ZstdCompressor(
+            level=config.COMPRESSION_ZSTD_LEVEL
+        ).compressobj()
+
+    def compress(self, data: bytes) -> bytes:
+        return self.compressor.compress(data)
+
+    def flush(self) -> bytes:
+        return self.compressor.flush(zstandard.COMPRESSOBJ_FLUSH_BLOCK)
+
+    def finish(self) -> bytes:
+        return self.compressor.flush()
+
+
+COMPRESSORS: dict[str, Callable[[], Compressor]] = {
+    "zstd": ZstdCompressor,
+    "br": BrotliCompressor,
+    "gzip": GzipCompressor,
+}
+
+
+def negotiate_encoding(
+    accept_encoding: str | None, encodings: Sequence[str]
+) -> str | None:
+    """
+    The coding of ``encodings`` the client weighs highest, earlier ones
+    winning ties; ``None`` leaves the body uncompressed.
+    """
+    if not accept_encoding:
+        return None
+    qualities: dict[str, float] = {}
+    for coding in accept_encoding.split(","):
+        name, *params = coding.split(";")
+        quality = 1.0
+        for param in params:
+            key, _, value = param.partition("=")
+            if key.strip().lower() == "q":
+                try:
+                    quality = float(value)
+                except ValueError:
+                    quality = 0.0
+        qualities[name.strip().lower()] = quality
+    chosen, best = None, 0.0
+    for encoding in encodings:
+        quality = qualities.get(encoding, qualities.get("*", 0.0))
+        if quality > best:
+            chosen, best = encoding, quality
+    return chosen
+
+
+def is_compressible(headers: Headers) -> bool:
+    content_type = headers.get("content-type", "").lower()
+    return (
+        "content-encoding" not in headers
+        and "no-transform" not in headers.get("cache-control", "").lower()
+        and content_type.startswith(COMPRESSIBLE_TYPES)
+        and not content_type.startswith(INCOMPRESSIBLE_TYPES)
+    )
+
+
+def weaken_etag(headers: MutableHeaders) -> None:
+    etag = headers.get("etag")
+    if etag is not None and not etag.startswith("W/"):
+        headers["ETag"] = f"W/{etag}"
+
+
+def skip_compression(request: Request) -> None:
+    """
+    Route dependency that sends the response uncompressed, e.g. for bodies
+    carrying secrets next to request-controlled text (BREACH).
+    """
+    request.scope[SKIP_COMPRESSION] = True
+
+
+class CompressionMiddleware:
+    """
+    Compresses response bodies with the best of ``COMPRESSION_ENCODINGS``
+    the client accepts. Whole bodies under ``COMPRESSION_MIN_SIZE`` are left
+    alone; streamed ones are compressed chunk by chunk and flushed after
+    each, so clients still see progress. Bodies already encoded (or marked
+    no-transform) pass through.
+
+    Strong ETags become weak whenever the client accepts a coding, whether
+    or not this body was compressed: the bytes may differ, the
+    representation does not, and a 304 (which has no body to judge by)
+    must carry the same validator as the 200 it revalidates.
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or not config.COMPRESSION_ENABLED:
+            await self.app(scope, receive, send)
+            return
+        encoding = negotiate_encoding(
+            Headers(scope=scope).get("accept-encoding"), config.COMPRESSION_ENCODINGS
+        )
+        start: Message | None = None
+        compressor: Compressor | None = None
+        passthrough = False
+        cpu = 0.0
+        size_in = size_out = 0
+
+        def compress(step: Callable[[], bytes]) -> bytes:
+            nonlocal cpu, size_out
+            started = time.thread_time()
+            data = step()
+            cpu += time.thread_time() - started
+            size_out += len(data)
+            return data
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal start, compressor, passthrough, size_in
+            if passthrough:
+                await send(message)
+                return
+            if message["type"] == "http.response.start":
+                start = message
+                return
+            if message["type"] != "http.response.body":
+                await send(message)
+                return
+
+            body = message.get("body", b"")
+            more_body = message.get("more_body", False)
+            if compressor is None:
+                headers = MutableHeaders(scope=start)
+                if (
+                    encoding is not None
+                    and not scope.get(SKIP_COMPRESSION)
+                    and "content-encoding" not in headers
+                ):
+                    weaken_etag(headers)
+                length = headers.get("content-length")
+                if length is None and not more_body:
+                    length = len(body)
+                # Streams of unknown length are worth compressing.
+                eligible = (
+                    not scope.get(SKIP_COMPRESSION)
+                    and is_compressible(headers)
+                    and (length is None or int(length) >= config.COMPRESSION_MIN_SIZE)
+                )
+                if eligible:
+                    headers.add_vary_header("Accept-Encoding")
+                if not eligible or encoding is None:
+                    passthrough = True
+                    await send(start)
+                    await send(message)
+                    return
+                compressor = COMPRESSORS[encoding]()
+                headers["Content-Encoding"] = encoding
+                if more_body:
+                    del headers["Content-Length"]
+                    await send(start)
+                    start = None
+
+            size_in += len(body)
+            finish = compressor.flush if more_body else compressor.finish
+            data = compress(lambda: compressor.compress(body) + finish())
+            if start is not None:
+                # The whole body came in one message, so its length is known.
+                MutableHeaders(scope=start)["Content-Length"] = str(len(data))
+                await send(start)
+                start = None
+            await send(
+                {"type": "http.response.body", "body": data, "more_body": more_body}
+            )
+            if not more_body:
+                observe(encoding, size_in, size_out, cpu)
+
+        await self.app(scope, receive, send_wrapper)
+
+
+def observe(encoding: str, size_in: int, size_out: int, cpu: float) -> None:
+    compressed_bytes.inc(encoding, "in", amount=size_in)
+    compressed_bytes.inc(encoding, "out", amount=size_out)
+    compression_cpu.inc(encoding, amount=cpu)
+    if size_in:
+        compression_ratio.labels(encoding).observe(size_out / size_in)
@@ -1,3 +1,4 @@
+from typing import Literal
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
 
@@ -13,6 +14,41 @@ class Config(BaseConfig):
     POSTGRES_PORT: int
     POSTGRES_DB: str
     DB_URL: str
+    DB_ASYNC: bool = True
+    DB_POOL_SIZE: int = 10
+    DB_MAX_OVERFLOW: int = 20
+    CACHE_MAX_ENTRIES: int = 10_000
+    CACHE_TTL_SECONDS: float = 60.0
+    # "memory" keeps a cache per worker, kept coherent over Redis pub/sub when
+    # CACHE_REDIS_URL is set; "redis" shares one cache between all workers.
+    CACHE_BACKEND: Literal["memory", "redis"] = "memory"
+    CACHE_REDIS_URL: str | None = None
+    CACHE_KEY_PREFIX: str = "sintagies:cache:"
+    # Bounds how long a deactivated user keeps working on a worker that missed
+    # the invalidation (e.g. while the Redis bus is down).
+    PRINCIPAL_TTL_SECONDS: float = 30.0
+    # Argon2id cost; changing it rehashes each password on its next login.
+    PASSWORD_HASH_TIME_COST: int = 3
+    PASSWORD_HASH_MEMORY_COST: int = 65536
+    PASSWORD_HASH_PARALLELISM: int = 4
+    PASSWORD_HASH_WORKERS: int = 4
+    PASSWORD_HASH_MAX_PENDING: int = 64
+    LOOP_MONITOR_ENABLED: bool = True
+    LOOP_MONITOR_INTERVAL_SECONDS: float = 0.1
+    # Stalls longer than this are logged with the loop thread's stack.
+    LOOP_BLOCK_THRESHOLD_SECONDS: float = 0.1
+    # Adds db/db_queries/serialize timings to every response.
+    SERVER_TIMING: bool = True
+    PROFILE_QUERY_BUDGET: int = 20
+    PROFILE_DB_TIME_BUDGET_SECONDS: float = 0.25
+    COMPRESSION_ENABLED: bool = True
+    # Offered in this order of preference when the client weighs them equally.
+    COMPRESSION_ENCODINGS: list[Literal["zstd", "br", "gzip"]] = ["zstd", "br", "gzip"]
+    # Smaller whole bodies gain less than the CPU and header bytes cost.
+    COMPRESSION_MIN_SIZE: int = 1024
+    COMPRESSION_GZIP_LEVEL: int = 6
+    COMPRESSION_BROTLI_QUALITY: int = 4
+    COMPRESSION_ZSTD_LEVEL: int = 3
     SECRET_KEY: str
     ALGORITHM: str
     ACCESS_TOKEN_EXPIRE_MINUTES: int
@@ -1,11 +1,17 @@
 import httpx
 from fastapi import Request
-from src.db.postgresql import get_db as get_database
+from src.core.config import config
+from src.db.postgresql import AsyncSessionLocal, SessionLocal
 
 
 def get_http_client(request: Request) -> httpx.AsyncClient:
     return request.app.state.http
 
 
-def get_db():
-    yield from get_database()
+async def get_db():
+    if config.DB_ASYNC:
+        async with AsyncSessionLocal() as db:
+            yield db
+    else:
+        with SessionLocal() as db:
+            yield db
@@ -7,3 +7,4 @@ class ErrorKind(StrEnum):
     CONFLICT = "ConflictError"
     VALIDATION = "ValidationError"
     AUTHORIZATION = "AuthorizationError"
+    UNAVAILABLE = "UnavailableError"
@@ -8,8 +8,10 @@ class ErrorException(Exception):
         message: str,
         kind: ErrorKind,
         source: str | None = None,
+        headers: dict[str, str] | None = None,
     ):
         self.code = code
         self.message = message
         self.kind = kind
         self.source = source
+        self.headers = headers
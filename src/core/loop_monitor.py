@@ -0,0 +1,149 @@
+import asyncio
+import sys
+import threading
+import time
+import traceback
+from contextvars import ContextVar
+from dataclasses import dataclass
+from starlette.types import ASGIApp, Receive, Scope, Send
+from src.core.config import config
+from src.core.logging import logger
+from src.core.metrics import CallbackHistogram, CallbackMetric, Histogram, registry
+
+current_route: ContextVar[str | None] = ContextVar("current_route", default=None)
+
+
+class RouteContextMiddleware:
+    """Tag each request's task with ``"<METHOD> <path>"`` for block reports."""
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        token = current_route.set(f"{scope['method']} {scope['path']}")
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            current_route.reset(token)
+
+
+@dataclass(frozen=True)
+class BlockReport:
+    route: str | None
+    blocked_for: float
+    stack: str
+
+
+class LoopMonitor:
+    """
+    Measures event-loop lag and reports what is blocking it.
+
+    A sampler task sleeps ``interval`` and records how late it wakes up. A
+    watchdog thread notices when that heartbeat stops for longer than
+    ``threshold`` and, while the loop is still stuck, logs the loop thread's
+    stack and the route of the task that is running.
+    """
+
+    def __init__(self, interval: float, threshold: float):
+        self.interval = interval
+        self.threshold = threshold
+        self.lag = Histogram()
+        self.blocks = 0
+        self.last_block: BlockReport | None = None
+        self._loop: asyncio.AbstractEventLoop | None = None
+        self._loop_thread_id: int | None = None
+        self._heartbeat = 0.0
+        self._sampler: asyncio.Task | None = None
+        self._watchdog: threading.Thread | None = None
+        self._stopped = threading.Event()
+
+    async def start(self) -> None:
+        if self._sampler is not None:
+            return
+        self._loop = asyncio.get_running_loop()
+        self._loop_thread_id = threading.get_ident()
+        self._heartbeat = time.monotonic()
+        self._stopped.clear()
+        self._sampler = asyncio.create_task(self._sample())
+        self._watchdog = threading.Thread(
+            target=self._watch, name="loop-monitor", daemon=True
+        )
+        self._watchdog.start()
+
+    async def stop(self) -> None:
+        self._stopped.set()
+        if self._sampler is not None:
+            self._sampler.cancel()
+            self._sampler = None
+        if self._watchdog is not None:
+            self._watchdog.join()
+            self._watchdog = None
+
+    async def _sample(self) -> None:
+        while True:
+            started = time.monotonic()
+            await asyncio.sleep(self.interval)
+            self._heartbeat = now = time.monotonic()
+            self.lag.observe(max(0.0, now - started - self.interval))
+
+    def _watch(self) -> None:
+        reported = None
+        while not self._stopped.wait(self.threshold / 2):
+            heartbeat = self._heartbeat
+            blocked_for = time.monotonic() - heartbeat - self.interval
+            if blocked_for > self.threshold and heartbeat != reported:
+                reported = heartbeat
+                self._report(blocked_for)
+
+    def _report(self, blocked_for: float) -> None:
+        frame = sys._current_frames().get(self._loop_thread_id)
+        report = BlockReport(
+            route=self._running_route(),
+            blocked_for=blocked_for,
+            stack="".join(traceback.format_stack(frame)) if frame else "",
+        )
+        self.blocks += 1
+        self.last_block = report
+        logger.warning(
+            f"Event loop blocked for over {blocked_for:.3f}s "
+            f"in {report.route or 'a non-request callback'}:\n{report.stack}"
+        )
+
+    def _running_route(self) -> str | None:
+        # asyncio has no public way to read another thread's current task.
+        task = asyncio.tasks._current_tasks.get(self._loop)
+        return None if task is None else task.get_context().get(current_route)
+
+    def snapshot(self) -> dict:
+        return {
+            "interval": self.interval,
+            "threshold": self.threshold,
+            "blocks": self.blocks,
+            "last_block_route": self.last_block and self.last_block.route,
+            "lag": self.lag.snapshot(),
+        }
+
+
+loop_monitor = LoopMonitor(
+    interval=config.LOOP_MONITOR_INTERVAL_SECONDS,
+    threshold=config.LOOP_BLOCK_THRESHOLD_SECONDS,
+)
+
+registry.register(
+    CallbackHistogram(
+        "event_loop_lag_seconds",
+        "How late the loop monitor's sampler woke up.",
+        lambda: loop_monitor.lag,
+    )
+)
+registry.register(
+    CallbackMetric(
+        "event_loop_blocks_total",
+        "Stalls longer than the block threshold.",
+        lambda: [((), loop_monitor.blocks)],
+        type="counter",
+    )
+)
@@ -0,0 +1,296 @@
+import time
+from bisect import bisect_left
+from typing import Callable, Iterable, TypeVar
+from sqlalchemy import Engine, event
+from sqlalchemy.pool import QueuePool
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+from src.core.profiling import record_query
+
+LATENCY_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+Labels = tuple[str, ...]
+Sample = tuple[Labels, float]
+M = TypeVar("M", bound="Metric")
+
+
+class Histogram:
+    """Cumulative histogram with fixed upper bounds, Prometheus style."""
+
+    def __init__(self, buckets: tuple[float, ...] = LATENCY_BUCKETS):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.sum = 0.0
+        self.count = 0
+        self.max = 0.0
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+        if value > self.max:
+            self.max = value
+
+    def cumulative(self) -> list[tuple[str, int]]:
+        total, result = 0, []
+        for bound, count in zip(self.buckets, self.counts):
+            total += count
+            result.append((format_value(bound), total))
+        result.append(("+Inf", self.count))
+        return result
+
+    def snapshot(self) -> dict:
+        return {
+            "count": self.count,
+            "sum": self.sum,
+            "max": self.max,
+            "buckets": dict(self.cumulative()),
+        }
+
+
+def format_value(value: float) -> str:
+    return str(int(value)) if float(value).is_integer() else repr(float(value))
+
+
+def escape_label(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def format_labels(names: Labels, values: Labels, extra: str = "") -> str:
+    pairs = [f'{name}="{escape_label(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+class Metric:
+    type: str
+
+    def __init__(self, name: str, documentation: str, labelnames: Labels = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = labelnames
+
+    def header(self) -> list[str]:
+        return [
+            f"# HELP {self.name} {self.documentation}",
+            f"# TYPE {self.name} {self.type}",
+        ]
+
+    def render(self) -> list[str]:
+        raise NotImplementedError
+
+
+class Counter(Metric):
+    type = "counter"
+
+    def __init__(self, name: str, documentation: str, labelnames: Labels = ()):
+        super().__init__(name, documentation, labelnames)
+        self.values: dict[Labels, float] = {}
+
+    def inc(self, *labels: str, amount: float = 1) -> None:
+        self.values[labels] = self.values.get(labels, 0) + amount
+
+    def render(self) -> list[str]:
+        return self.header() + [
+            f"{self.name}{format_labels(self.labelnames, labels)} {format_value(value)}"
+            for labels, value in sorted(self.values.items())
+        ]
+
+
+class HistogramMetric(Metric):
+    type = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Labels = (),
+        buckets: tuple[float, ...] = LATENCY_BUCKETS,
+    ):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = buckets
+        self.histograms: dict[Labels, Histogram] = {}
+
+    def labels(self, *labels: str) -> Histogram:
+        histogram = self.histograms.get(labels)
+        if histogram is None:
+            histogram = self.histograms[labels] = Histogram(self.buckets)
+        return histogram
+
+    def render(self) -> list[str]:
+        lines = self.header()
+        for labels, histogram in sorted(self.histograms.items()):
+            lines += render_histogram(self.name, self.labelnames, labels, histogram)
+        return lines
+
+
+def render_histogram(
+    name: str, labelnames: Labels, labels: Labels, histogram: Histogram
+) -> list[str]:
+    lines = [
+        f"{name}_bucket{format_labels(labelnames, labels, f'le="{bound}"')} {count}"
+        for bound, count in histogram.cumulative()
+    ]
+    suffix = format_labels(labelnames, labels)
+    lines.append(f"{name}_sum{suffix} {format_value(histogram.sum)}")
+    lines.append(f"{name}_count{suffix} {histogram.count}")
+    return lines
+
+
+class CallbackMetric(Metric):
+    """Read at scrape time from state some other component already keeps."""
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        collect: Callable[[], Iterable[Sample]],
+        labelnames: Labels = (),
+        type: str = "gauge",
+    ):
+        super().__init__(name, documentation, labelnames)
+        self.collect = collect
+        self.type = type
+
+    def render(self) -> list[str]:
+        return self.header() + [
+            f"{self.name}{format_labels(self.labelnames, labels)} {format_value(value)}"
+            for labels, value in self.collect()
+        ]
+
+
+class CallbackHistogram(Metric):
+    type = "histogram"
+
+    def __init__(self, name: str, documentation: str, get: Callable[[], Histogram]):
+        super().__init__(name, documentation)
+        self.get = get
+
+    def render(self) -> list[str]:
+        return self.header() + render_histogram(self.name, (), (), self.get())
+
+
+class Registry:
+    def __init__(self):
+        self.metrics: list[Metric] = []
+
+    def register(self, metric: M) -> M:
+        self.metrics.append(metric)
+        return metric
+
+    def render(self) -> str:
+        lines = []
+        for metric in self.metrics:
+            lines += metric.render()
+        return "\n".join(lines) + "\n"
+
+
+registry = Registry()
+
+http_requests = registry.register(
+    Counter(
+        "http_requests_total",
+        "HTTP requests by route template, method and status.",
+        ("method", "route", "status"),
+    )
+)
+http_request_duration = registry.register(
+    HistogramMetric(
+        "http_request_duration_seconds",
+        "HTTP request latency by route template and method.",
+        ("method", "route"),
+    )
+)
+db_query_duration = registry.register(
+    HistogramMetric(
+        "db_query_duration_seconds",
+        "Duration of SQL statements by engine.",
+        ("engine",),
+    )
+)
+db_engines: dict[Engine, str] = {}
+db_pools: dict[str, QueuePool] = {}
+
+
+def collect_db_pools() -> Iterable[Sample]:
+    for label, pool in db_pools.items():
+        yield (label, "checked_out"), pool.checkedout()
+        # Negative while the pool has not grown to pool_size yet.
+        yield (label, "overflow"), max(pool.overflow(), 0)
+        yield (label, "size"), pool.size()
+
+
+registry.register(
+    CallbackMetric(
+        "db_pool_connections",
+        "Pooled connections by engine and state.",
+        collect_db_pools,
+        ("engine", "state"),
+    )
+)
+
+
+class MetricsMiddleware:
+    """Times every HTTP request; labels use the matched route template."""
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        status_code = 500
+        started = time.perf_counter()
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            route = scope.get("route")
+            # Unmatched paths share one label to keep cardinality bounded.
+            template = getattr(route, "path", "<unmatched>")
+            method = scope["method"]
+            http_request_duration.labels(method, template).observe(
+                time.perf_counter() - started
+            )
+            http_requests.inc(method, template, str(status_code))
+
+
+def instrument_engine(engine: Engine, label: str) -> None:
+    """
+    Export statement timings and pool gauges of ``engine`` (the sync engine
+    of an async one) under ``label``.
+    """
+    db_engines[engine] = label
+    if isinstance(engine.pool, QueuePool):
+        db_pools[label] = engine.pool
+
+
+# Every engine is timed, so the per-request profile also sees engines
+# created elsewhere (e.g. by tests); only labelled ones feed the histogram.
+@event.listens_for(Engine, "before_cursor_execute")
+def before_cursor_execute(conn, cursor, statement, params, context, many):
+    conn.info.setdefault("query_started", []).append(time.perf_counter())
+
+
+@event.listens_for(Engine, "after_cursor_execute")
+def after_cursor_execute(conn, cursor, statement, params, context, many):
+    duration = time.perf_counter() - conn.info["query_started"].pop()
+    record_query(duration)
+    label = db_engines.get(conn.engine)
+    if label is not None:
+        db_query_duration.labels(label).observe(duration)
+
+
+@event.listens_for(Engine, "handle_error")
+def handle_error(context):
+    stack = context.connection and context.connection.info.get("query_started")
+    if stack:
+        stack.pop()
@@ -0,0 +1,91 @@
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass
+from typing import Iterator
+from starlette.datastructures import MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+from src.core.config import config
+from src.core.logging import logger
+
+
+@dataclass
+class RequestProfile:
+    queries: int = 0
+    db_time: float = 0.0
+    serialize_time: float = 0.0
+
+    def server_timing(self) -> str:
+        return (
+            f"db;dur={self.db_time * 1000:.3f}, "
+            f'db_queries;desc="{self.queries}", '
+            f"serialize;dur={self.serialize_time * 1000:.3f}"
+        )
+
+    def over_budget(self) -> bool:
+        return (
+            self.queries > config.PROFILE_QUERY_BUDGET
+            or self.db_time > config.PROFILE_DB_TIME_BUDGET_SECONDS
+        )
+
+
+current_profile: ContextVar[RequestProfile | None] = ContextVar(
+    "current_profile", default=None
+)
+
+
+def record_query(duration: float) -> None:
+    profile = current_profile.get()
+    if profile is not None:
+        profile.queries += 1
+        profile.db_time += duration
+
+
+@contextmanager
+def serialization() -> Iterator[None]:
+    """Charge the enclosed block to the request's ``serialize`` timing."""
+    profile = current_profile.get()
+    if profile is None:
+        yield
+        return
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        profile.serialize_time += time.perf_counter() - started
+
+
+class ProfilingMiddleware:
+    """
+    Counts the SQL a request runs and reports it in a ``Server-Timing``
+    header, so an N+1 shows up on any curl call. Requests over the query or
+    DB-time budget are logged. Streamed bodies only count what ran before
+    the headers went out.
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        profile = RequestProfile()
+        token = current_profile.set(profile)
+
+        async def send_wrapper(message: Message) -> None:
+            if message["type"] == "http.response.start" and config.SERVER_TIMING:
+                headers = MutableHeaders(scope=message)
+                headers.append("Server-Timing", profile.server_timing())
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            current_profile.reset(token)
+            if profile.over_budget():
+                route = getattr(scope.get("route"), "path", scope["path"])
+                logger.warning(
+                    f"{scope['method']} {route} ran {profile.queries} queries "
+                    f"taking {profile.db_time * 1000:.1f}ms"
+                )
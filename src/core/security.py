@@ -1,8 +1,20 @@
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from fastapi import status
 from passlib.context import CryptContext
+from src.core.config import config
+from src.core.enums import ErrorKind
+from src.core.exceptions import ErrorException
+from src.core.metrics import CallbackMetric, registry
 
+# Hashes made with other cost parameters still verify and are flagged by
+# ``verify_and_update`` so they can be upgraded on the next login.
 pwd_context = CryptContext(
     schemes=["argon2"],
     deprecated="auto",
+    argon2__time_cost=config.PASSWORD_HASH_TIME_COST,
+    argon2__memory_cost=config.PASSWORD_HASH_MEMORY_COST,
+    argon2__parallelism=config.PASSWORD_HASH_PARALLELISM,
 )
 
 
@@ -12,3 +24,82 @@ def hash_password(password: str) -> str:
 
 def verify_password(plain_password: str, hashed_password: str) -> bool:
     return pwd_context.verify(plain_password, hashed_password)
+
+
+class PasswordHasherPool:
+    """
+    Runs Argon2 on a few dedicated threads (argon2-cffi releases the GIL), so
+    hashing never stalls the event loop or the shared threadpool. Work beyond
+    ``max_pending`` in flight is refused at once instead of queueing.
+    """
+
+    def __init__(self, workers: int, max_pending: int):
+        self.workers = workers
+        self.max_pending = max_pending
+        self.pending = 0
+        self.rejected = 0
+        self._executor: ThreadPoolExecutor | None = None
+
+    @property
+    def executor(self) -> ThreadPoolExecutor:
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(
+                max_workers=self.workers, thread_name_prefix="argon2"
+            )
+        return self._executor
+
+    async def run(self, fn, *args):
+        if self.pending >= self.max_pending:
+            self.rejected += 1
+            raise ErrorException(
+                code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                message="Too many concurrent password operations, retry shortly",
+                kind=ErrorKind.UNAVAILABLE,
+                source="PasswordHasherPool.run",
+                headers={"Retry-After": "1"},
+            )
+        self.pending += 1
+        try:
+            return await asyncio.get_running_loop().run_in_executor(
+                self.executor, fn, *args
+            )
+        finally:
+            self.pending -= 1
+
+    async def hash(self, password: str) -> str:
+        return await self.run(pwd_context.hash, password)
+
+    async def verify_and_update(
+        self, plain_password: str, hashed_password: str
+    ) -> tuple[bool, str | None]:
+        """``(valid, new_hash)``; ``new_hash`` is set when the cost changed."""
+        return await self.run(
+            pwd_context.verify_and_update, plain_password, hashed_password
+        )
+
+    def close(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+
+password_hasher = PasswordHasherPool(
+    workers=config.PASSWORD_HASH_WORKERS,
+    max_pending=config.PASSWORD_HASH_MAX_PENDING,
+)
+
+registry.register(
+    CallbackMetric(
+        "password_hash_pending",
+        "Argon2 operations running or queued on the password pool.",
+        lambda: [((), password_hasher.pending)],
+    )
+)
+registry.register(
+    CallbackMetric(
+        "password_hash_rejected_total",
+        "Argon2 operations refused because the password pool was saturated.",
+        lambda: [((), password_hasher.rejected)],
+        type="counter",
+    )
+)
@@ -1,5 +1,6 @@
 from datetime import datetime
-from sqlalchemy import DateTime
+from sqlalchemy import JSON, ColumnElement, DateTime, literal_column
+from sqlalchemy.ext.hybrid import hybrid_property
 from sqlalchemy.orm import DeclarativeBase, Mapped, mapped_column
 from sqlalchemy.sql import func
 
@@ -8,10 +9,50 @@ class Base(DeclarativeBase):
     pass
 
 
+def json_agg_objects(**fields: ColumnElement) -> ColumnElement[list[dict]]:
+    """
+    One ``{field: value}`` JSON object per aggregated row, as an array that
+    is ``[]`` rather than NULL when there are no rows.
+    """
+    pairs = []
+    for key, column in fields.items():
+        # Inlined: a bound key has no type asyncpg can infer.
+        pairs += [literal_column(f"'{key}'"), column]
+    return func.coalesce(
+        func.json_agg(func.json_build_object(*pairs)),
+        literal_column("'[]'::json"),
+        type_=JSON,
+    )
+
+
 class TimestampMixin:
     created_at: Mapped[datetime] = mapped_column(
         DateTime(timezone=True), server_default=func.now()
     )
+    # statement_timestamp(), not now(): a second write in the same
+    # transaction must still move the version ETags are derived from.
     updated_at: Mapped[datetime] = mapped_column(
-        DateTime(timezone=True), onupdate=func.now(), nullable=True
+        DateTime(timezone=True), onupdate=func.statement_timestamp(), nullable=True
     )
+
+    @hybrid_property
+    def modified_at(self) -> datetime:
+        return self.updated_at or self.created_at
+
+    @modified_at.inplace.expression
+    @classmethod
+    def _modified_at_expression(cls) -> ColumnElement[datetime]:
+        return func.coalesce(cls.updated_at, cls.created_at)
+
+    @hybrid_property
+    def version_at(self) -> datetime:
+        """
+        Newest change to anything the entity's API representation shows;
+        models embedding related rows override it to include them.
+        """
+        return self.modified_at
+
+    @version_at.inplace.expression
+    @classmethod
+    def _version_at_expression(cls) -> ColumnElement[datetime]:
+        return cls.modified_at
@@ -1,2 +1,4 @@
 from src.db.models.users import User  # noqa: F401
 from src.db.models.ingredients import Ingredient  # noqa: F401
+from src.db.models.categories import Category  # noqa: F401
+from src.db.models.recipes import Recipe, RecipeIngredient  # noqa: F401
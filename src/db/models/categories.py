@@ -1,6 +1,8 @@
+from datetime import datetime
 from typing import TYPE_CHECKING
-from src.db.base import Base, TimestampMixin
-from sqlalchemy import String
+from src.db.base import Base, TimestampMixin, json_agg_objects
+from sqlalchemy import ColumnElement, DateTime, String, func, select
+from sqlalchemy.ext.hybrid import hybrid_property
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 if TYPE_CHECKING:
@@ -27,3 +29,39 @@ class Category(Base, TimestampMixin):
     @name.setter
     def name(self, value: str) -> None:
         self._name = value.lower()
+
+    @hybrid_property
+    def version_at(self) -> datetime:
+        return max(
+            [
+                self.modified_at,
+                *(ingredient.modified_at for ingredient in self.ingredients),
+            ]
+        )
+
+    @version_at.inplace.expression
+    @classmethod
+    def _version_at_expression(cls) -> ColumnElement[datetime]:
+        from src.db.models.ingredients import Ingredient, IngredientCategory
+
+        newest_ingredient = (
+            select(func.max(Ingredient.modified_at))
+            .join(IngredientCategory, IngredientCategory.ingredient_id == Ingredient.id)
+            .where(IngredientCategory.category_id == cls.id)
+            .scalar_subquery()
+        )
+        return func.greatest(
+            cls.modified_at, newest_ingredient, type_=DateTime(timezone=True)
+        )
+
+
+def category_ingredients_expression() -> ColumnElement[list[dict]]:
+    """SQL form of ``Category.ingredients`` as ``{id, name}`` objects."""
+    from src.db.models.ingredients import Ingredient, IngredientCategory
+
+    return (
+        select(json_agg_objects(id=Ingredient.id, name=Ingredient._name))
+        .join(IngredientCategory, IngredientCategory.ingredient_id == Ingredient.id)
+        .where(IngredientCategory.category_id == Category.id)
+        .scalar_subquery()
+    )
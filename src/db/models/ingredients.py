@@ -1,6 +1,8 @@
+from datetime import datetime
 from typing import TYPE_CHECKING
-from src.db.base import Base, TimestampMixin
-from sqlalchemy import String, ForeignKey
+from src.db.base import Base, TimestampMixin, json_agg_objects
+from sqlalchemy import ColumnElement, DateTime, String, ForeignKey, func, select
+from sqlalchemy.ext.hybrid import hybrid_property
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 if TYPE_CHECKING:
@@ -45,6 +47,27 @@ class Ingredient(Base, TimestampMixin):
     def category_ids(self) -> list[int]:
         return [category.id for category in self.categories]
 
+    @hybrid_property
+    def version_at(self) -> datetime:
+        return max(
+            [self.modified_at, *(category.modified_at for category in self.categories)]
+        )
+
+    @version_at.inplace.expression
+    @classmethod
+    def _version_at_expression(cls) -> ColumnElement[datetime]:
+        from src.db.models.categories import Category
+
+        newest_category = (
+            select(func.max(Category.modified_at))
+            .join(IngredientCategory, IngredientCategory.category_id == Category.id)
+            .where(IngredientCategory.ingredient_id == cls.id)
+            .scalar_subquery()
+        )
+        return func.greatest(
+            cls.modified_at, newest_category, type_=DateTime(timezone=True)
+        )
+
 
 class IngredientCategory(Base):
     __tablename__ = "ingredient_category"
@@ -53,5 +76,17 @@ class IngredientCategory(Base):
         ForeignKey("ingredients.id"), primary_key=True
     )
     category_id: Mapped[int] = mapped_column(
-        ForeignKey("categories.id"), primary_key=True
+        ForeignKey("categories.id"), primary_key=True, index=True
+    )
+
+
+def ingredient_categories_expression() -> ColumnElement[list[dict]]:
+    """SQL form of ``Ingredient.categories`` as ``{id, name}`` objects."""
+    from src.db.models.categories import Category
+
+    return (
+        select(json_agg_objects(id=Category.id, name=Category._name))
+        .join(IngredientCategory, IngredientCategory.category_id == Category.id)
+        .where(IngredientCategory.ingredient_id == Ingredient.id)
+        .scalar_subquery()
     )
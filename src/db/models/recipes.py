@@ -1,17 +1,45 @@
-from typing import TYPE_CHECKING
-from src.db.base import Base, TimestampMixin
-from sqlalchemy import String, ForeignKey, Enum as sqlenum
-from sqlalchemy.orm import Mapped, mapped_column, relationship
+from typing import Iterable
+from src.db.base import Base, TimestampMixin, json_agg_objects
+from sqlalchemy import (
+    ColumnElement,
+    Connection,
+    String,
+    ForeignKey,
+    Index,
+    Enum as sqlenum,
+    event,
+    case,
+    cast,
+    exists,
+    false,
+    func,
+    inspect,
+    literal_column,
+    select,
+    update,
+)
+from sqlalchemy.dialects.postgresql import REGCONFIG, TSVECTOR
+from sqlalchemy.orm import Mapped, Session, mapped_column, relationship
 from sqlalchemy.ext.associationproxy import association_proxy
 from src.db.models.users import User
+from src.db.models.ingredients import Ingredient
 from src.api.recipes.enums import DifficultyLevel
 
-if TYPE_CHECKING:
-    from src.db.models.ingredients import Ingredient
+VEGAN_FLIPPED_KEY = "vegan_flipped_ingredient_ids"
+VEGAN_CHANGED_KEY = "vegan_changed_recipe_ids"
+SEARCH_STALE_RECIPES_KEY = "search_stale_recipes"
+SEARCH_RENAMED_INGREDIENTS_KEY = "search_renamed_ingredient_ids"
+SEARCH_CONFIG = "english"
 
 
 class Recipe(Base, TimestampMixin):
     __tablename__ = "recipes"
+    # Keyset paging by id, filtered by owner or by the vegan flag.
+    __table_args__ = (
+        Index("ix_recipes_user_id_id", "user_id", "id"),
+        Index("ix_recipes_is_vegan_id", "is_vegan", "id"),
+        Index("ix_recipes_search_vector", "search_vector", postgresql_using="gin"),
+    )
 
     id: Mapped[int] = mapped_column(primary_key=True, autoincrement=True)
     _name: Mapped[str] = mapped_column(
@@ -23,6 +51,15 @@ class Recipe(Base, TimestampMixin):
     )
     portions: Mapped[int] = mapped_column(nullable=False)
     instructions: Mapped[str] = mapped_column(nullable=False)
+    # Denormalized "every ingredient is vegan", maintained on flush below.
+    is_vegan: Mapped[bool] = mapped_column(
+        nullable=False, default=False, server_default=false()
+    )
+    # Weighted name/ingredients/instructions document, maintained on flush
+    # below and never loaded into the ORM object.
+    search_vector: Mapped[str | None] = mapped_column(
+        TSVECTOR, nullable=True, deferred=True
+    )
     recipe_ingredients = relationship(
         "RecipeIngredient",
         back_populates="recipe",
@@ -60,13 +97,17 @@ class Recipe(Base, TimestampMixin):
             for assoc in self.recipe_ingredients
         ]
 
-    @property
-    def is_vegan(self) -> bool:
-        return all(ingredient.is_vegan for ingredient in self.ingredients)
-
 
 class RecipeIngredient(Base):
     __tablename__ = "recipe_ingredients"
+    # Inverted index ingredient -> recipes, covering so lookups are index-only.
+    __table_args__ = (
+        Index(
+            "ix_recipe_ingredients_ingredient_id_recipe_id",
+            "ingredient_id",
+            "recipe_id",
+        ),
+    )
     recipe_id: Mapped[int] = mapped_column(ForeignKey("recipes.id"), primary_key=True)
     ingredient_id: Mapped[int] = mapped_column(
         ForeignKey("ingredients.id"), primary_key=True
@@ -80,3 +121,181 @@ class RecipeIngredient(Base):
     )
 
     __mapper_args__ = {"confirm_deleted_rows": False}
+
+
+def vegan_expression() -> ColumnElement[bool]:
+    """SQL form of ``Recipe.is_vegan``: no non-vegan ingredient is attached."""
+    return ~exists().where(
+        RecipeIngredient.recipe_id == Recipe.id,
+        RecipeIngredient.ingredient_id == Ingredient.id,
+        Ingredient.is_vegan.is_(False),
+    )
+
+
+def recipe_ingredients_payload_expression() -> ColumnElement[list[dict]]:
+    """SQL form of ``Recipe.recipe_ingredients_payload``, correlated to the row."""
+    return (
+        select(
+            json_agg_objects(
+                ingredient_id=RecipeIngredient.ingredient_id,
+                quantity=RecipeIngredient.quantity,
+            )
+        )
+        .where(RecipeIngredient.recipe_id == Recipe.id)
+        .scalar_subquery()
+    )
+
+
+def instructions_preview_expression(length: int) -> ColumnElement[str]:
+    """The first ``length`` characters of the instructions, "…" when cut."""
+    return case(
+        (
+            func.char_length(Recipe.instructions) > length,
+            func.left(Recipe.instructions, length - 1).concat("…"),
+        ),
+        else_=Recipe.instructions,
+    )
+
+
+@event.listens_for(Session, "before_flush")
+def sync_recipe_is_vegan(session: Session, flush_context, instances) -> None:
+    recipes: set[Recipe] = set()
+    flipped: set[int] = set()
+    for obj in (*session.new, *session.dirty, *session.deleted):
+        if isinstance(obj, Recipe):
+            if obj in session.new or (
+                obj not in session.deleted
+                and inspect(obj).attrs.recipe_ingredients.history.has_changes()
+            ):
+                recipes.add(obj)
+        elif isinstance(obj, RecipeIngredient):
+            if obj.recipe is not None and obj.recipe not in session.deleted:
+                recipes.add(obj.recipe)
+        elif isinstance(obj, Ingredient) and obj not in session.new:
+            if inspect(obj).attrs.is_vegan.history.has_changes():
+                flipped.add(obj.id)
+
+    with session.no_autoflush:
+        for recipe in recipes:
+            recipe.is_vegan = all(
+                (
+                    assoc.ingredient or session.get(Ingredient, assoc.ingredient_id)
+                ).is_vegan
+                for assoc in recipe.recipe_ingredients
+                if assoc not in session.deleted
+            )
+    # Assigned on every flush so state left by a failed flush never leaks.
+    session.info[VEGAN_FLIPPED_KEY] = flipped
+
+
+def refresh_recipes_is_vegan(
+    connection: Connection, ingredient_ids: Iterable[int]
+) -> set[int]:
+    """Recompute, in one UPDATE, every recipe using one of the ingredients."""
+    affected = select(RecipeIngredient.recipe_id).where(
+        RecipeIngredient.ingredient_id.in_(ingredient_ids)
+    )
+    changed = connection.execute(
+        update(Recipe.__table__)
+        .where(Recipe.id.in_(affected))
+        .values(is_vegan=vegan_expression())
+        .returning(Recipe.id)
+    )
+    return set(changed.scalars())
+
+
+@event.listens_for(Session, "after_flush")
+def propagate_ingredient_is_vegan(session: Session, flush_context) -> None:
+    flipped = session.info.pop(VEGAN_FLIPPED_KEY, None)
+    if not flipped:
+        return
+    changed = refresh_recipes_is_vegan(session.connection(), flipped)
+    session.info.setdefault(VEGAN_CHANGED_KEY, set()).update(changed)
+
+
+@event.listens_for(Session, "after_flush_postexec")
+def expire_recipe_is_vegan(session: Session, flush_context) -> None:
+    changed = session.info.pop(VEGAN_CHANGED_KEY, None)
+    if not changed:
+        return
+    for obj in list(session.identity_map.values()):
+        if isinstance(obj, Recipe) and obj.id in changed:
+            session.expire(obj, ["is_vegan", "updated_at"])
+
+
+def search_query(text: str) -> ColumnElement:
+    return func.websearch_to_tsquery(cast(SEARCH_CONFIG, REGCONFIG), text)
+
+
+def search_vector_expression() -> ColumnElement:
+    """SQL form of ``Recipe.search_vector``, correlated to the recipes row."""
+    config = cast(SEARCH_CONFIG, REGCONFIG)
+    ingredient_names = (
+        select(func.coalesce(func.string_agg(Ingredient._name, " "), ""))
+        .join_from(RecipeIngredient, Ingredient)
+        .where(RecipeIngredient.recipe_id == Recipe.id)
+        .scalar_subquery()
+    )
+    # Weights are inlined: bound as varchar they match no setweight() overload.
+    return (
+        func.setweight(func.to_tsvector(config, Recipe._name), literal_column("'A'"))
+        .op("||")(
+            func.setweight(
+                func.to_tsvector(config, ingredient_names), literal_column("'B'")
+            )
+        )
+        .op("||")(
+            func.setweight(
+                func.to_tsvector(config, Recipe.instructions), literal_column("'C'")
+            )
+        )
+    )
+
+
+@event.listens_for(Session, "before_flush")
+def track_recipe_search_changes(session: Session, flush_context, instances) -> None:
+    recipes: set[Recipe] = set()
+    renamed: set[int] = set()
+    for obj in (*session.new, *session.dirty, *session.deleted):
+        if isinstance(obj, Recipe):
+            if obj in session.deleted:
+                continue
+            attrs = inspect(obj).attrs
+            if obj in session.new or any(
+                attrs[name].history.has_changes()
+                for name in ("_name", "instructions", "recipe_ingredients")
+            ):
+                recipes.add(obj)
+        elif isinstance(obj, RecipeIngredient):
+            if obj.recipe is not None and obj.recipe not in session.deleted:
+                recipes.add(obj.recipe)
+        elif isinstance(obj, Ingredient) and obj not in session.new:
+            if inspect(obj).attrs._name.history.has_changes():
+                renamed.add(obj.id)
+    session.info[SEARCH_STALE_RECIPES_KEY] = recipes
+    session.info[SEARCH_RENAMED_INGREDIENTS_KEY] = renamed
+
+
+@event.listens_for(Session, "after_flush")
+def refresh_recipe_search_vector(session: Session, flush_context) -> None:
+    """Rebuild the search document of touched recipes in one UPDATE."""
+    recipes = session.info.pop(SEARCH_STALE_RECIPES_KEY, set())
+    renamed = session.info.pop(SEARCH_RENAMED_INGREDIENTS_KEY, set())
+    if not recipes and not renamed:
+        return
+    condition = Recipe.id.in_([recipe.id for recipe in recipes])
+    if renamed:
+        condition |= Recipe.id.in_(
+            select(RecipeIngredient.recipe_id).where(
+                RecipeIngredient.ingredient_id.in_(renamed)
+            )
+        )
+    # An internal column: leave updated_at (and so the ETag) alone.
+    session.connection().execute(
+        update(Recipe.__table__)
+        .where(condition)
+        .values(
+            search_vector=search_vector_expression(),
+            updated_at=Recipe.__table__.c.updated_at,
+        )
+    )
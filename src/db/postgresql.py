@@ -1,15 +1,48 @@
-from sqlalchemy import create_engine
-from sqlalchemy.orm import sessionmaker
+import csv
+import io
+from typing import Any, Callable, Iterable, Sequence, TypeVar
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy import Connection, Table, create_engine
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+from sqlalchemy.orm import Session, sessionmaker
+from sqlalchemy.util import await_only
 from src.core.config import config
+from src.core.metrics import instrument_engine
+
+T = TypeVar("T")
+
+
+def make_database_url(driver: str) -> str:
+    return (
+        f"postgresql+{driver}://{config.POSTGRES_USER}:{config.POSTGRES_PASSWORD}"
+        f"@{config.POSTGRES_HOST}:{config.POSTGRES_PORT}/{config.POSTGRES_DB}"
+    )
 
-database_url = (
-    f"postgresql+psycopg2://{config.POSTGRES_USER}:{config.POSTGRES_PASSWORD}"
-    f"@{config.POSTGRES_HOST}:{config.POSTGRES_PORT}/{config.POSTGRES_DB}"
-)
 
-engine = create_engine(database_url, pool_pre_ping=True)
+database_url = make_database_url("psycopg2")
+async_database_url = make_database_url("asyncpg")
+
+engine = create_engine(
+    database_url,
+    pool_pre_ping=True,
+    pool_size=config.DB_POOL_SIZE,
+    max_overflow=config.DB_MAX_OVERFLOW,
+)
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+async_engine = create_async_engine(
+    async_database_url,
+    pool_pre_ping=True,
+    pool_size=config.DB_POOL_SIZE,
+    max_overflow=config.DB_MAX_OVERFLOW,
+)
+AsyncSessionLocal = async_sessionmaker(
+    bind=async_engine, autoflush=False, expire_on_commit=False
+)
+
+instrument_engine(engine, "sync")
+instrument_engine(async_engine.sync_engine, "async")
+
 
 def get_db():
     db = SessionLocal()
@@ -17,3 +50,51 @@ def get_db():
         yield db
     finally:
         db.close()
+
+
+async def run_sync(
+    db: Session | AsyncSession,
+    fn: Callable[..., T],
+    *args: Any,
+    **kwargs: Any,
+) -> T:
+    """
+    Run ``fn(session, *args, **kwargs)`` without blocking the event loop.
+
+    With an ``AsyncSession`` the ORM code runs on the async driver through
+    ``run_sync``; with a plain ``Session`` it is offloaded to the threadpool.
+    """
+    if isinstance(db, AsyncSession):
+        return await db.run_sync(fn, *args, **kwargs)
+    return await run_in_threadpool(fn, db, *args, **kwargs)
+
+
+def copy_rows(
+    connection: Connection, table: Table, rows: Iterable[Sequence[Any]]
+) -> None:
+    """
+    Bulk-load ``rows`` (in ``table`` column order) with ``COPY ... FROM STDIN``
+    on the connection's current transaction, whichever driver it uses.
+    """
+    columns = [column.name for column in table.columns]
+    driver_connection = connection.connection.driver_connection
+    if connection.dialect.driver == "asyncpg":
+        await_only(
+            driver_connection.copy_records_to_table(
+                table.name, records=rows, columns=columns
+            )
+        )
+        return
+
+    # Strings are quoted and None is left bare, which COPY's CSV format
+    # reads back as '' and NULL respectively.
+    buffer = io.StringIO()
+    csv.writer(buffer, quoting=csv.QUOTE_NONNUMERIC).writerows(rows)
+    buffer.seek(0)
+    preparer = connection.dialect.identifier_preparer
+    statement = "COPY {} ({}) FROM STDIN WITH (FORMAT csv)".format(
+        preparer.format_table(table),
+        ", ".join(preparer.quote(column) for column in columns),
+    )
+    with driver_connection.cursor() as cursor:
+        cursor.copy_expert(statement, buffer)
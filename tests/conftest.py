@@ -1,17 +1,22 @@
 from __future__ import annotations
-from typing import Generator
+from contextlib import contextmanager
+from typing import Callable, ContextManager, Generator
 from uuid import uuid4
 
+import anyio
 import pytest
 from fastapi.testclient import TestClient
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, event, make_url
 from sqlalchemy.engine import Engine
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
 from sqlalchemy.orm import sessionmaker, Session
+from sqlalchemy.pool import NullPool
 from alembic.config import Config
 from alembic import command
 from testcontainers.postgres import PostgresContainer
 
 from main import app as fastapi_app
+from src.core.cache import entity_cache
 from src.db.models.users import User
 
 
@@ -78,6 +83,35 @@ def db(session_factory) -> Generator[Session, None, None]:
         connection.close()
 
 
+@pytest.fixture()
+def query_budget(db: Session) -> Callable[[int], ContextManager[list[str]]]:
+    """
+    ``with query_budget(n) as statements:`` fails the test when the block runs
+    more than ``n`` SQL statements on the test connection (requests made with
+    ``client`` included), listing what ran.
+    """
+    connection = db.get_bind()
+
+    @contextmanager
+    def _budget(max_queries: int) -> Generator[list[str], None, None]:
+        statements: list[str] = []
+
+        def count(conn, cursor, statement, parameters, context, executemany):
+            statements.append(statement)
+
+        event.listen(connection, "before_cursor_execute", count)
+        try:
+            yield statements
+        finally:
+            event.remove(connection, "before_cursor_execute", count)
+        assert len(statements) <= max_queries, (
+            f"{len(statements)} queries ran, budget is {max_queries}:\n\n"
+            + "\n\n".join(statements)
+        )
+
+    return _budget
+
+
 @pytest.fixture(autouse=True)
 def override_get_db(db: Session):
     from src.core.dependencies import get_db as app_get_db
@@ -90,6 +124,79 @@ def override_get_db(db: Session):
     fastapi_app.dependency_overrides.clear()
 
 
+@pytest.fixture(scope="session")
+def async_pg_url(pg_url: str) -> str:
+    return (
+        make_url(pg_url)
+        .set(drivername="postgresql+asyncpg")
+        .render_as_string(hide_password=False)
+    )
+
+
+@pytest.fixture()
+def async_db(
+    client: TestClient, engine: Engine, async_pg_url: str
+) -> Generator[AsyncSession, None, None]:
+    """
+    Per-test ``AsyncSession`` on asyncpg, wrapped in a transaction that is
+    rolled back afterwards, and served by ``get_db`` instead of ``db``.
+
+    asyncpg connections belong to the event loop that opened them, so this
+    one is opened on the loop ``client`` runs the app on; seed rows through
+    ``async_seed`` rather than the ``db`` fixtures, which the asyncpg
+    connection cannot see.
+    """
+    from src.core.dependencies import get_db as app_get_db
+
+    async_engine = create_async_engine(async_pg_url, poolclass=NullPool)
+    connection = client.portal.call(async_engine.connect)
+    trans = client.portal.call(connection.begin)
+    session = AsyncSession(
+        bind=connection,
+        expire_on_commit=False,
+        autoflush=False,
+        join_transaction_mode="create_savepoint",
+    )
+
+    async def _override():
+        yield session
+
+    fastapi_app.dependency_overrides[app_get_db] = _override
+    try:
+        yield session
+    finally:
+        client.portal.call(session.close)
+        client.portal.call(trans.rollback)
+        client.portal.call(connection.close)
+        client.portal.call(async_engine.dispose)
+
+
+@pytest.fixture()
+def async_seed(client: TestClient, async_db: AsyncSession):
+    """
+    ``async_seed(fn)`` runs ``fn(session)`` with the sync facade of
+    ``async_db`` and flushes, so the rows it adds are visible to requests.
+    """
+
+    def _seed(fn):
+        def _run(session: Session):
+            result = fn(session)
+            session.flush()
+            return result
+
+        return client.portal.call(async_db.run_sync, _run)
+
+    return _seed
+
+
+@pytest.fixture(autouse=True)
+def clear_entity_cache():
+    """Cached responses would outlive the rolled-back rows they describe."""
+    anyio.run(entity_cache.clear)
+    yield
+    anyio.run(entity_cache.clear)
+
+
 @pytest.fixture()
 def user(db: Session):
     from src.db.models.users import User
@@ -270,10 +377,11 @@ def recipe_factory(db: Session, user_factory, ingredient_factory):
     from src.api.recipes.enums import DifficultyLevel
 
     def _create(**overrides):
-        user = overrides.pop("user", user_factory())
-        ingredients = overrides.pop(
-            "ingredients", [ingredient_factory(), ingredient_factory()]
-        )
+        # Build defaults only when missing: a user costs an Argon2 hash.
+        user = overrides.pop("user", None) or user_factory()
+        ingredients = overrides.pop("ingredients", None)
+        if ingredients is None:
+            ingredients = [ingredient_factory(), ingredient_factory()]
         quantities = overrides.pop(
             "quantities", ["1 unit" for _ in range(len(ingredients))]
         )
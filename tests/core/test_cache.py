@@ -0,0 +1,232 @@
+import asyncio
+import json
+import pytest
+from fakeredis import FakeServer
+from fakeredis.aioredis import FakeRedis
+from src.core.cache import (
+    EntityCache,
+    MemoryCacheDriver,
+    RedisCacheDriver,
+    RedisInvalidationBus,
+)
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+@pytest.fixture()
+def clock() -> FakeClock:
+    return FakeClock()
+
+
+@pytest.fixture()
+def redis_server() -> FakeServer:
+    return FakeServer()
+
+
+async def load_value(value: bytes = b"{}") -> bytes:
+    return value
+
+
+@pytest.mark.anyio
+async def test_memory_driver_lru_eviction(clock: FakeClock):
+    driver = MemoryCacheDriver(max_entries=2, clock=clock)
+    await driver.set("recipe:1", b"1", ttl=60)
+    await driver.set("recipe:2", b"2", ttl=60)
+    assert await driver.get("recipe:1") == b"1"
+    await driver.set("recipe:3", b"3", ttl=60)
+
+    assert await driver.get("recipe:2") is None
+    assert await driver.get("recipe:1") == b"1"
+    assert (await driver.stats())["evictions"] == 1
+
+
+@pytest.mark.anyio
+async def test_memory_driver_ttl_expiry(clock: FakeClock):
+    cache = EntityCache(MemoryCacheDriver(max_entries=10, clock=clock), ttl=5)
+    await cache.get_or_load("user:1", load_value)
+    clock.now = 4.9
+    await cache.get_or_load("user:1", load_value)
+    clock.now = 5
+    await cache.get_or_load("user:1", load_value)
+
+    stats = await cache.snapshot()
+    assert (stats["hits"], stats["misses"], stats["expirations"]) == (1, 2, 1)
+
+
+@pytest.mark.anyio
+@pytest.mark.parametrize("backend", ["memory", "redis"])
+async def test_invalidate(backend: str, clock: FakeClock, redis_server: FakeServer):
+    if backend == "memory":
+        driver = MemoryCacheDriver(max_entries=10, clock=clock)
+    else:
+        driver = RedisCacheDriver(FakeRedis(server=redis_server), "test:")
+    cache = EntityCache(driver, ttl=60)
+    for key in ("recipe:1", "recipe:2", "category:1"):
+        await cache.get_or_load(key, load_value)
+
+    await cache.invalidate("recipe", [1])
+    assert await driver.get("recipe:1") is None
+    assert await driver.get("recipe:2") == b"{}"
+
+    await cache.invalidate_namespace("recipe")
+    assert await driver.get("recipe:2") is None
+    assert await driver.get("category:1") == b"{}"
+    stats = await cache.snapshot()
+    assert (stats["invalidations"], stats["size"]) == (2, 1)
+    assert (stats["hits"], stats["misses"], stats["stores"]) == (0, 3, 3)
+
+
+@pytest.mark.anyio
+async def test_redis_namespace_invalidation_skips_scan(
+    redis_server: FakeServer, monkeypatch: pytest.MonkeyPatch
+):
+    client = FakeRedis(server=redis_server)
+    cache = EntityCache(RedisCacheDriver(client, "test:"), ttl=60)
+    await client.set("other-app:category:1", b"theirs")
+    for key in ("category:1", "category:2", "recipe:1"):
+        await cache.get_or_load(key, load_value)
+    assert 0 < await client.pttl("test:namespace:category") <= 60_000
+
+    def scan_iter(*args, **kwargs):
+        raise AssertionError("namespace invalidation walked the keyspace")
+
+    monkeypatch.setattr(client, "scan_iter", scan_iter)
+    await cache.invalidate_namespace("category")
+    monkeypatch.undo()
+
+    assert await cache.driver.get("category:1") is None
+    assert await cache.driver.get("recipe:1") == b"{}"
+    assert await client.get("other-app:category:1") == b"theirs"
+    assert not await client.exists("test:namespace:category")
+    stats = await cache.snapshot()
+    assert (stats["invalidations"], stats["size"]) == (2, 1)
+
+    # Entries stored afterwards are listed again, and clear() takes it all.
+    await cache.get_or_load("category:3", load_value)
+    await cache.clear()
+    assert await client.keys("test:*") == [b"test:generation"]
+
+
+@pytest.mark.anyio
+async def test_load_racing_invalidation_is_not_stored(clock: FakeClock):
+    cache = EntityCache(MemoryCacheDriver(max_entries=10, clock=clock), ttl=60)
+
+    async def load() -> bytes:
+        await cache.invalidate("recipe", [1])
+        return b"stale"
+
+    assert await cache.get_or_load("recipe:1", load) == b"stale"
+    assert await cache.driver.get("recipe:1") is None
+    assert (await cache.snapshot())["stale_stores"] == 1
+
+
+@pytest.mark.anyio
+async def test_load_racing_invalidation_on_another_worker_is_not_stored(
+    redis_server: FakeServer,
+):
+    reader, writer = (
+        EntityCache(RedisCacheDriver(FakeRedis(server=redis_server), "test:"), ttl=60)
+        for _ in range(2)
+    )
+
+    async def load() -> bytes:
+        await writer.invalidate("recipe", [1])
+        return b"stale"
+
+    assert await reader.get_or_load("recipe:1", load) == b"stale"
+    assert await reader.driver.get("recipe:1") is None
+    # Clearing the cache keeps the generation, so the old token stays stale.
+    generation = await reader.generation()
+    await writer.clear()
+    await reader.set("recipe:1", b"stale", generation - 1)
+    assert await reader.driver.get("recipe:1") is None
+    await reader.set("recipe:1", b"fresh", await reader.generation())
+    assert await reader.driver.get("recipe:1") == b"fresh"
+
+
+@pytest.mark.anyio
+async def test_redis_driver_is_shared_between_workers(redis_server: FakeServer):
+    first, second = (
+        EntityCache(RedisCacheDriver(FakeRedis(server=redis_server), "test:"), ttl=60)
+        for _ in range(2)
+    )
+    await first.get_or_load("recipe:1", load_value)
+    assert await second.get_or_load("recipe:1", lambda: load_value(b"db")) == b"{}"
+
+    await second.invalidate("recipe", [1])
+    assert await first.get_or_load("recipe:1", lambda: load_value(b"db")) == b"db"
+
+
+@pytest.mark.anyio
+async def test_invalidation_bus_evicts_other_workers(redis_server: FakeServer):
+    workers = [
+        EntityCache(
+            MemoryCacheDriver(max_entries=10),
+            ttl=60,
+            bus=RedisInvalidationBus(FakeRedis(server=redis_server), "invalidate"),
+        )
+        for _ in range(2)
+    ]
+    for worker in workers:
+        await worker.start()
+    try:
+        # Subscribing clears the local cache; let that happen first.
+        await asyncio.sleep(0.05)
+        for worker in workers:
+            await worker.get_or_load("recipe:1", load_value)
+            await worker.get_or_load("category:1", load_value)
+
+        await workers[0].invalidate("recipe", [1])
+        await workers[0].invalidate_namespace("category")
+        for _ in range(100):
+            if (await workers[1].snapshot())["remote_invalidations"] == 2:
+                break
+            await asyncio.sleep(0.01)
+
+        assert await workers[1].driver.get("recipe:1") is None
+        assert await workers[1].driver.get("category:1") is None
+        assert (await workers[0].snapshot())["remote_invalidations"] == 0
+    finally:
+        for worker in workers:
+            await worker.stop()
+
+
+@pytest.mark.anyio
+async def test_invalidation_bus_survives_bad_messages(redis_server: FakeServer):
+    client = FakeRedis(server=redis_server)
+    worker = EntityCache(
+        MemoryCacheDriver(max_entries=10),
+        ttl=60,
+        bus=RedisInvalidationBus(FakeRedis(server=redis_server), "invalidate"),
+    )
+    await worker.start()
+    try:
+        await asyncio.sleep(0.05)
+        await worker.get_or_load("recipe:1", load_value)
+        # Undecodable: nothing says what to evict, so everything goes.
+        await client.publish("invalidate", b"not json")
+        for _ in range(100):
+            if await worker.driver.get("recipe:1") is None:
+                break
+            await asyncio.sleep(0.01)
+        assert await worker.driver.get("recipe:1") is None
+
+        await worker.get_or_load("recipe:2", load_value)
+        await client.publish(
+            "invalidate",
+            json.dumps({"origin": "other", "keys": ["recipe:2"], "prefix": None}),
+        )
+        for _ in range(100):
+            if (await worker.snapshot())["remote_invalidations"] == 1:
+                break
+            await asyncio.sleep(0.01)
+        assert await worker.driver.get("recipe:2") is None
+        assert not worker._listener.done()
+    finally:
+        await worker.stop()
@@ -0,0 +1,151 @@
+import gzip
+import zlib
+import pytest
+from fastapi import Depends, FastAPI, Request, Response
+from fastapi.responses import StreamingResponse
+from fastapi.testclient import TestClient
+from src.core.compression import (
+    CompressionMiddleware,
+    compressed_bytes,
+    negotiate_encoding,
+    skip_compression,
+)
+
+BODY = b'{"instructions": "' + b"Mix all ingredients. " * 200 + b'"}'
+
+app = FastAPI()
+app.add_middleware(CompressionMiddleware)
+
+
+@app.get("/large")
+async def large():
+    return Response(BODY, media_type="application/json", headers={"ETag": '"v1"'})
+
+
+@app.get("/conditional")
+async def conditional(request: Request):
+    if request.headers.get("if-none-match") == 'W/"v1"':
+        return Response(status_code=304, headers={"ETag": '"v1"'})
+    return Response(BODY, media_type="application/json", headers={"ETag": '"v1"'})
+
+
+@app.get("/small")
+async def small():
+    return Response(b'{"status": "ok"}', media_type="application/json")
+
+
+@app.get("/encoded")
+async def encoded():
+    return Response(
+        gzip.compress(BODY),
+        media_type="application/json",
+        headers={"Content-Encoding": "gzip"},
+    )
+
+
+@app.get("/image")
+async def image():
+    return Response(BODY, media_type="image/png")
+
+
+@app.get("/opt-out", dependencies=[Depends(skip_compression)])
+async def opt_out():
+    return Response(BODY, media_type="application/json")
+
+
+async def lines():
+    for i in range(3):
+        yield b'{"line": %d}\n' % i
+
+
+@pytest.fixture
+def compression_client():
+    with TestClient(app) as client:
+        yield client
+
+
+@pytest.mark.parametrize(
+    "accept_encoding, expected",
+    [
+        (None, None),
+        ("identity", None),
+        ("gzip", "gzip"),
+        ("gzip, br, zstd", "zstd"),
+        ("gzip;q=1, br;q=0.5", "gzip"),
+        ("zstd;q=0, *", "br"),
+        ("*;q=0", None),
+    ],
+)
+def test_negotiate_encoding(accept_encoding, expected):
+    assert negotiate_encoding(accept_encoding, ["zstd", "br", "gzip"]) == expected
+
+
+@pytest.mark.parametrize("encoding", ["gzip", "br", "zstd"])
+def test_compresses_large_bodies(compression_client: TestClient, encoding: str):
+    before = compressed_bytes.values.get((encoding, "in"), 0)
+    resp = compression_client.get("/large", headers={"Accept-Encoding": encoding})
+    assert resp.headers["Content-Encoding"] == encoding
+    assert resp.headers["Vary"] == "Accept-Encoding"
+    assert resp.headers["ETag"] == 'W/"v1"'
+    assert int(resp.headers["Content-Length"]) < len(BODY) / 10
+    assert resp.content == BODY
+    assert compressed_bytes.values[(encoding, "in")] - before == len(BODY)
+
+
+def test_not_modified_keeps_the_compressed_etag(compression_client: TestClient):
+    headers = {"Accept-Encoding": "gzip"}
+    resp = compression_client.get("/conditional", headers=headers)
+    assert resp.headers["Content-Encoding"] == "gzip"
+    etag = resp.headers["ETag"]
+
+    resp = compression_client.get(
+        "/conditional", headers={**headers, "If-None-Match": etag}
+    )
+    assert resp.status_code == 304
+    assert resp.headers["ETag"] == etag
+
+
+@pytest.mark.parametrize(
+    "path, encoding",
+    [("/small", None), ("/encoded", "gzip"), ("/image", None), ("/opt-out", None)],
+)
+def test_leaves_other_bodies_alone(
+    compression_client: TestClient, path: str, encoding: str | None
+):
+    resp = compression_client.get(path, headers={"Accept-Encoding": "zstd"})
+    assert resp.headers.get("Content-Encoding") == encoding
+
+
+@pytest.mark.anyio
+async def test_compresses_streams_chunk_by_chunk():
+    messages = []
+
+    async def receive():
+        raise AssertionError("not reading the request")
+
+    async def send(message):
+        messages.append(message)
+
+    scope = {
+        "type": "http",
+        # Spec 2.4 servers report disconnects on send, nothing listens.
+        "asgi": {"spec_version": "2.4"},
+        "method": "GET",
+        "path": "/stream",
+        "raw_path": b"/stream",
+        "query_string": b"",
+        "headers": [(b"accept-encoding", b"gzip")],
+    }
+    stream = StreamingResponse(lines(), media_type="application/x-ndjson")
+    await CompressionMiddleware(stream)(scope, receive, send)
+
+    start, *bodies = messages
+    headers = dict(start["headers"])
+    assert headers[b"content-encoding"] == b"gzip"
+    assert b"content-length" not in headers
+    decompressor = zlib.decompressobj(zlib.MAX_WBITS | 16)
+    # Every chunk is flushed, so each decodes to a whole line on arrival.
+    assert [decompressor.decompress(body["body"]) for body in bodies[:3]] == [
+        b'{"line": %d}\n' % i for i in range(3)
+    ]
+    assert bodies[-1]["more_body"] is False
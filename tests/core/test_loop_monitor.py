@@ -0,0 +1,41 @@
+import asyncio
+import time
+import pytest
+from src.core.loop_monitor import LoopMonitor, current_route
+from src.core.metrics import Histogram
+
+
+def test_histogram_buckets_are_cumulative():
+    histogram = Histogram(buckets=(0.01, 0.1))
+    for value in (0.005, 0.05, 0.05, 3.0):
+        histogram.observe(value)
+    snapshot = histogram.snapshot()
+    assert snapshot["buckets"] == {"0.01": 1, "0.1": 3, "+Inf": 4}
+    assert snapshot["count"] == 4
+    assert snapshot["max"] == 3.0
+
+
+def block_loop(seconds: float) -> None:
+    time.sleep(seconds)
+
+
+@pytest.mark.anyio
+async def test_loop_monitor_reports_blocking_route():
+    monitor = LoopMonitor(interval=0.01, threshold=0.05)
+    await monitor.start()
+    try:
+        await asyncio.sleep(0.05)
+
+        async def handler():
+            current_route.set("GET /slow")
+            block_loop(0.3)
+
+        await asyncio.create_task(handler())
+        await asyncio.sleep(0.05)
+    finally:
+        await monitor.stop()
+
+    assert monitor.blocks == 1
+    assert monitor.last_block.route == "GET /slow"
+    assert "block_loop" in monitor.last_block.stack
+    assert monitor.lag.max >= 0.2
@@ -0,0 +1,27 @@
+from src.core.metrics import Counter, HistogramMetric, Registry
+
+
+def test_registry_renders_prometheus_text():
+    registry = Registry()
+    requests = registry.register(
+        Counter("requests_total", "Requests.", ("route", "status"))
+    )
+    latency = registry.register(
+        HistogramMetric("latency_seconds", "Latency.", ("route",), buckets=(0.1, 1))
+    )
+    requests.inc("/items/{id}", "200")
+    requests.inc("/items/{id}", "200")
+    requests.inc('say "hi"', "404")
+    latency.labels("/items/{id}").observe(0.05)
+    latency.labels("/items/{id}").observe(2.5)
+
+    lines = registry.render().splitlines()
+    assert "# TYPE requests_total counter" in lines
+    assert 'requests_total{route="/items/{id}",status="200"} 2' in lines
+    assert 'requests_total{route="say \\"hi\\"",status="404"} 1' in lines
+    assert "# TYPE latency_seconds histogram" in lines
+    assert 'latency_seconds_bucket{route="/items/{id}",le="0.1"} 1' in lines
+    assert 'latency_seconds_bucket{route="/items/{id}",le="1"} 1' in lines
+    assert 'latency_seconds_bucket{route="/items/{id}",le="+Inf"} 2' in lines
+    assert 'latency_seconds_sum{route="/items/{id}"} 2.55' in lines
+    assert 'latency_seconds_count{route="/items/{id}"} 2' in lines
@@ -0,0 +1,42 @@
+import asyncio
+import threading
+import pytest
+from passlib.context import CryptContext
+from src.core.exceptions import ErrorException
+from src.core.security import PasswordHasherPool, pwd_context
+
+
+@pytest.mark.anyio
+async def test_password_pool_rejects_when_saturated():
+    pool = PasswordHasherPool(workers=1, max_pending=1)
+    release = threading.Event()
+    try:
+        busy = asyncio.ensure_future(pool.run(release.wait))
+        await asyncio.sleep(0)
+        with pytest.raises(ErrorException) as exc_info:
+            await pool.hash("password")
+        assert exc_info.value.code == 503
+        assert exc_info.value.headers == {"Retry-After": "1"}
+        assert pool.rejected == 1
+        release.set()
+        await busy
+        assert pool.pending == 0
+        assert pwd_context.verify("password", await pool.hash("password"))
+    finally:
+        release.set()
+        pool.close()
+
+
+@pytest.mark.anyio
+async def test_password_pool_flags_outdated_hash():
+    pool = PasswordHasherPool(workers=1, max_pending=1)
+    weak = CryptContext(schemes=["argon2"], argon2__memory_cost=1024)
+    try:
+        valid, new_hash = await pool.verify_and_update(
+            "password", weak.hash("password")
+        )
+        assert valid
+        assert not pwd_context.needs_update(new_hash)
+        assert await pool.verify_and_update("wrong", new_hash) == (False, None)
+    finally:
+        pool.close()
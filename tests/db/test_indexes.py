@@ -0,0 +1,37 @@
+import pytest
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+
+
+@pytest.mark.parametrize(
+    ("query", "index_name"),
+    [
+        (
+            "SELECT * FROM recipes WHERE user_id = 1 AND id > 0 ORDER BY id LIMIT 51",
+            "ix_recipes_user_id_id",
+        ),
+        (
+            "SELECT * FROM recipes WHERE is_vegan = true AND id > 0 ORDER BY id",
+            "ix_recipes_is_vegan_id",
+        ),
+        (
+            "SELECT * FROM recipes "
+            "WHERE search_vector @@ websearch_to_tsquery('english', 'tomato')",
+            "ix_recipes_search_vector",
+        ),
+        (
+            "SELECT * FROM recipe_ingredients WHERE ingredient_id = 1",
+            "ix_recipe_ingredients_ingredient_id_recipe_id",
+        ),
+        (
+            "SELECT * FROM ingredient_category WHERE category_id = 1",
+            "ix_ingredient_category_category_id",
+        ),
+    ],
+)
+def test_hot_queries_use_index(db: Session, query: str, index_name: str):
+    # Test tables are tiny, so rule out the sequential scan the planner
+    # would otherwise prefer and check that the index can serve the query.
+    db.execute(text("SET LOCAL enable_seqscan = off"))
+    plan = "\n".join(db.execute(text(f"EXPLAIN {query}")).scalars())
+    assert index_name in plan
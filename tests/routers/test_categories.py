@@ -29,8 +29,8 @@ def test_list_categories(client: TestClient, category_factory: callable):
     c2 = category_factory()
     resp = client.get("/categories")
     assert resp.status_code == 200
-    assert len(resp.json()) == 2
-    ids = {c["id"] for c in resp.json()}
+    assert len(resp.json()["items"]) == 2
+    ids = {c["id"] for c in resp.json()["items"]}
     assert ids == {c1.id, c2.id}
 
 
@@ -42,3 +42,25 @@ def test_update_category(client: TestClient, category: Category):
     data = resp.json()
     assert data["id"] == category.id
     assert data["name"] == new_payload.name.capitalize()
+
+
+@pytest.mark.anyio
+def test_list_categories_query_budget(
+    client: TestClient, ingredient_factory: callable, query_budget
+):
+    for _ in range(25):
+        ingredient_factory()
+
+    # One page query, ingredients aggregated into it.
+    with query_budget(1):
+        resp = client.get("/categories", params={"limit": 50})
+    items = resp.json()["items"]
+    assert len(items) == 50
+    assert items[0] == client.get(f"/categories/{items[0]['id']}").json()
+    with query_budget(1):
+        resp = client.get(
+            "/categories",
+            params={"limit": 50},
+            headers={"If-None-Match": resp.headers["ETag"]},
+        )
+    assert resp.status_code == 304
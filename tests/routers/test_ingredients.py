@@ -1,3 +1,4 @@
+import msgpack
 import pytest
 from src.db.models.ingredients import Ingredient
 from tests.factories import make_ingredient_payload
@@ -35,14 +36,29 @@ def test_get_ingredient(client: TestClient, ingredient: Ingredient):
     assert data["categories"] == expected_categories
 
 
+@pytest.mark.anyio
+def test_get_ingredient_sparse_fields_conditional(
+    client: TestClient, ingredient: Ingredient
+):
+    url = f"/ingredients/{ingredient.id}?fields=name"
+    resp = client.get(url)
+    assert resp.json() == {"id": ingredient.id, "name": ingredient.name.capitalize()}
+    etag = resp.headers["ETag"]
+    assert etag != client.get(f"/ingredients/{ingredient.id}").headers["ETag"]
+
+    resp = client.get(url, headers={"If-None-Match": etag})
+    assert resp.status_code == 304
+    assert resp.headers["ETag"] == etag
+
+
 @pytest.mark.anyio
 def test_list_ingredients(client: TestClient, ingredient_factory: callable):
     i1 = ingredient_factory()
     i2 = ingredient_factory()
     resp = client.get("/ingredients")
     assert resp.status_code == 200
-    assert len(resp.json()) == 2
-    ids = {i["id"] for i in resp.json()}
+    assert len(resp.json()["items"]) == 2
+    ids = {i["id"] for i in resp.json()["items"]}
     assert ids == {i1.id, i2.id}
 
 
@@ -67,3 +83,150 @@ def test_update_ingredient(
         {"id": cat.id, "name": cat.name} for cat in new_payload.categories
     ]
     assert data["categories"] == expected_categories
+
+
+@pytest.mark.anyio
+def test_bulk_upsert_ingredients(
+    client: TestClient, ingredient: Ingredient, category_factory: callable
+):
+    category = category_factory()
+    was_vegan = ingredient.is_vegan
+    payload = [
+        {
+            "name": "kale",
+            "is_vegan": True,
+            "categories": [{"id": category.id, "name": category.name}],
+        },
+        {"name": ingredient.name, "is_vegan": not was_vegan},
+        {"name": "kale", "is_vegan": False},
+        {
+            "name": "tofu",
+            "is_vegan": True,
+            "categories": [{"id": 999999, "name": "missing"}],
+        },
+    ]
+    resp = client.post("/ingredients/bulk", json=payload)
+    assert resp.status_code == 200
+    data = resp.json()
+    assert (data["created"], data["updated"], data["skipped"], data["failed"]) == (
+        1,
+        1,
+        0,
+        2,
+    )
+    assert [r["status"] for r in data["results"]] == [
+        "created",
+        "updated",
+        "failed",
+        "failed",
+    ]
+    assert data["results"][1]["id"] == ingredient.id
+    assert data["results"][3]["error"] == "Unknown category ids: [999999]"
+
+    kale = client.get(f"/ingredients/{data['results'][0]['id']}").json()
+    assert kale["categories"] == [{"id": category.id, "name": category.name}]
+    updated = client.get(f"/ingredients/{ingredient.id}").json()
+    assert updated["is_vegan"] is not was_vegan
+    assert updated["categories"] == []
+
+
+@pytest.mark.anyio
+def test_bulk_upsert_ingredients_skip_existing(
+    client: TestClient, ingredient: Ingredient
+):
+    was_vegan = ingredient.is_vegan
+    payload = [{"name": ingredient.name, "is_vegan": not was_vegan}]
+    resp = client.post("/ingredients/bulk?on_conflict=skip", json=payload)
+    assert resp.status_code == 200
+    data = resp.json()
+    assert data["skipped"] == 1
+    assert data["results"][0]["id"] == ingredient.id
+    resp = client.get(f"/ingredients/{ingredient.id}")
+    assert resp.json()["is_vegan"] is was_vegan
+
+
+@pytest.mark.anyio
+def test_bulk_upsert_ingredients_msgpack(client: TestClient):
+    payload = [{"name": "kale", "is_vegan": True}, {"name": "kale", "is_vegan": False}]
+    resp = client.post(
+        "/ingredients/bulk",
+        content=msgpack.packb(payload),
+        headers={
+            "Content-Type": "application/msgpack",
+            "Accept": "application/msgpack",
+        },
+    )
+    assert resp.status_code == 200
+    data = msgpack.unpackb(resp.content)
+    assert (data["created"], data["failed"]) == (1, 1)
+
+    resp = client.post(
+        "/ingredients/bulk",
+        content=msgpack.packb([{"name": "kale"}]),
+        headers={"Content-Type": "application/msgpack"},
+    )
+    assert resp.status_code == 422
+    resp = client.post(
+        "/ingredients/bulk",
+        content=b"\xc1",
+        headers={"Content-Type": "application/msgpack"},
+    )
+    assert resp.status_code == 400
+
+
+@pytest.mark.anyio
+def test_get_ingredient_cached_until_update(
+    client: TestClient, ingredient: Ingredient, category_factory: callable
+):
+    assert client.get(f"/ingredients/{ingredient.id}").status_code == 200
+    assert client.get(f"/ingredients/{ingredient.id}").status_code == 200
+    assert client.get("/health/cache").json()["hits"] == 1
+
+    category = category_factory()
+    assert client.get(f"/categories/{category.id}").json()["ingredients"] == []
+    payload = {
+        "name": "renamed",
+        "is_vegan": ingredient.is_vegan,
+        "categories": [{"id": category.id, "name": category.name}],
+    }
+    client.put(f"/ingredients/{ingredient.id}", json=payload)
+    assert client.get(f"/ingredients/{ingredient.id}").json()["name"] == "Renamed"
+    ingredients = client.get(f"/categories/{category.id}").json()["ingredients"]
+    assert [i["id"] for i in ingredients] == [ingredient.id]
+
+
+@pytest.mark.anyio
+def test_category_etag_changes_when_ingredient_leaves(
+    client: TestClient, ingredient: Ingredient
+):
+    category = ingredient.categories[0]
+    etag = client.get(f"/categories/{category.id}").headers["ETag"]
+
+    payload = {"name": ingredient.name, "is_vegan": ingredient.is_vegan}
+    assert client.put(f"/ingredients/{ingredient.id}", json=payload).status_code == 200
+
+    resp = client.get(f"/categories/{category.id}", headers={"If-None-Match": etag})
+    assert resp.status_code == 200
+    assert resp.json()["ingredients"] == []
+
+
+@pytest.mark.anyio
+def test_list_ingredients_query_budget(
+    client: TestClient, ingredient_factory: callable, query_budget
+):
+    for _ in range(50):
+        ingredient_factory()
+
+    # One page query, categories aggregated into it.
+    with query_budget(1):
+        resp = client.get("/ingredients", params={"limit": 50})
+    items = resp.json()["items"]
+    assert len(items) == 50
+    assert items[0] == client.get(f"/ingredients/{items[0]['id']}").json()
+    with query_budget(1):
+        resp = client.get(
+            "/ingredients",
+            params={"limit": 50},
+            headers={"If-None-Match": resp.headers["ETag"]},
+        )
+    assert resp.status_code == 304
@@ -1,5 +1,11 @@
+import json
+import anyio
+import msgpack
 import pytest
 from fastapi.testclient import TestClient
+from src.api.common.pagination import MAX_PAGE_SIZE
+from src.api.recipes.services import INSTRUCTIONS_PREVIEW_LENGTH
+from src.core.cache import entity_cache
 from src.db.models.recipes import Recipe
 from src.db.models.users import User
 from tests.factories import make_recipe_payload
@@ -46,10 +52,229 @@ def test_list_recipes(client: TestClient, recipe_factory):
 
     resp = client.get("/recipes")
     assert resp.status_code == 200
-    data = resp.json()
+    data = resp.json()["items"]
     ids = {item["id"] for item in data}
     assert ids == {r1.id, r2.id}
     assert all("is_vegan" in item for item in data)
+    assert resp.json()["next_cursor"] is None
+    # Pages are read as rows, single recipes as entities: same representation.
+    for item in data:
+        assert item == client.get(f"/recipes/{item['id']}").json()
+
+
+@pytest.mark.anyio
+def test_recipes_sparse_fieldsets(client: TestClient, recipe_factory, query_budget):
+    recipe = recipe_factory()
+    fields = {"fields": "name, cooking_time"}
+
+    with query_budget(1) as statements:
+        resp = client.get("/recipes", params=fields)
+    assert resp.json()["items"] == [
+        {
+            "id": recipe.id,
+            "name": recipe.name.capitalize(),
+            "cooking_time": recipe.cooking_time,
+        }
+    ]
+    # Neither the instructions nor the ingredient rows are read.
+    assert "instructions" not in statements[0]
+    assert "recipe_ingredients" not in statements[0]
+
+    full = client.get(f"/recipes/{recipe.id}")
+    sparse = client.get(f"/recipes/{recipe.id}", params=fields)
+    assert sparse.json() == {
+        key: full.json()[key] for key in ("id", "name", "cooking_time")
+    }
+    assert sparse.headers["ETag"] != full.headers["ETag"]
+    resp = client.get(
+        f"/recipes/{recipe.id}",
+        params=fields,
+        headers={"If-None-Match": sparse.headers["ETag"]},
+    )
+    assert resp.status_code == 304
+
+    resp = client.get("/recipes", params={"fields": "name,secret"})
+    assert resp.status_code == 422
+    assert resp.json()["message"] == "Unknown fields: secret"
+
+
+@pytest.mark.anyio
+def test_list_recipes_summary_view(client: TestClient, recipe_factory, user: User):
+    long_recipe = recipe_factory(user=user, instructions="Stir. " * 100)
+    short_recipe = recipe_factory(user=user, instructions="Mix well")
+
+    full = client.get("/recipes")
+    for path in ("/recipes", f"/recipes/user/{user.id}"):
+        resp = client.get(path, params={"view": "summary"})
+        items = {item["id"]: item for item in resp.json()["items"]}
+        assert all("instructions" not in item for item in items.values())
+        preview = items[long_recipe.id]["instructions_preview"]
+        assert len(preview) == INSTRUCTIONS_PREVIEW_LENGTH
+        assert preview == long_recipe.instructions[:159] + "…"
+        assert items[short_recipe.id]["instructions_preview"] == "Mix well"
+    assert resp.headers["ETag"] != full.headers["ETag"]
+    # The single-recipe endpoint keeps the full text.
+    resp = client.get(f"/recipes/{long_recipe.id}")
+    assert resp.json()["instructions"] == long_recipe.instructions
+
+    resp = client.get(
+        "/recipes", params={"view": "summary", "fields": "instructions_preview"}
+    )
+    assert set(resp.json()["items"][0]) == {"id", "instructions_preview"}
+    resp = client.get("/recipes", params={"view": "summary", "fields": "instructions"})
+    assert resp.status_code == 422
+
+
+@pytest.mark.anyio
+def test_list_recipes_paginated(client: TestClient, recipe_factory):
+    recipes = [recipe_factory() for _ in range(3)]
+
+    first = client.get("/recipes", params={"limit": 2})
+    assert first.status_code == 200
+    first_page = first.json()
+    assert [item["id"] for item in first_page["items"]] == [r.id for r in recipes[:2]]
+    assert first_page["next_cursor"] is not None
+
+    second = client.get(
+        "/recipes", params={"limit": 2, "cursor": first_page["next_cursor"]}
+    )
+    assert second.status_code == 200
+    second_page = second.json()
+    assert [item["id"] for item in second_page["items"]] == [recipes[2].id]
+    assert second_page["next_cursor"] is None
+
+
+@pytest.mark.anyio
+def test_list_recipes_invalid_cursor(client: TestClient):
+    resp = client.get("/recipes", params={"cursor": "not-a-cursor"})
+    assert resp.status_code == 422
+
+
+@pytest.mark.anyio
+def test_create_vegan_recipe(
+    client: TestClient, user: User, ingredient_factory, auth_headers: dict
+):
+    ingredients = [ingredient_factory(is_vegan=True), ingredient_factory(is_vegan=True)]
+    payload = make_recipe_payload(
+        user_id=user.id, ingredient_ids=[ingredient.id for ingredient in ingredients]
+    )
+
+    resp = client.post(
+        "/recipes", json=payload.model_dump(mode="json"), headers=auth_headers
+    )
+    assert resp.status_code == 201
+    assert resp.json()["is_vegan"] is True
+
+
+@pytest.mark.anyio
+def test_list_vegan_recipes(client: TestClient, recipe_factory, ingredient_factory):
+    vegan = recipe_factory(ingredients=[ingredient_factory(is_vegan=True)])
+    recipe_factory(ingredients=[ingredient_factory(is_vegan=False)])
+
+    resp = client.get("/recipes", params={"is_vegan": True})
+    assert resp.status_code == 200
+    assert [item["id"] for item in resp.json()["items"]] == [vegan.id]
+
+
+@pytest.mark.anyio
+def test_ingredient_flip_updates_recipe_is_vegan(
+    client: TestClient, recipe_factory, ingredient_factory
+):
+    ingredient = ingredient_factory(is_vegan=True)
+    recipe = recipe_factory(ingredients=[ingredient])
+    assert client.get(f"/recipes/{recipe.id}").json()["is_vegan"] is True
+
+    payload = {
+        "name": ingredient.name,
+        "is_vegan": False,
+        "categories": [{"id": c.id, "name": c.name} for c in ingredient.categories],
+    }
+    resp = client.put(f"/ingredients/{ingredient.id}", json=payload)
+    assert resp.status_code == 200
+
+    assert client.get(f"/recipes/{recipe.id}").json()["is_vegan"] is False
+
+
+@pytest.mark.anyio
+def test_search_recipes_ranks_name_matches_first(client: TestClient, recipe_factory):
+    in_instructions = recipe_factory(instructions="Serve next to a tomato salad")
+    in_name = recipe_factory(name="tomato soup", instructions="Simmer slowly")
+    recipe_factory(name="plain rice", instructions="Boil water")
+
+    resp = client.get("/recipes/search", params={"q": "tomato"})
+    assert resp.status_code == 200
+    ids = [item["id"] for item in resp.json()["items"]]
+    assert ids == [in_name.id, in_instructions.id]
+
+
+@pytest.mark.anyio
+def test_search_recipes_by_ingredient_name(
+    client: TestClient, recipe_factory, ingredient_factory
+):
+    ingredient = ingredient_factory(name="chickpeas")
+    recipe = recipe_factory(name="hummus", ingredients=[ingredient])
+
+    resp = client.get("/recipes/search", params={"q": "chickpeas"})
+    assert [item["id"] for item in resp.json()["items"]] == [recipe.id]
+
+    payload = {"name": "garbanzo", "is_vegan": True, "categories": []}
+    assert client.put(f"/ingredients/{ingredient.id}", json=payload).status_code == 200
+
+    resp = client.get("/recipes/search", params={"q": "garbanzo"})
+    assert [item["id"] for item in resp.json()["items"]] == [recipe.id]
+    resp = client.get("/recipes/search", params={"q": "chickpeas"})
+    assert resp.json()["items"] == []
+
+
+@pytest.mark.anyio
+def test_search_recipes_paginated(client: TestClient, recipe_factory):
+    recipes = [recipe_factory(instructions="Fold in the basil") for _ in range(3)]
+
+    seen = []
+    params = {"q": "basil", "limit": 2}
+    while True:
+        page = client.get("/recipes/search", params=params).json()
+        seen.extend(item["id"] for item in page["items"])
+        if page["next_cursor"] is None:
+            break
+        params["cursor"] = page["next_cursor"]
+    assert sorted(seen) == sorted(recipe.id for recipe in recipes)
+    assert len(seen) == len(recipes)
+
+
+@pytest.mark.anyio
+def test_match_recipes_ranked_by_coverage(
+    client: TestClient, recipe_factory, ingredient_factory
+):
+    i1, i2, i3, i4, i5 = (ingredient_factory() for _ in range(5))
+    full = recipe_factory(ingredients=[i1, i2])
+    partial = recipe_factory(ingredients=[i1, i2, i3, i4])
+    recipe_factory(ingredients=[i5])
+
+    resp = client.post("/recipes/match", json={"ingredient_ids": [i1.id, i2.id, i3.id]})
+    assert resp.status_code == 200
+    data = resp.json()
+    assert [match["recipe"]["id"] for match in data] == [full.id, partial.id]
+    assert data[0]["coverage"] == 1.0
+    assert data[0]["missing_ingredient_ids"] == []
+    assert data[1]["matched_ingredients"] == 3
+    assert data[1]["total_ingredients"] == 4
+    assert data[1]["coverage"] == 0.75
+    assert data[1]["missing_ingredient_ids"] == [i4.id]
+
+
+@pytest.mark.anyio
+def test_match_recipes_filters(client: TestClient, recipe_factory, ingredient_factory):
+    ingredient = ingredient_factory()
+    quick = recipe_factory(ingredients=[ingredient], cooking_time=15)
+    recipe_factory(ingredients=[ingredient], cooking_time=90)
+
+    resp = client.post(
+        "/recipes/match",
+        json={"ingredient_ids": [ingredient.id], "max_cooking_time": 30},
+    )
+    assert resp.status_code == 200
+    assert [match["recipe"]["id"] for match in resp.json()] == [quick.id]
 
 
 @pytest.mark.anyio
@@ -60,7 +285,7 @@ def test_get_user_recipes(client: TestClient, recipe_factory, user_factory):
 
     resp = client.get(f"/recipes/user/{user.id}")
     assert resp.status_code == 200
-    data = resp.json()
+    data = resp.json()["items"]
     assert len(data) == 2
     assert all(item["user_id"] == user.id for item in data)
 
@@ -146,3 +371,336 @@ def test_update_recipe_forbidden_user(
         headers=other_auth_headers,
     )
     assert resp.status_code == 403
+
+
+@pytest.mark.anyio
+def test_bulk_ingredient_flip_updates_recipe_is_vegan(
+    client: TestClient, recipe_factory, ingredient_factory
+):
+    ingredient = ingredient_factory(is_vegan=True)
+    recipe = recipe_factory(ingredients=[ingredient])
+
+    payload = [{"name": ingredient.name, "is_vegan": False}]
+    resp = client.post("/ingredients/bulk", json=payload)
+    assert resp.json()["updated"] == 1
+
+    assert client.get(f"/recipes/{recipe.id}").json()["is_vegan"] is False
+
+
+@pytest.mark.anyio
+def test_import_recipes_ndjson(
+    client: TestClient,
+    user: User,
+    recipe: Recipe,
+    ingredient_factory,
+    auth_headers: dict,
+):
+    vegan = ingredient_factory(is_vegan=True)
+    lines = [
+        make_recipe_payload(
+            user_id=user.id, ingredient_ids=[vegan.id], name="imported lentil stew"
+        ).model_dump_json(),
+        "",
+        '{"name": "broken"',
+        make_recipe_payload(user_id=user.id, ingredient_ids=[999999]).model_dump_json(),
+        make_recipe_payload(
+            user_id=user.id, ingredient_ids=[vegan.id], name=recipe.name
+        ).model_dump_json(),
+    ]
+    resp = client.post(
+        "/recipes/import",
+        content="\n".join(lines).encode(),
+        headers={**auth_headers, "Content-Type": "application/x-ndjson"},
+    )
+    assert resp.status_code == 200
+    data = resp.json()
+    assert data["imported"] == 1
+    assert data["failed"] == 3
+    errors = {error["line"]: error["error"] for error in data["errors"]}
+    assert set(errors) == {3, 4, 5}
+    assert errors[4] == "Ingredients not found: [999999]"
+    assert errors[5] == "Recipe name already exists"
+
+    found = client.get("/recipes/search", params={"q": "lentil"}).json()["items"]
+    assert len(found) == 1
+    assert found[0]["is_vegan"] is True
+    assert found[0]["user_id"] == user.id
+    assert found[0]["ingredients"] == [
+        {"ingredient_id": vegan.id, "quantity": "1 unit"}
+    ]
+
+
+@pytest.mark.anyio
+def test_import_recipes_msgpack(
+    client: TestClient, user: User, ingredient_factory, auth_headers: dict
+):
+    vegan = ingredient_factory(is_vegan=True)
+    objects = [
+        make_recipe_payload(
+            user_id=user.id, ingredient_ids=[vegan.id], name=f"packed stew {i}"
+        ).model_dump(mode="json")
+        for i in range(2)
+    ]
+    objects.insert(1, {"name": "broken"})
+    resp = client.post(
+        "/recipes/import",
+        content=b"".join(map(msgpack.packb, objects)),
+        headers={**auth_headers, "Content-Type": "application/msgpack"},
+    )
+    assert resp.status_code == 200
+    data = resp.json()
+    assert (data["imported"], data["failed"]) == (2, 1)
+    assert data["errors"][0]["line"] == 2
+
+    resp = client.post(
+        "/recipes/import",
+        content=msgpack.packb(objects[0])[:-1],
+        headers={**auth_headers, "Content-Type": "application/msgpack"},
+    )
+    assert resp.status_code == 400
+
+
+@pytest.mark.anyio
+def test_export_recipes_ndjson(client: TestClient, recipe_factory):
+    recipes = [recipe_factory() for _ in range(3)]
+
+    resp = client.get("/recipes/export", headers={"Accept-Encoding": "identity"})
+    assert resp.status_code == 200
+    assert resp.headers["content-type"] == "application/x-ndjson"
+    assert "content-encoding" not in resp.headers
+    lines = [json.loads(line) for line in resp.text.splitlines()]
+    assert [line["id"] for line in lines] == [recipe.id for recipe in recipes]
+    assert lines[0]["ingredients"] == recipes[0].recipe_ingredients_payload
+
+
+@pytest.mark.anyio
+def test_export_recipes_gzip(client: TestClient, recipe_factory):
+    recipe = recipe_factory()
+
+    resp = client.get("/recipes/export", headers={"Accept-Encoding": "gzip"})
+    assert resp.headers["content-encoding"] == "gzip"
+    assert [json.loads(line)["id"] for line in resp.text.splitlines()] == [recipe.id]
+
+
+@pytest.mark.anyio
+def test_list_recipes_compressed(client: TestClient, recipe_factory):
+    for _ in range(5):
+        recipe_factory()
+    resp = client.get("/recipes", headers={"Accept-Encoding": "br"})
+    assert resp.headers["Content-Encoding"] == "br"
+    assert "Accept-Encoding" in resp.headers["Vary"]
+    assert len(resp.json()["items"]) == 5
+    etag = resp.headers["ETag"]
+    assert etag.startswith("W/")
+
+    resp = client.get(
+        "/recipes", headers={"Accept-Encoding": "br", "If-None-Match": etag}
+    )
+    assert resp.status_code == 304
+    assert resp.headers["ETag"] == etag
+    metrics = scrape(client)
+    assert metrics[
+        'http_response_compression_bytes_total{encoding="br",direction="in"}'
+    ]
+
+
+@pytest.mark.anyio
+def test_get_recipe_conditional(
+    client: TestClient, recipe: Recipe, ingredient_factory, auth_headers: dict
+):
+    resp = client.get(f"/recipes/{recipe.id}")
+    etag = resp.headers["ETag"]
+    last_modified = resp.headers["Last-Modified"]
+
+    resp = client.get(f"/recipes/{recipe.id}", headers={"If-None-Match": etag})
+    assert resp.status_code == 304
+    assert resp.headers["ETag"] == etag
+    assert resp.content == b""
+    resp = client.get(
+        f"/recipes/{recipe.id}", headers={"If-Modified-Since": last_modified}
+    )
+    assert resp.status_code == 304
+    # A cache miss is answered from the version query alone.
+    anyio.run(entity_cache.clear)
+    resp = client.get(f"/recipes/{recipe.id}", headers={"If-None-Match": etag})
+    assert resp.status_code == 304
+
+    payload = make_recipe_payload(
+        user_id=recipe.user_id, ingredient_ids=[ingredient_factory().id]
+    )
+    client.put(f"/recipes/{recipe.id}", json=payload.model_dump(), headers=auth_headers)
+    resp = client.get(f"/recipes/{recipe.id}", headers={"If-None-Match": etag})
+    assert resp.status_code == 200
+    assert resp.headers["ETag"] != etag
+
+
+@pytest.mark.anyio
+def test_ingredient_flip_changes_recipe_etag(
+    client: TestClient, recipe_factory, ingredient_factory
+):
+    ingredient = ingredient_factory(is_vegan=True)
+    recipe = recipe_factory(ingredients=[ingredient])
+    etag = client.get(f"/recipes/{recipe.id}").headers["ETag"]
+    list_etag = client.get("/recipes").headers["ETag"]
+
+    payload = {"name": ingredient.name, "is_vegan": False, "categories": []}
+    client.put(f"/ingredients/{ingredient.id}", json=payload)
+
+    resp = client.get(f"/recipes/{recipe.id}", headers={"If-None-Match": etag})
+    assert resp.status_code == 200
+    assert resp.json()["is_vegan"] is False
+    resp = client.get("/recipes", headers={"If-None-Match": list_etag})
+    assert resp.status_code == 200
+
+
+@pytest.mark.anyio
+def test_list_recipes_conditional(client: TestClient, recipe_factory):
+    recipe_factory()
+    # Uncompressed, so the ETag stays strong.
+    resp = client.get("/recipes", headers={"Accept-Encoding": "identity"})
+    etag = resp.headers["ETag"]
+    assert not etag.startswith("W/")
+    assert "Last-Modified" not in resp.headers
+
+    assert client.get("/recipes", headers={"If-None-Match": etag}).status_code == 304
+    resp = client.get("/recipes", headers={"If-None-Match": f'W/{etag}, "other"'})
+    assert resp.status_code == 304
+
+    recipe_factory()
+    resp = client.get("/recipes", headers={"If-None-Match": etag})
+    assert resp.status_code == 200
+    assert len(resp.json()["items"]) == 2
+
+
+@pytest.mark.anyio
+def test_recipes_msgpack(client: TestClient, recipe_factory):
+    recipe = recipe_factory()
+    accept = {"Accept": "application/msgpack"}
+    resp = client.get(f"/recipes/{recipe.id}")
+    json_etag = resp.headers["ETag"]
+    assert resp.headers["Vary"] == "Accept"
+
+    # Encoded from the schema on a miss, transcoded from the cached JSON on a hit.
+    for _ in range(2):
+        resp = client.get(f"/recipes/{recipe.id}", headers=accept)
+        assert resp.status_code == 200
+        assert resp.headers["content-type"] == "application/msgpack"
+        assert (
+            msgpack.unpackb(resp.content) == client.get(f"/recipes/{recipe.id}").json()
+        )
+    etag = resp.headers["ETag"]
+    assert etag != json_etag
+
+    resp = client.get(
+        f"/recipes/{recipe.id}", headers={**accept, "If-None-Match": etag}
+    )
+    assert resp.status_code == 304
+    assert resp.headers["ETag"] == etag
+    resp = client.get(
+        f"/recipes/{recipe.id}", headers={**accept, "If-None-Match": json_etag}
+    )
+    assert resp.status_code == 200
+
+    resp = client.get("/recipes", headers={"Accept": "application/msgpack, */*;q=0.5"})
+    assert msgpack.unpackb(resp.content) == client.get("/recipes").json()
+    resp = client.get("/recipes", headers={"Accept": "application/msgpack;q=0.5, */*"})
+    assert resp.headers["content-type"] == "application/json"
+    resp = client.get("/recipes/0", headers=accept)
+    assert resp.status_code == 404
+    assert msgpack.unpackb(resp.content)["message"] == "Recipe not found"
+
+
+@pytest.mark.anyio
+def test_framework_errors_msgpack(client: TestClient):
+    accept = {"Accept": "application/msgpack"}
+    resp = client.get("/users/me/", headers=accept)
+    assert resp.status_code == 401
+    assert resp.headers["content-type"] == "application/msgpack"
+    assert resp.headers["Vary"] == "Accept"
+    assert resp.headers["WWW-Authenticate"] == "Bearer"
+    assert msgpack.unpackb(resp.content) == {"detail": "Not authenticated"}
+
+    resp = client.get("/recipes/", params={"limit": 0}, headers=accept)
+    assert resp.status_code == 422
+    assert resp.headers["content-type"] == "application/msgpack"
+    assert resp.headers["Vary"] == "Accept"
+    [error] = msgpack.unpackb(resp.content)["detail"]
+    assert error["loc"] == ["query", "limit"]
+    # JSON clients keep FastAPI's bodies.
+    assert client.get("/users/me/").json() == {"detail": "Not authenticated"}
+
+
+def scrape(client: TestClient) -> dict[str, float]:
+    resp = client.get("/metrics")
+    assert resp.status_code == 200
+    assert resp.headers["content-type"].startswith("text/plain; version=0.0.4")
+    samples = (
+        line.rsplit(" ", 1) for line in resp.text.splitlines() if line[:1] != "#"
+    )
+    return {name: float(value) for name, value in samples}
+
+
+@pytest.mark.anyio
+def test_metrics_count_requests_by_route_template(client: TestClient, recipe: Recipe):
+    route = 'method="GET",route="/recipes/{recipe_id}"'
+    ok = f'http_requests_total{{{route},status="200"}}'
+    not_found = f'http_requests_total{{{route},status="404"}}'
+    count = f"http_request_duration_seconds_count{{{route}}}"
+    before = scrape(client)
+
+    client.get(f"/recipes/{recipe.id}")
+    client.get(f"/recipes/{recipe.id}")
+    client.get("/recipes/999999")
+
+    after = scrape(client)
+    assert after[ok] - before.get(ok, 0) == 2
+    assert after[not_found] - before.get(not_found, 0) == 1
+    assert after[count] - before.get(count, 0) == 3
+    recipe_hits = 'entity_cache_requests_total{namespace="recipe",result="hit"}'
+    assert after[recipe_hits] - before.get(recipe_hits, 0) == 1
+    assert 'entity_cache_hit_ratio{namespace="recipe"}' in after
+    assert "password_hash_pending" in after
+
+
+@pytest.mark.anyio
+def test_server_timing_counts_queries(client: TestClient, recipe_factory):
+    for _ in range(3):
+        recipe_factory()
+
+    resp = client.get("/recipes")
+    timing = dict(
+        metric.strip().split(";", 1)
+        for metric in resp.headers["Server-Timing"].split(",")
+    )
+    assert set(timing) == {"db", "db_queries", "serialize"}
+    # One page query, ingredients included, however many recipes there are.
+    assert timing["db_queries"] == 'desc="1"'
+    assert timing["db"].startswith("dur=")
+
+
+@pytest.mark.anyio
+def test_recipe_reads_query_budget(
+    client: TestClient, recipe_factory, user: User, ingredient_factory, query_budget
+):
+    ingredients = [ingredient_factory(), ingredient_factory()]
+    for _ in range(MAX_PAGE_SIZE):
+        recipe_factory(user=user, ingredients=ingredients)
+    page = {"limit": MAX_PAGE_SIZE}
+
+    # Pages aggregate ingredients in the page query itself.
+    with query_budget(1):
+        resp = client.get("/recipes", params=page)
+    assert len(resp.json()["items"]) == MAX_PAGE_SIZE
+    with query_budget(1):
+        resp = client.get(f"/recipes/user/{user.id}", params=page)
+    assert len(resp.json()["items"]) == MAX_PAGE_SIZE
+    # Export streams entities: one query plus one selectin load per batch.
+    with query_budget(2):
+        resp = client.get("/recipes/export")
+    assert len(resp.text.splitlines()) == MAX_PAGE_SIZE
+
+    # Revalidation only reads ids and timestamps.
+    etag = client.get("/recipes", params=page).headers["ETag"]
+    with query_budget(1):
+        resp = client.get("/recipes", params=page, headers={"If-None-Match": etag})
+    assert resp.status_code == 304
@@ -0,0 +1,190 @@
+"""
+Recipe reads, import and export served by an ``AsyncSession`` on asyncpg,
+the driver ``get_db`` hands out in production (``DB_ASYNC``).
+"""
+
+import json
+from uuid import uuid4
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+from src.api.recipes.enums import DifficultyLevel
+from src.core.security import hash_password
+from src.db.models.categories import Category
+from src.db.models.ingredients import Ingredient
+from src.db.models.recipes import Recipe, RecipeIngredient
+from src.db.models.users import User
+from tests.factories import (
+    make_category_payload,
+    make_ingredient_payload,
+    make_recipe_payload,
+    make_user_payload,
+)
+
+
+@pytest.fixture()
+def async_user(async_seed) -> dict:
+    payload = make_user_payload()
+    hashed_password = hash_password(payload.password)
+
+    def _create(session: Session) -> int:
+        row = User(
+            username=payload.username,
+            email=payload.email,
+            full_name=payload.full_name,
+            is_active=payload.is_active,
+            hashed_password=hashed_password,
+        )
+        session.add(row)
+        session.flush()
+        return row.id
+
+    return {
+        "id": async_seed(_create),
+        "username": payload.username,
+        "password": payload.password,
+    }
+
+
+@pytest.fixture()
+def async_auth_headers(client: TestClient, async_user: dict) -> dict[str, str]:
+    resp = client.post(
+        "/token",
+        data={
+            "username": async_user["username"],
+            "password": async_user["password"],
+            "grant_type": "password",
+        },
+        headers={"content-type": "application/x-www-form-urlencoded"},
+    )
+    assert resp.status_code == 200
+    return {"Authorization": f"Bearer {resp.json()['access_token']}"}
+
+
+@pytest.fixture()
+def async_ingredient_factory(async_seed):
+    def _create(**overrides) -> int:
+        def _add(session: Session) -> int:
+            category = Category(name=make_category_payload().name)
+            payload = make_ingredient_payload(**overrides)
+            row = Ingredient(
+                name=payload.name, is_vegan=payload.is_vegan, categories=[category]
+            )
+            session.add(row)
+            session.flush()
+            return row.id
+
+        return async_seed(_add)
+
+    return _create
+
+
+@pytest.fixture()
+def async_recipe_factory(async_seed, async_user: dict, async_ingredient_factory):
+    def _create(**overrides) -> dict:
+        ingredient_ids = [async_ingredient_factory(), async_ingredient_factory()]
+
+        def _add(session: Session) -> dict:
+            recipe = Recipe(
+                name=overrides.pop("name", f"recipe-{uuid4().hex[:6]}"),
+                cooking_time=25,
+                difficulty_level=DifficultyLevel.EASY,
+                portions=4,
+                instructions="Mix well",
+                user_id=async_user["id"],
+                **overrides,
+            )
+            recipe.recipe_ingredients = [
+                RecipeIngredient(ingredient_id=ingredient_id, quantity="1 unit")
+                for ingredient_id in ingredient_ids
+            ]
+            session.add(recipe)
+            session.flush()
+            return {"id": recipe.id, "ingredients": recipe.recipe_ingredients_payload}
+
+        return async_seed(_add)
+
+    return _create
+
+
+def test_async_db_runs_on_asyncpg(async_db):
+    assert async_db.bind.dialect.driver == "asyncpg"
+
+
+def test_list_recipes_async(client: TestClient, async_recipe_factory):
+    recipes = [async_recipe_factory(name=f"async stew {i}") for i in range(2)]
+
+    resp = client.get("/recipes")
+    assert resp.status_code == 200
+    items = resp.json()["items"]
+    assert {item["id"] for item in items} == {recipe["id"] for recipe in recipes}
+    # The page is read as json_agg rows, which asyncpg decodes on its own.
+    by_id = {item["id"]: item for item in items}
+    for recipe in recipes:
+        assert by_id[recipe["id"]]["ingredients"] == recipe["ingredients"]
+
+
+def test_get_recipe_async(client: TestClient, async_recipe_factory):
+    recipe = async_recipe_factory()
+
+    resp = client.get(f"/recipes/{recipe['id']}")
+    assert resp.status_code == 200
+    data = resp.json()
+    assert data["id"] == recipe["id"]
+    assert data["ingredients"] == recipe["ingredients"]
+    assert data["is_vegan"] is False
+
+    resp = client.get(
+        f"/recipes/{recipe['id']}", headers={"If-None-Match": resp.headers["ETag"]}
+    )
+    assert resp.status_code == 304
+
+
+def test_import_recipes_async(
+    client: TestClient,
+    async_seed,
+    async_user: dict,
+    async_ingredient_factory,
+    async_auth_headers: dict,
+):
+    vegan_id = async_ingredient_factory(is_vegan=True)
+    lines = [
+        make_recipe_payload(
+            user_id=async_user["id"], ingredient_ids=[vegan_id], name=f"copied {i}"
+        ).model_dump_json()
+        for i in range(2)
+    ]
+    lines.append('{"name": "broken"')
+
+    resp = client.post(
+        "/recipes/import",
+        content="\n".join(lines).encode(),
+        headers={**async_auth_headers, "Content-Type": "application/x-ndjson"},
+    )
+    assert resp.status_code == 200
+    data = resp.json()
+    assert (data["imported"], data["failed"]) == (2, 1)
+
+    # Both staging tables were loaded with asyncpg's COPY.
+    def _imported(session: Session) -> list[tuple[str, list[dict]]]:
+        recipes = session.scalars(
+            select(Recipe).where(Recipe._name.like("copied%")).order_by(Recipe._name)
+        )
+        return [(recipe.name, recipe.recipe_ingredients_payload) for recipe in recipes]
+
+    expected = [{"ingredient_id": vegan_id, "quantity": "1 unit"}]
+    assert async_seed(_imported) == [("copied 0", expected), ("copied 1", expected)]
+
+
+def test_export_recipes_async(client: TestClient, async_recipe_factory):
+    recipes = [async_recipe_factory(name=f"exported {i}") for i in range(3)]
+
+    resp = client.get("/recipes/export", headers={"Accept-Encoding": "identity"})
+    assert resp.status_code == 200
+    assert resp.headers["content-type"] == "application/x-ndjson"
+    lines = [json.loads(line) for line in resp.text.splitlines()]
+    assert [line["id"] for line in lines] == [recipe["id"] for recipe in recipes]
+    assert [line["ingredients"] for line in lines] == [
+        recipe["ingredients"] for recipe in recipes
+    ]
@@ -1,4 +1,6 @@
 import pytest
+from passlib.context import CryptContext
+from src.core.security import pwd_context
 from src.db.models.users import User
 from tests.factories import make_user_payload
 from fastapi.testclient import TestClient
@@ -31,11 +33,17 @@ def test_list_users(client: TestClient, user_factory: callable):
     u2 = user_factory()
     resp = client.get("/users")
     assert resp.status_code == 200
-    assert len(resp.json()) == 2
-    ids = {u["id"] for u in resp.json()}
+    assert len(resp.json()["items"]) == 2
+    ids = {u["id"] for u in resp.json()["items"]}
     assert ids == {u1.id, u2.id}
 
 
+@pytest.mark.anyio
+def test_list_users_sparse_fieldsets(client: TestClient, user: User):
+    resp = client.get("/users", params={"fields": "username"})
+    assert resp.json()["items"] == [{"id": user.id, "username": user.username}]
+
+
 @pytest.mark.anyio
 def test_update_user(client: TestClient, user: User):
     new_payload = make_user_payload()
@@ -73,3 +81,46 @@ def test_read_users_me(client: TestClient, user: User, auth_headers: dict):
     assert data["username"] == user.username
     assert data["email"] == user.email
     assert data["full_name"] == user.full_name
+
+
+@pytest.mark.anyio
+def test_current_user_cached_until_update(
+    client: TestClient, user: User, auth_headers: dict
+):
+    client.get("/users/me/", headers=auth_headers)
+    principals = client.get("/health/cache").json()["namespaces"]["principal"]
+    resp = client.get("/users/me/", headers=auth_headers)
+    assert resp.json()["id"] == user.id
+    after = client.get("/health/cache").json()["namespaces"]["principal"]
+    assert after["hits"] == principals["hits"] + 1
+
+    resp = client.put(f"/users/{user.id}", json={"full_name": "Renamed User"})
+    assert resp.status_code == 200
+    resp = client.get("/users/me/", headers=auth_headers)
+    assert resp.json()["full_name"] == "Renamed User"
+
+    resp = client.put(f"/users/{user.id}", json={"username": "renamed"})
+    assert resp.status_code == 200
+    resp = client.get("/users/me/", headers=auth_headers)
+    assert resp.status_code == 401
+
+
+@pytest.mark.anyio
+def test_login_rehashes_outdated_password(client: TestClient, user: User, db):
+    weak = CryptContext(schemes=["argon2"], argon2__memory_cost=1024)
+    user.hashed_password = weak.hash(user.raw_password)
+    db.flush()
+    cached = client.get(f"/users/{user.id}")
+
+    response = client.post(
+        "/token",
+        data={"username": user.username, "password": user.raw_password},
+    )
+    assert response.status_code == 200
+    db.refresh(user)
+    assert not pwd_context.needs_update(user.hashed_password)
+    assert pwd_context.verify(user.raw_password, user.hashed_password)
+    # The rehash moved updated_at, so the cached representation was dropped.
+    resp = client.get(f"/users/{user.id}")
+    assert resp.headers["ETag"] != cached.headers["ETag"]
+    assert resp.json()["updated_at"] != cached.json()["updated_at"]